@@ -33,6 +33,10 @@ if str(project_root) not in sys.path:
 import streamlit as st
 from src.utils.auth import is_user_logged_in, show_login_page
 from src.utils.settings import initialize_user_settings
+from src.utils.drive_metrics import start_rerun_budget, check_rerun_budget
+from src.utils.memory_accounting import account_session, register_function_cache, start_rerun
+from src.utils.recipe_scaling import parse_quantity_text
+from src.utils.tracing import is_tracing_enabled
 
 # Configure page settings
 st.set_page_config(
@@ -42,11 +46,18 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Report the shared function caches in the memory accounting
+register_function_cache('parse_quantity_text', parse_quantity_text)
+
 def main():
     """Main application entry point"""
     
     # Check if user is logged in
     if is_user_logged_in():
+        # Count this rerun's Google Drive calls against the per-rerun budget
+        start_rerun_budget()
+        start_rerun()
+        
         # Initialize user settings (load from Google Drive if available)
         initialize_user_settings()
         
@@ -62,7 +73,12 @@ def main():
         navigation = st.navigation(pages,position="top")
         
         # Run the selected page
-        navigation.run()
+        try:
+            navigation.run()
+        finally:
+            check_rerun_budget()
+            # Measure the session (and evict entries over its memory cap)
+            account_session(force=is_tracing_enabled())
     else:
         # Show login page
         show_login_page()
@@ -3,21 +3,27 @@ Nutrition information display component
 """
 
 import streamlit as st
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from src.models.recipe import Recipe
 from src.models.ingredient import NutritionInfo
 
+if TYPE_CHECKING:
+    from src.models.recipe_graph import RecipeDependencyGraph
 
-def display_nutrition_card(recipe: Recipe, language: str = 'no') -> None:
+
+def display_nutrition_card(recipe: Recipe, language: str = 'no', graph: Optional['RecipeDependencyGraph'] = None) -> None:
     """
     Display nutrition information for a recipe
 
     Args:
         recipe: Recipe object with ingredient data
         language: Language for display ('no' for Norwegian, 'en' for English)
+        graph: Dependency graph of the corpus, to include the nutrition of sub-recipes
     """
+    from src.models.recipe_graph import get_recipe_nutrition_per_serving
+
     # Calculate nutrition per serving
-    nutrition = recipe.calculate_nutrition_per_serving()
+    nutrition = get_recipe_nutrition_per_serving(recipe, graph)
 
     if not nutrition:
         st.info("Nutrition information not available - ingredient nutritional data needed")
@@ -165,10 +171,18 @@ def display_nutrition_comparison(recipes: list[Recipe], language: str = 'no') ->
     # Create comparison table
     import pandas as pd
 
+    import numpy as np
+    from src.utils.recipe_matrices import get_matrices_for_recipes
+
+    # Nutrition for all compared recipes in one batch
+    recipes = recipes[:5]  # Limit to 5 recipes for display
+    matrices = get_matrices_for_recipes(recipes, st.session_state.get('default_recipes'))
+    nutrition_rows = matrices.nutrition_per_serving(recipes)
+
     comparison_data = []
-    for recipe in recipes[:5]:  # Limit to 5 recipes for display
-        nutrition = recipe.calculate_nutrition_per_serving()
-        if nutrition:
+    for recipe, nutrition_row in zip(recipes, nutrition_rows):
+        if not np.isnan(nutrition_row).any():
+            nutrition = NutritionInfo.from_vector(nutrition_row)
             comparison_data.append({
                 'Oppskrift' if language == 'no' else 'Recipe': recipe.get_name(language),
                 'Kalorier' if language == 'no' else 'Calories': f"{nutrition.calories:.0f}",
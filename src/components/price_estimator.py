@@ -3,21 +3,27 @@ Price estimation component for recipes
 """
 
 import streamlit as st
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from src.models.recipe import Recipe
 
+if TYPE_CHECKING:
+    from src.models.recipe_graph import RecipeDependencyGraph
 
-def display_price_card(recipe: Recipe, language: str = 'no') -> None:
+
+def display_price_card(recipe: Recipe, language: str = 'no', graph: Optional['RecipeDependencyGraph'] = None) -> None:
     """
     Display price estimation for a recipe
 
     Args:
         recipe: Recipe object with ingredient data
         language: Language for display ('no' for Norwegian, 'en' for English)
+        graph: Dependency graph of the corpus, to include the cost of sub-recipes
     """
+    from src.models.recipe_graph import get_recipe_cost, get_recipe_cost_per_serving
+
     # Calculate estimated cost
-    total_cost = recipe.estimate_cost()
-    cost_per_serving = recipe.get_cost_per_serving()
+    total_cost = get_recipe_cost(recipe, graph)
+    cost_per_serving = get_recipe_cost_per_serving(recipe, graph)
 
     if total_cost <= 0:
         st.info("💰 Priser ikke tilgjengelige - ingredienspriser trengs" if language == 'no' else "💰 Price information not available - ingredient prices needed")
@@ -133,11 +139,16 @@ def display_price_comparison(recipes: list[Recipe], language: str = 'no') -> Non
     # Create comparison table
     import pandas as pd
 
-    comparison_data = []
-    for recipe in recipes[:5]:  # Limit to 5 recipes for display
-        total_cost = recipe.estimate_cost()
-        cost_per_serving = recipe.get_cost_per_serving()
+    from src.utils.recipe_matrices import get_matrices_for_recipes
 
+    # Costs for all compared recipes in one batch
+    recipes = recipes[:5]  # Limit to 5 recipes for display
+    matrices = get_matrices_for_recipes(recipes, st.session_state.get('default_recipes'))
+    total_costs = matrices.total_cost(recipes)
+    costs_per_serving = matrices.cost_per_serving(recipes)
+
+    comparison_data = []
+    for recipe, total_cost, cost_per_serving in zip(recipes, total_costs, costs_per_serving):
         if total_cost > 0:
             price_category = get_price_category(cost_per_serving)
             comparison_data.append({
@@ -205,7 +216,11 @@ def display_weekly_budget_summary(recipes: list[Recipe], language: str = 'no') -
     if not recipes:
         return
 
-    total_weekly_cost = sum(recipe.estimate_cost() for recipe in recipes)
+    import numpy as np
+    from src.utils.recipe_matrices import get_matrices_for_recipes
+
+    matrices = get_matrices_for_recipes(recipes, st.session_state.get('default_recipes'))
+    total_weekly_cost = float(np.nansum(matrices.total_cost(recipes)))
 
     if total_weekly_cost <= 0:
         return
@@ -2,46 +2,70 @@
 Default recipes module - loads default recipes for the app
 """
 
+import hashlib
 import json
 import logging
+import os
+import threading
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 from src.models.recipe import Recipe
-from src.models.ingredient import Ingredient
+from src.models.ingredient import Ingredient, IngredientLibrary
 
 logger = logging.getLogger(__name__)
 
 
+# Environment variable pointing the app at another data directory (e.g. a synthetic corpus)
+DATA_DIR_ENV_VAR = "CHEFS_ASSISTANT_DATA_DIR"
+
+# Corpus fingerprint of the last corpus file sizes and modification times seen
+_fingerprint_lock = threading.Lock()
+_fingerprint_cache: Dict[Tuple, str] = {}
+
+
+def get_data_dir() -> Path:
+    """Get the directory holding the recipe corpus and ingredient library"""
+    data_dir = os.environ.get(DATA_DIR_ENV_VAR)
+    return Path(data_dir) if data_dir else Path(__file__).parent
+
+
 def get_default_recipes_file() -> Path:
     """Get the path to the default recipes JSON file"""
-    return Path(__file__).parent / "default_recipes.json"
+    return get_data_dir() / "default_recipes.json"
 
 
 def get_migrated_recipes_file() -> Path:
     """Get the path to the migrated recipes JSON file"""
-    return Path(__file__).parent / "migrated_recipes.json"
+    return get_data_dir() / "migrated_recipes.json"
 
 
 def get_ingredient_library_file() -> Path:
     """Get the path to the ingredient library JSON file"""
-    return Path(__file__).parent / "ingredient_library.json"
+    return get_data_dir() / "ingredient_library.json"
 
 
-def load_ingredient_library() -> Dict[str, Ingredient]:
-    """Load the ingredient library"""
-    ingredient_file = get_ingredient_library_file()
+def load_ingredient_library(ingredient_file: Optional[Path] = None) -> IngredientLibrary:
+    """Load the ingredient library (from the default library file unless another file is given)"""
+    ingredient_file = Path(ingredient_file) if ingredient_file else get_ingredient_library_file()
 
     if not ingredient_file.exists():
         logger.info("No ingredient library file found")
-        return {}
+        return IngredientLibrary()
+
+    ingredient_library = _read_ingredient_library(ingredient_file)
+    return ingredient_library if ingredient_library is not None else IngredientLibrary()
+
 
+def _read_ingredient_library(ingredient_file: Path) -> Optional[IngredientLibrary]:
+    """Read an ingredient library file, returning None when it cannot be read"""
     try:
         with open(ingredient_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
 
         ingredients_data = data.get('ingredients', {})
-        ingredient_library = {}
+        export_info = data.get('export_info', {})
+        ingredient_library = IngredientLibrary(fingerprint=export_info.get('corpus_fingerprint', ''))
 
         for ingredient_id, ingredient_dict in ingredients_data.items():
             try:
@@ -56,7 +80,102 @@ def load_ingredient_library() -> Dict[str, Ingredient]:
 
     except Exception as e:
         logger.error(f"Error loading ingredient library: {e}")
-        return {}
+        return None
+
+
+def get_corpus_fingerprint() -> str:
+    """
+    Get a content fingerprint of the recipe corpus files the ingredient library is built from
+
+    The files are only hashed again when their size or modification time changes, so
+    checking the fingerprint on every session load costs a stat call per file.
+    """
+    corpus_files = [f for f in (get_default_recipes_file(), get_migrated_recipes_file()) if f.exists()]
+    stat_key = tuple((str(f), f.stat().st_size, f.stat().st_mtime_ns) for f in corpus_files)
+    with _fingerprint_lock:
+        fingerprint = _fingerprint_cache.get(stat_key)
+    if fingerprint is not None:
+        return fingerprint
+
+    digest = hashlib.sha256()
+    for corpus_file in corpus_files:
+        digest.update(corpus_file.name.encode('utf-8'))
+        with open(corpus_file, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    fingerprint = digest.hexdigest()
+
+    with _fingerprint_lock:
+        _fingerprint_cache.clear()
+        _fingerprint_cache[stat_key] = fingerprint
+    return fingerprint
+
+
+def build_ingredient_library_from_corpus() -> IngredientLibrary:
+    """
+    Build the ingredient library from the recipe corpus
+
+    Ingredients are extracted from the legacy export's ingredient lines when it is
+    available; ingredient IDs referenced by migrated recipes but missing from the
+    extracted ingredients get basic entries named after their ID.
+    """
+    from src.utils import ingredient_parser
+    from src.utils.recipe_stream import build_ingredient_library_streaming, iter_recipes
+    from src.models.ingredient import create_basic_ingredient
+
+    ingredient_library = IngredientLibrary()
+
+    legacy_file = get_default_recipes_file()
+    if legacy_file.exists():
+        for ingredient_id, ingredient in build_ingredient_library_streaming(str(legacy_file)).items():
+            ingredient_library[ingredient_id] = ingredient
+
+    migrated_file = get_migrated_recipes_file()
+    if migrated_file.exists():
+        for recipe_dict in iter_recipes(str(migrated_file)):
+            for recipe_ingredient in recipe_dict.get('recipe_ingredients', []):
+                ingredient_id = recipe_ingredient.get('ingredient_id', '')
+                if ingredient_id and ingredient_id not in ingredient_library:
+                    name = ingredient_id.replace('_', ' ')
+                    ingredient_library[ingredient_id] = create_basic_ingredient(
+                        ingredient_id=ingredient_id,
+                        name_no=name,
+                        category=ingredient_parser.determine_category(name)
+                    )
+
+    logger.info(f"Built ingredient library with {len(ingredient_library)} ingredients from the recipe corpus")
+    return ingredient_library
+
+
+def ensure_ingredient_library() -> IngredientLibrary:
+    """
+    Load the ingredient library, building it from the corpus first if it is missing or stale
+
+    The built library is cached on disk next to the corpus together with the corpus
+    fingerprint, so it is only rebuilt when the corpus changes. A library file that
+    cannot be read is treated as stale and rebuilt.
+    """
+    fingerprint = get_corpus_fingerprint()
+    library_file = get_ingredient_library_file()
+    ingredient_library = _read_ingredient_library(library_file) if library_file.exists() else None
+    if ingredient_library is not None and ingredient_library.fingerprint in (fingerprint, ''):
+        # Libraries without a fingerprint were written by the migration script and are kept as they are
+        return ingredient_library
+
+    logger.info("Ingredient library is missing, unreadable or stale, building it from the recipe corpus")
+    ingredient_library = build_ingredient_library_from_corpus()
+    ingredient_library.fingerprint = fingerprint
+
+    try:
+        from src.utils.ingredient_extractor import IngredientExtractor
+        IngredientExtractor.save_ingredient_library(
+            ingredient_library, str(get_ingredient_library_file()),
+            export_info={'extraction_method': 'built_from_corpus', 'corpus_fingerprint': fingerprint}
+        )
+    except OSError as e:
+        logger.warning(f"Could not cache ingredient library on disk: {e}")
+
+    return ingredient_library
 
 
 def load_default_recipes() -> List[Recipe]:
@@ -72,27 +191,24 @@ def load_default_recipes() -> List[Recipe]:
     return load_legacy_recipes()
 
 
-def load_migrated_recipes() -> List[Recipe]:
-    """Load recipes from the migrated Recipe class format"""
-    migrated_file = get_migrated_recipes_file()
+def load_migrated_recipes(migrated_file: Optional[Path] = None) -> List[Recipe]:
+    """Load recipes from the migrated Recipe class format (from the default file unless another file is given)"""
+    migrated_file = Path(migrated_file) if migrated_file else get_migrated_recipes_file()
 
     if not migrated_file.exists():
         logger.info("No migrated recipes file found")
         return []
 
     try:
-        with open(migrated_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        from src.utils.recipe_stream import RecipeFileReader
 
-        recipes_data = data.get('recipes', [])
-        export_info = data.get('export_info', {})
-
-        # Load ingredient library
-        ingredient_library = load_ingredient_library()
+        # Load ingredient library, building it from the corpus if needed
+        ingredient_library = ensure_ingredient_library()
 
-        # Convert dictionaries back to Recipe objects
+        # Convert dictionaries back to Recipe objects as they are read
+        reader = RecipeFileReader(str(migrated_file))
         recipes = []
-        for recipe_dict in recipes_data:
+        for recipe_dict in reader:
             try:
                 recipe = Recipe.from_dict(recipe_dict)
                 # Link ingredients to library
@@ -102,6 +218,8 @@ def load_migrated_recipes() -> List[Recipe]:
                 logger.error(f"Failed to load recipe {recipe_dict.get('names', {}).get('no', 'unknown')}: {e}")
                 continue
 
+        export_info = reader.metadata.get('export_info', {})
+
         # Log information about loaded recipes
         if export_info:
             exported_at = export_info.get('exported_at', 'Unknown')
@@ -128,11 +246,11 @@ def load_legacy_recipes() -> List[Dict]:
         return []
 
     try:
-        with open(recipes_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        from src.utils.recipe_stream import RecipeFileReader
 
-        recipes = data.get('recipes', [])
-        export_info = data.get('export_info', {})
+        reader = RecipeFileReader(str(recipes_file))
+        recipes = list(reader)
+        export_info = reader.metadata.get('export_info', {})
 
         # Log information about loaded recipes
         if export_info:
@@ -6,17 +6,36 @@ Stores user recipes in their personal Google Drive
 import json
 import io
 import logging
+import random
+import ssl
+import time
 from typing import Dict, List, Optional
 from datetime import datetime
 import streamlit as st
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload, MediaIoBaseDownload
 from googleapiclient.errors import HttpError
+from src.utils.drive_metrics import record_drive_call
+from src.utils.tracing import traced_methods
 
 logger = logging.getLogger(__name__)
 
+# Failed reads are retried with randomized exponential backoff, for the same errors
+# the client library retries: 5xx and 429 responses, 403 rate-limit responses and
+# connection errors
+MAX_RETRIES = 2
+RATE_LIMIT_REASONS = {'userRateLimitExceeded', 'rateLimitExceeded'}
 
+
+def _error_reason(error: HttpError) -> Optional[str]:
+    """Reason given in an error response body ({"error": {"errors": [{"reason": ...}]}})"""
+    try:
+        data = json.loads(error.content.decode('utf-8'))
+        errors = data['error']['errors']
+        return errors[0]['reason'] if isinstance(errors, list) and errors else None
+    except (AttributeError, UnicodeDecodeError, ValueError, KeyError, TypeError, IndexError):
+        return None
+
+
+@traced_methods("drive")
 class GoogleDriveRecipeStorage:
     """Store and retrieve user recipes from their Google Drive"""
     
@@ -40,6 +59,10 @@ class GoogleDriveRecipeStorage:
     
     def _initialize_service(self, access_token: str):
         """Initialize Google Drive API service with user credentials"""
+        # The Drive client libraries are imported when Drive is first used, not at app start
+        from google.oauth2.credentials import Credentials
+        from googleapiclient.discovery import build
+        
         try:
             # Create credentials from access token
             creds = Credentials(token=access_token)
@@ -52,6 +75,93 @@ class GoogleDriveRecipeStorage:
             logger.error(f"Failed to initialize Google Drive service: {e}")
             raise
     
+    @staticmethod
+    def _should_retry(error: Exception, attempt: int) -> bool:
+        """Whether a failed read should be attempted again (sleeping for the backoff if so)"""
+        if attempt >= MAX_RETRIES:
+            return False
+        if isinstance(error, HttpError):
+            status = error.resp.status
+            retryable = (status >= 500 or status == 429 or
+                         (status == 403 and _error_reason(error) in RATE_LIMIT_REASONS))
+        else:
+            retryable = isinstance(error, (ConnectionError, TimeoutError, ssl.SSLError))
+        if not retryable:
+            return False
+        time.sleep(random.random() * 2 ** (attempt + 1))
+        return True
+    
+    def _call(self, operation: str, filename: str, **kwargs) -> Dict:
+        """
+        Execute a files() request, recording it in the Drive call metrics
+        
+        Args:
+            operation: files() method to call (list, create, update)
+            filename: Drive file or folder the request concerns, for the metrics
+            **kwargs: Arguments for the files() method
+            
+        Returns:
+            Response of the request
+        """
+        media = kwargs.get('media_body')
+        bytes_sent = media.size() if media is not None else 0
+        attempt = 0
+        start = time.perf_counter()
+        try:
+            while True:
+                try:
+                    response = getattr(self.service.files(), operation)(**kwargs).execute()
+                    break
+                except Exception as e:
+                    # Only listing is retried: uploads may have been partly applied
+                    if operation != 'list' or not self._should_retry(e, attempt):
+                        raise
+                    attempt += 1
+        except Exception:
+            record_drive_call(operation, filename, time.perf_counter() - start, bytes_sent, retries=attempt, error=True)
+            raise
+        record_drive_call(operation, filename, time.perf_counter() - start, bytes_sent, retries=attempt)
+        return response
+    
+    @staticmethod
+    def _json_media(json_data: str):
+        """Resumable upload body for a JSON document"""
+        from googleapiclient.http import MediaIoBaseUpload
+        return MediaIoBaseUpload(
+            io.BytesIO(json_data.encode('utf-8')),
+            mimetype='application/json',
+            resumable=True
+        )
+    
+    def _download(self, file_id: str, filename: str) -> bytes:
+        """Download a file's content, recording it in the Drive call metrics"""
+        from googleapiclient.http import MediaIoBaseDownload
+        file_content = io.BytesIO()
+        downloader = MediaIoBaseDownload(file_content, self.service.files().get_media(fileId=file_id))
+        attempt = 0
+        start = time.perf_counter()
+        try:
+            done = False
+            while not done:
+                try:
+                    status, done = downloader.next_chunk()
+                except Exception as e:
+                    # The downloader resumes from the last chunk it received
+                    if not self._should_retry(e, attempt):
+                        raise
+                    attempt += 1
+                    continue
+                if status:
+                    logger.debug(f"Download progress: {int(status.progress() * 100)}%")
+        except Exception:
+            record_drive_call('get_media', filename, time.perf_counter() - start,
+                              bytes_received=file_content.tell(), retries=attempt, error=True)
+            raise
+        content = file_content.getvalue()
+        record_drive_call('get_media', filename, time.perf_counter() - start,
+                          bytes_received=len(content), retries=attempt)
+        return content
+    
     def get_or_create_app_folder(self) -> Optional[str]:
         """
         Get or create the app's data folder in user's Google Drive
@@ -66,12 +176,12 @@ class GoogleDriveRecipeStorage:
         try:
             # Search for existing folder
             query = f"name='{self.folder_name}' and mimeType='application/vnd.google-apps.folder' and trashed=false"
-            results = self.service.files().list(
+            results = self._call('list', self.folder_name,
                 q=query,
                 spaces='drive',
                 fields='files(id, name)',
                 pageSize=1
-            ).execute()
+            )
             
             folders = results.get('files', [])
             
@@ -86,10 +196,10 @@ class GoogleDriveRecipeStorage:
                     'mimeType': 'application/vnd.google-apps.folder'
                 }
                 
-                folder = self.service.files().create(
+                folder = self._call('create', self.folder_name,
                     body=file_metadata,
                     fields='id'
-                ).execute()
+                )
                 
                 folder_id = folder.get('id')
                 logger.info(f"Created new app folder: {folder_id}")
@@ -129,29 +239,25 @@ class GoogleDriveRecipeStorage:
             
             # Check if file exists
             query = f"name='{self.recipes_file}' and '{folder_id}' in parents and trashed=false"
-            results = self.service.files().list(
+            results = self._call('list', self.recipes_file,
                 q=query,
                 spaces='drive',
                 fields='files(id)',
                 pageSize=1
-            ).execute()
+            )
             
             files = results.get('files', [])
             
             # Prepare media upload
-            media = MediaIoBaseUpload(
-                io.BytesIO(json_data.encode('utf-8')),
-                mimetype='application/json',
-                resumable=True
-            )
+            media = self._json_media(json_data)
             
             if files:
                 # Update existing file
                 file_id = files[0]['id']
-                updated_file = self.service.files().update(
+                updated_file = self._call('update', self.recipes_file,
                     fileId=file_id,
                     media_body=media
-                ).execute()
+                )
                 logger.info(f"Updated recipes file: {file_id}")
             else:
                 # Create new file
@@ -161,11 +267,11 @@ class GoogleDriveRecipeStorage:
                     'mimeType': 'application/json'
                 }
                 
-                new_file = self.service.files().create(
+                new_file = self._call('create', self.recipes_file,
                     body=file_metadata,
                     media_body=media,
                     fields='id'
-                ).execute()
+                )
                 logger.info(f"Created new recipes file: {new_file.get('id')}")
             
             return True
@@ -195,12 +301,12 @@ class GoogleDriveRecipeStorage:
             
             # Find recipes file
             query = f"name='{self.recipes_file}' and '{folder_id}' in parents and trashed=false"
-            results = self.service.files().list(
+            results = self._call('list', self.recipes_file,
                 q=query,
                 spaces='drive',
                 fields='files(id, name, modifiedTime)',
                 pageSize=1
-            ).execute()
+            )
             
             files = results.get('files', [])
             
@@ -209,19 +315,10 @@ class GoogleDriveRecipeStorage:
                 modified_time = files[0].get('modifiedTime', '')
                 
                 # Download file content
-                request = self.service.files().get_media(fileId=file_id)
-                file_content = io.BytesIO()
-                downloader = MediaIoBaseDownload(file_content, request)
-                
-                done = False
-                while not done:
-                    status, done = downloader.next_chunk()
-                    if status:
-                        logger.debug(f"Download progress: {int(status.progress() * 100)}%")
+                content = self._download(file_id, self.recipes_file)
                 
                 # Parse JSON
-                file_content.seek(0)
-                recipes_data = json.loads(file_content.read().decode('utf-8'))
+                recipes_data = json.loads(content.decode('utf-8'))
                 
                 logger.info(f"Loaded recipes from Google Drive (modified: {modified_time})")
                 return recipes_data
@@ -268,29 +365,25 @@ class GoogleDriveRecipeStorage:
             
             # Check if file exists
             query = f"name='{self.weekly_recipes_file}' and '{folder_id}' in parents and trashed=false"
-            results = self.service.files().list(
+            results = self._call('list', self.weekly_recipes_file,
                 q=query,
                 spaces='drive',
                 fields='files(id)',
                 pageSize=1
-            ).execute()
+            )
             
             files = results.get('files', [])
             
             # Prepare media upload
-            media = MediaIoBaseUpload(
-                io.BytesIO(json_data.encode('utf-8')),
-                mimetype='application/json',
-                resumable=True
-            )
+            media = self._json_media(json_data)
             
             if files:
                 # Update existing file
                 file_id = files[0]['id']
-                self.service.files().update(
+                self._call('update', self.weekly_recipes_file,
                     fileId=file_id,
                     media_body=media
-                ).execute()
+                )
                 logger.info(f"Updated weekly recipes file: {file_id}")
             else:
                 # Create new file
@@ -300,11 +393,11 @@ class GoogleDriveRecipeStorage:
                     'mimeType': 'application/json'
                 }
                 
-                new_file = self.service.files().create(
+                new_file = self._call('create', self.weekly_recipes_file,
                     body=file_metadata,
                     media_body=media,
                     fields='id'
-                ).execute()
+                )
                 logger.info(f"Created new weekly recipes file: {new_file.get('id')}")
             
             return True
@@ -334,12 +427,12 @@ class GoogleDriveRecipeStorage:
             
             # Find weekly recipes file
             query = f"name='{self.weekly_recipes_file}' and '{folder_id}' in parents and trashed=false"
-            results = self.service.files().list(
+            results = self._call('list', self.weekly_recipes_file,
                 q=query,
                 spaces='drive',
                 fields='files(id, name, modifiedTime)',
                 pageSize=1
-            ).execute()
+            )
             
             files = results.get('files', [])
             
@@ -347,17 +440,10 @@ class GoogleDriveRecipeStorage:
                 file_id = files[0]['id']
                 
                 # Download file content
-                request = self.service.files().get_media(fileId=file_id)
-                file_content = io.BytesIO()
-                downloader = MediaIoBaseDownload(file_content, request)
-                
-                done = False
-                while not done:
-                    status, done = downloader.next_chunk()
+                content = self._download(file_id, self.weekly_recipes_file)
                 
                 # Parse JSON
-                file_content.seek(0)
-                weekly_recipes_data = json.loads(file_content.read().decode('utf-8'))
+                weekly_recipes_data = json.loads(content.decode('utf-8'))
                 
                 logger.info("Loaded weekly recipes from Google Drive")
                 return weekly_recipes_data
@@ -406,29 +492,25 @@ class GoogleDriveRecipeStorage:
             
             # Check if file exists
             query = f"name='{self.meal_plans_file}' and '{folder_id}' in parents and trashed=false"
-            results = self.service.files().list(
+            results = self._call('list', self.meal_plans_file,
                 q=query,
                 spaces='drive',
                 fields='files(id)',
                 pageSize=1
-            ).execute()
+            )
             
             files = results.get('files', [])
             
             # Prepare media upload
-            media = MediaIoBaseUpload(
-                io.BytesIO(json_data.encode('utf-8')),
-                mimetype='application/json',
-                resumable=True
-            )
+            media = self._json_media(json_data)
             
             if files:
                 # Update existing file
                 file_id = files[0]['id']
-                self.service.files().update(
+                self._call('update', self.meal_plans_file,
                     fileId=file_id,
                     media_body=media
-                ).execute()
+                )
                 logger.info(f"Updated meal plans file: {file_id}")
             else:
                 # Create new file
@@ -438,11 +520,11 @@ class GoogleDriveRecipeStorage:
                     'mimeType': 'application/json'
                 }
                 
-                new_file = self.service.files().create(
+                new_file = self._call('create', self.meal_plans_file,
                     body=file_metadata,
                     media_body=media,
                     fields='id'
-                ).execute()
+                )
                 logger.info(f"Created new meal plans file: {new_file.get('id')}")
             
             return True
@@ -472,12 +554,12 @@ class GoogleDriveRecipeStorage:
             
             # Find meal plans file
             query = f"name='{self.meal_plans_file}' and '{folder_id}' in parents and trashed=false"
-            results = self.service.files().list(
+            results = self._call('list', self.meal_plans_file,
                 q=query,
                 spaces='drive',
                 fields='files(id, name, modifiedTime)',
                 pageSize=1
-            ).execute()
+            )
             
             files = results.get('files', [])
             
@@ -485,17 +567,10 @@ class GoogleDriveRecipeStorage:
                 file_id = files[0]['id']
                 
                 # Download file content
-                request = self.service.files().get_media(fileId=file_id)
-                file_content = io.BytesIO()
-                downloader = MediaIoBaseDownload(file_content, request)
-                
-                done = False
-                while not done:
-                    status, done = downloader.next_chunk()
+                content = self._download(file_id, self.meal_plans_file)
                 
                 # Parse JSON
-                file_content.seek(0)
-                meal_plans_data = json.loads(file_content.read().decode('utf-8'))
+                meal_plans_data = json.loads(content.decode('utf-8'))
                 
                 logger.info("Loaded meal plans from Google Drive")
                 return meal_plans_data
@@ -530,12 +605,12 @@ class GoogleDriveRecipeStorage:
         try:
             # Find app folder
             query = f"name='{self.folder_name}' and mimeType='application/vnd.google-apps.folder' and trashed=false"
-            results = self.service.files().list(
+            results = self._call('list', self.folder_name,
                 q=query,
                 spaces='drive',
                 fields='files(id)',
                 pageSize=1
-            ).execute()
+            )
             
             folders = results.get('files', [])
             
@@ -543,10 +618,10 @@ class GoogleDriveRecipeStorage:
                 folder_id = folders[0]['id']
                 
                 # Move folder to trash (safer than permanent deletion)
-                self.service.files().update(
+                self._call('update', self.folder_name,
                     fileId=folder_id,
                     body={'trashed': True}
-                ).execute()
+                )
                 
                 logger.info(f"Moved app folder to trash: {folder_id}")
                 return True
@@ -588,21 +663,17 @@ class GoogleDriveRecipeStorage:
             
             # Check if file exists
             query = f"name='{self.user_settings_file}' and '{folder_id}' in parents and trashed=false"
-            results = self.service.files().list(
+            results = self._call('list', self.user_settings_file,
                 q=query,
                 spaces='drive',
                 fields='files(id)',
                 pageSize=1
-            ).execute()
+            )
             
             files = results.get('files', [])
             
             # Prepare media upload
-            media = MediaIoBaseUpload(
-                io.BytesIO(json_data.encode('utf-8')),
-                mimetype='application/json',
-                resumable=True
-            )
+            media = self._json_media(json_data)
             
             if files:
                 # Update existing file
@@ -612,12 +683,12 @@ class GoogleDriveRecipeStorage:
                     'parents': [folder_id]
                 }
                 
-                updated_file = self.service.files().update(
+                updated_file = self._call('update', self.user_settings_file,
                     fileId=file_id,
                     body=file_metadata,
                     media_body=media,
                     fields='id'
-                ).execute()
+                )
                 
                 logger.info(f"Updated user settings file: {updated_file.get('id')}")
             else:
@@ -627,11 +698,11 @@ class GoogleDriveRecipeStorage:
                     'parents': [folder_id]
                 }
                 
-                created_file = self.service.files().create(
+                created_file = self._call('create', self.user_settings_file,
                     body=file_metadata,
                     media_body=media,
                     fields='id'
-                ).execute()
+                )
                 
                 logger.info(f"Created user settings file: {created_file.get('id')}")
             
@@ -662,12 +733,12 @@ class GoogleDriveRecipeStorage:
             
             # Find the user settings file
             query = f"name='{self.user_settings_file}' and '{folder_id}' in parents and trashed=false"
-            results = self.service.files().list(
+            results = self._call('list', self.user_settings_file,
                 q=query,
                 spaces='drive',
                 fields='files(id)',
                 pageSize=1
-            ).execute()
+            )
             
             files = results.get('files', [])
             if not files:
@@ -676,17 +747,10 @@ class GoogleDriveRecipeStorage:
             
             # Download the file
             file_id = files[0]['id']
-            request = self.service.files().get_media(fileId=file_id)
-            
-            file_io = io.BytesIO()
-            downloader = MediaIoBaseDownload(file_io, request)
-            
-            done = False
-            while done is False:
-                status, done = downloader.next_chunk()
+            content = self._download(file_id, self.user_settings_file)
             
             # Parse JSON content
-            file_content = file_io.getvalue().decode('utf-8')
+            file_content = content.decode('utf-8')
             settings_data = json.loads(file_content)
             
             logger.info("Loaded user settings from Google Drive")
@@ -711,7 +775,6 @@ def get_google_drive_storage() -> Optional[GoogleDriveRecipeStorage]:
     Returns:
         GoogleDriveRecipeStorage instance if user is logged in, None otherwise
     """
-    from src.utils.google_drive_oauth import get_google_drive_oauth
     from src.utils.auth import is_user_logged_in
     
     # Check if user is logged into the app
@@ -719,6 +782,9 @@ def get_google_drive_storage() -> Optional[GoogleDriveRecipeStorage]:
         logger.warning("User not logged in to app, cannot access Google Drive")
         return None
     
+    # Imported after the login check - the OAuth component and Drive client are slow to load
+    from src.utils.google_drive_oauth import get_google_drive_oauth
+    
     # Get Google Drive OAuth manager (using streamlit-oauth)
     auth = get_google_drive_oauth()
     
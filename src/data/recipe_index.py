@@ -0,0 +1,165 @@
+"""
+Recipe index - constant-time recipe lookup by ID and by name
+
+The index is built once when the recipe corpus is loaded and shared by all pages,
+so navigation and selection never need to scan the full recipe list.
+"""
+
+import logging
+import re
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.models.meal_plan import get_recipe_id, get_recipe_name
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def normalize_recipe_name(name: str) -> str:
+    """Normalize a recipe name for lookups (case- and whitespace-insensitive)"""
+    return ' '.join(name.casefold().split()) if name else ''
+
+
+def tokenize_recipe_name(name: str) -> List[str]:
+    """Split a recipe name into normalized search tokens"""
+    return TOKEN_PATTERN.findall(name.casefold()) if name else []
+
+
+class RecipeIndex:
+    """Index over the recipe corpus mapping IDs and normalized names to recipes"""
+
+    def __init__(self, recipes: List[Any]):
+        """
+        Build the index for a recipe corpus
+
+        Args:
+            recipes: Recipe corpus (Recipe objects or legacy recipe dictionaries)
+        """
+        self.corpus = recipes
+        self.by_id: Dict[str, Any] = {}
+        self.position_by_id: Dict[str, int] = {}
+        self.id_by_name: Dict[str, str] = {}
+        self.ids: List[str] = []
+        self.names: List[str] = []
+
+        # Sorted (token, position) pairs for prefix search, built on first search
+        self._tokens: Optional[List[Tuple[str, int]]] = None
+        
+        # Sub-recipe dependency graph, built on first cost or nutrition lookup
+        self._graph = None
+
+        for recipe in recipes:
+            recipe_id = get_recipe_id(recipe)
+            name = get_recipe_name(recipe)
+
+            if not recipe_id:
+                logger.warning(f"Skipping recipe without ID in index: {name}")
+                continue
+            if recipe_id in self.by_id:
+                logger.warning(f"Duplicate recipe ID in corpus: {recipe_id}")
+                continue
+
+            self.by_id[recipe_id] = recipe
+            self.position_by_id[recipe_id] = len(self.ids)
+            self.ids.append(recipe_id)
+            self.names.append(name)
+
+            # First recipe wins for duplicate names
+            self.id_by_name.setdefault(normalize_recipe_name(name), recipe_id)
+
+        logger.info(f"Built recipe index with {len(self.by_id)} recipes")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, recipe_id: str) -> bool:
+        return recipe_id in self.by_id
+
+    def get(self, recipe_id: str) -> Optional[Any]:
+        """Get a recipe by ID"""
+        return self.by_id.get(recipe_id)
+
+    def get_id_by_name(self, name: str) -> Optional[str]:
+        """Get a recipe ID by (normalized) recipe name"""
+        return self.id_by_name.get(normalize_recipe_name(name))
+
+    def get_by_name(self, name: str) -> Optional[Any]:
+        """Get a recipe by (normalized) recipe name"""
+        recipe_id = self.get_id_by_name(name)
+        return self.by_id.get(recipe_id) if recipe_id else None
+
+    def get_position(self, recipe_id: str) -> Optional[int]:
+        """Get the position of a recipe in the indexed corpus"""
+        return self.position_by_id.get(recipe_id)
+
+    def first(self) -> Optional[Any]:
+        """Get the first recipe in the corpus"""
+        return self.by_id[self.ids[0]] if self.ids else None
+
+    def get_graph(self):
+        """Get the sub-recipe dependency graph of the corpus, building it if needed"""
+        if self._graph is None:
+            from src.models.recipe_graph import build_recipe_graph
+            self._graph = build_recipe_graph(self.corpus)
+        return self._graph
+    
+    def _get_tokens(self) -> List[Tuple[str, int]]:
+        """Get the sorted token list used for prefix search, building it if needed"""
+        if self._tokens is None:
+            tokens = set()
+            for position, name in enumerate(self.names):
+                for token in tokenize_recipe_name(name):
+                    tokens.add((token, position))
+            self._tokens = sorted(tokens)
+        return self._tokens
+
+    def _match_prefix(self, prefix: str) -> Set[int]:
+        """Get the positions of recipes with a name token starting with the prefix"""
+        tokens = self._get_tokens()
+        matches = set()
+        i = bisect_left(tokens, (prefix, -1))
+        while i < len(tokens) and tokens[i][0].startswith(prefix):
+            matches.add(tokens[i][1])
+            i += 1
+        return matches
+
+    def search(self, query: str, limit: int = 20) -> List[str]:
+        """
+        Search recipe names by token prefixes
+
+        Every query token must prefix-match a token of the recipe name. Results are
+        ranked exact name matches first, then names starting with the query, then
+        corpus order.
+
+        Args:
+            query: Search text
+            limit: Maximum number of recipe IDs to return
+
+        Returns:
+            List of matching recipe IDs
+        """
+        query_tokens = tokenize_recipe_name(query)
+        if not query_tokens:
+            return self.ids[:limit]
+
+        # Intersect matches, starting from the most selective token
+        candidates = None
+        for token in sorted(set(query_tokens), key=len, reverse=True):
+            matches = self._match_prefix(token)
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return []
+
+        normalized_query = normalize_recipe_name(query)
+
+        def rank(position: int) -> Tuple[int, int]:
+            name = normalize_recipe_name(self.names[position])
+            if name == normalized_query:
+                return (0, position)
+            if name.startswith(normalized_query):
+                return (1, position)
+            return (2, position)
+
+        return [self.ids[position] for position in sorted(candidates, key=rank)[:limit]]
@@ -5,11 +5,15 @@ This module defines ingredients as reusable catalog entities with multilingual n
 nutritional information, preparation methods, and culinary properties.
 """
 
-from typing import Dict, List, Optional, Any, Union
+from collections.abc import MutableMapping
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Any, Union
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class StorageType(Enum):
     """Storage type for ingredients"""
@@ -27,6 +31,24 @@ class Season(Enum):
     WINTER = "winter"
 
 
+# Macro nutrient fields, in the order used for nutrient vectors
+NUTRITION_FIELDS = ('calories', 'protein', 'carbs', 'fat', 'fiber', 'sugar', 'sodium')
+
+# Bumped whenever ingredient data that recipes derive metrics from changes
+_library_version = 0
+
+
+def get_ingredient_library_version() -> int:
+    """Get the current ingredient library version"""
+    return _library_version
+
+
+def bump_ingredient_library_version() -> None:
+    """Mark ingredient data as changed, invalidating derived recipe metrics"""
+    global _library_version
+    _library_version += 1
+
+
 @dataclass
 class NutritionInfo:
     """Nutritional information per 100g of ingredient"""
@@ -54,6 +76,16 @@ class NutritionInfo:
             'minerals': self.minerals
         }
     
+    def to_vector(self) -> 'np.ndarray':
+        """Get the macro nutrients as a vector ordered by NUTRITION_FIELDS"""
+        import numpy as np
+        return np.array([getattr(self, name) for name in NUTRITION_FIELDS], dtype=float)
+    
+    @classmethod
+    def from_vector(cls, vector: 'np.ndarray') -> 'NutritionInfo':
+        """Create from a macro nutrient vector ordered by NUTRITION_FIELDS"""
+        return cls(**{name: float(value) for name, value in zip(NUTRITION_FIELDS, vector)})
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'NutritionInfo':
         """Create from dictionary"""
@@ -256,6 +288,7 @@ class Ingredient:
         for key, value in nutrition_kwargs.items():
             if hasattr(self.nutrition, key):
                 setattr(self.nutrition, key, value)
+        bump_ingredient_library_version()
     
     def update_price_info(self, **price_kwargs) -> None:
         """
@@ -270,6 +303,7 @@ class Ingredient:
         
         # Auto-set price_updated to current date
         self.price_info.price_updated = datetime.now().isoformat()[:10]
+        bump_ingredient_library_version()
     
     def is_in_season(self, season: Union[Season, str]) -> bool:
         """
@@ -296,16 +330,15 @@ class Ingredient:
         """
         Get common unit conversions for this ingredient.
         
+        Mass units convert directly, volume units through the ingredient's density,
+        count units through its typical weight and package units through its
+        typical package size.
+        
         Returns:
             Dictionary mapping units to their gram equivalents
         """
-        conversions = {'g': 1.0, 'kg': 1000.0}
-        
-        if self.typical_weight_grams > 0:
-            conversions['stk'] = self.typical_weight_grams
-            conversions['piece'] = self.typical_weight_grams
-        
-        return conversions
+        from src.utils.unit_conversion import get_unit_conversions
+        return get_unit_conversions(self)
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -376,6 +409,71 @@ class Ingredient:
         return f"Ingredient(id='{self.id}', name_no='{self.names['no']}', category='{self.category}')"
 
 
+class IngredientLibrary(MutableMapping):
+    """
+    Compact, ID-indexed ingredient library.
+    
+    Ingredients are stored in an array with an ID -> position dict, so lookups by ID
+    are a single dict hit and ingredients can also be addressed by position. Behaves
+    like a Dict[str, Ingredient] everywhere a library dictionary is expected.
+    """
+    
+    __slots__ = ('ids', 'ingredients', 'positions', 'fingerprint')
+    
+    def __init__(self, ingredients: Iterable[Ingredient] = (), fingerprint: str = ""):
+        """
+        Args:
+            ingredients: Ingredients to index by their ID
+            fingerprint: Fingerprint of the recipe corpus the library was built from
+        """
+        self.ids: List[str] = []
+        self.ingredients: List[Ingredient] = []
+        self.positions: Dict[str, int] = {}
+        self.fingerprint = fingerprint
+        for ingredient in ingredients:
+            self[ingredient.id] = ingredient
+    
+    def get(self, ingredient_id: str, default: Optional[Ingredient] = None) -> Optional[Ingredient]:
+        """Get an ingredient by ID with one dict lookup"""
+        position = self.positions.get(ingredient_id)
+        return self.ingredients[position] if position is not None else default
+    
+    def get_position(self, ingredient_id: str) -> Optional[int]:
+        """Get the array position of an ingredient"""
+        return self.positions.get(ingredient_id)
+    
+    def __getitem__(self, ingredient_id: str) -> Ingredient:
+        return self.ingredients[self.positions[ingredient_id]]
+    
+    def __setitem__(self, ingredient_id: str, ingredient: Ingredient) -> None:
+        position = self.positions.get(ingredient_id)
+        if position is None:
+            self.positions[ingredient_id] = len(self.ids)
+            self.ids.append(ingredient_id)
+            self.ingredients.append(ingredient)
+        else:
+            self.ingredients[position] = ingredient
+    
+    def __delitem__(self, ingredient_id: str) -> None:
+        position = self.positions.pop(ingredient_id)
+        del self.ids[position]
+        del self.ingredients[position]
+        for moved_id in self.ids[position:]:
+            self.positions[moved_id] -= 1
+    
+    def __contains__(self, ingredient_id: object) -> bool:
+        return ingredient_id in self.positions
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def __repr__(self) -> str:
+        return f"IngredientLibrary({len(self.ids)} ingredients)"
+
+
 # Example usage and factory functions
 
 def create_basic_ingredient(ingredient_id: str, name_no: str, name_en: str = None, category: str = "uncategorized") -> Ingredient:
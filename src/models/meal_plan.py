@@ -0,0 +1,208 @@
+"""
+Meal plan model for the Chef's Assistant weekly planner.
+
+Weekly plans store compact references to recipes in the shared corpus rather than
+copies of the recipes themselves. Each slot holds a recipe ID plus any per-slot
+overrides (such as scaling), and is resolved against the corpus at render time.
+"""
+
+import logging
+from typing import Dict, List, Optional, Any
+from dataclasses import dataclass
+
+from src.models.ingredient import Season
+from src.models.recipe import Recipe
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the serialized plan layout changes
+PLAN_FORMAT_VERSION = 2
+
+# Collection names the legacy recipe dictionaries used for seasons
+LEGACY_SEASON_COLLECTIONS = {
+    Season.WINTER: 'Vinter',
+    Season.SPRING: 'Vår',
+    Season.SUMMER: 'Sommer',
+    Season.FALL: 'Høst'
+}
+
+
+@dataclass
+class PlanSlot:
+    """A single meal in a weekly plan, referencing a recipe by ID"""
+    recipe_id: str
+    scale: float = 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization"""
+        return {
+            'recipe_id': self.recipe_id,
+            'scale': self.scale
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PlanSlot':
+        """Create from dictionary"""
+        return cls(
+            recipe_id=data.get('recipe_id', ''),
+            scale=data.get('scale', 1.0)
+        )
+
+
+def get_recipe_id(recipe: Any) -> str:
+    """Get the ID of a recipe, handling both Recipe objects and legacy dictionaries"""
+    if isinstance(recipe, Recipe):
+        return recipe.id
+    if isinstance(recipe, dict):
+        return recipe.get('id', '')
+    return ''
+
+
+def get_recipe_name(recipe: Any) -> str:
+    """Get the name of a recipe, handling both Recipe objects and legacy dictionaries"""
+    if isinstance(recipe, Recipe):
+        return recipe.get_name()
+    if isinstance(recipe, dict):
+        return recipe.get('name', '')
+    return ''
+
+
+def get_recipe_field(recipe: Any, key: str, default: Any = None) -> Any:
+    """
+    Get a field of a recipe by its legacy dictionary key, handling both Recipe objects and legacy dictionaries
+
+    The pages, filters and seasonal selector read recipes by the legacy dictionary
+    keys (name, collections, ingredients, prep_time, image, ...); for Recipe objects
+    those keys are mapped onto the matching attributes.
+
+    Args:
+        recipe: Recipe object or legacy recipe dictionary
+        key: Legacy dictionary key
+        default: Value for unknown keys, and for empty fields of Recipe objects
+    """
+    if isinstance(recipe, dict):
+        return recipe.get(key, default)
+    if not isinstance(recipe, Recipe):
+        return default
+
+    if key == 'id':
+        value = recipe.id
+    elif key == 'name':
+        value = recipe.get_name()
+    elif key in ('description', 'notes'):
+        value = recipe.get_description()
+    elif key == 'collections':
+        # Seasons were collections in the legacy format, with Norwegian names
+        value = recipe.categories + [LEGACY_SEASON_COLLECTIONS[s] for s in recipe.seasons]
+    elif key == 'ingredients':
+        value = [{'name': ing.get_ingredient_name(), 'quantity': f"{ing.quantity} {ing.unit}".strip(),
+                  'note': ing.note} for ing in recipe.recipe_ingredients]
+    elif key == 'preparation_steps':
+        value = [step.get_instruction() for step in recipe.preparation_steps]
+    elif key == 'prep_time':
+        value = recipe.prep_time_minutes
+    elif key == 'cook_time':
+        value = recipe.cook_time_minutes
+    elif key == 'total_time':
+        value = recipe.get_total_time_minutes()
+    elif key == 'image':
+        primary = next((photo for photo in recipe.photos if photo.is_primary), None) or \
+            (recipe.photos[0] if recipe.photos else None)
+        value = primary.url if primary else None
+    elif key == 'photo':
+        image_url = get_recipe_field(recipe, 'image')
+        value = {'hasPhoto': bool(image_url), 'url': image_url}
+    elif key == 'url':
+        value = recipe.source_url
+    elif key == 'difficulty':
+        value = recipe.difficulty.value if recipe.difficulty else None
+    elif key in ('source', 'rating', 'servings', 'cuisine', 'tags'):
+        value = getattr(recipe, key)
+    else:
+        value = None
+    return default if value is None or value == '' else value
+
+
+def migrate_plan_entry(entry: Any, id_by_name: Optional[Dict[str, str]] = None) -> Optional[PlanSlot]:
+    """
+    Convert a stored plan entry to a PlanSlot.
+
+    Handles current slot entries as well as legacy entries that hold a full copy of
+    the recipe (either a Recipe object or a recipe dictionary).
+
+    Args:
+        entry: Stored plan entry
+        id_by_name: Optional recipe name -> ID mapping for legacy entries without an ID
+
+    Returns:
+        PlanSlot, or None if the entry cannot be resolved to a recipe ID
+    """
+    if isinstance(entry, PlanSlot):
+        return entry
+
+    if isinstance(entry, dict) and 'recipe_id' in entry:
+        slot = PlanSlot.from_dict(entry)
+        return slot if slot.recipe_id else None
+
+    recipe_id = get_recipe_id(entry)
+    if not recipe_id and id_by_name:
+        recipe_id = id_by_name.get(get_recipe_name(entry), '')
+
+    if not recipe_id:
+        return None
+
+    return PlanSlot(recipe_id=recipe_id)
+
+
+def migrate_plan_entries(entries: List[Any], id_by_name: Optional[Dict[str, str]] = None) -> List[PlanSlot]:
+    """
+    Convert a list of stored plan entries to PlanSlots, dropping unresolvable entries.
+
+    Args:
+        entries: Stored plan entries (slots, slot dictionaries or legacy recipe copies)
+        id_by_name: Optional recipe name -> ID mapping for legacy entries without an ID
+
+    Returns:
+        List of PlanSlot objects
+    """
+    slots = []
+    for entry in entries or []:
+        slot = migrate_plan_entry(entry, id_by_name)
+        if slot:
+            slots.append(slot)
+        else:
+            logger.warning(f"Dropping plan entry that could not be resolved to a recipe: {get_recipe_name(entry) or entry!r}")
+    return slots
+
+
+def migrate_weekly_plans(
+    weekly_plans: Dict[str, List[Any]],
+    id_by_name: Optional[Dict[str, str]] = None
+) -> Dict[str, List[PlanSlot]]:
+    """
+    Convert stored weekly plans (week key -> entries) to PlanSlot lists.
+
+    Args:
+        weekly_plans: Dictionary mapping week keys to stored plan entries
+        id_by_name: Optional recipe name -> ID mapping for legacy entries without an ID
+
+    Returns:
+        Dictionary mapping week keys to lists of PlanSlot objects
+    """
+    return {
+        week_key: migrate_plan_entries(entries, id_by_name)
+        for week_key, entries in (weekly_plans or {}).items()
+    }
+
+
+def serialize_plan_entries(slots: List[PlanSlot]) -> List[Dict[str, Any]]:
+    """Serialize a list of PlanSlots for JSON storage"""
+    return [slot.to_dict() for slot in slots]
+
+
+def serialize_weekly_plans(weekly_plans: Dict[str, List[PlanSlot]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Serialize weekly plans (week key -> PlanSlots) for JSON storage"""
+    return {
+        week_key: serialize_plan_entries(slots)
+        for week_key, slots in weekly_plans.items()
+    }
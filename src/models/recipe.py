@@ -5,14 +5,22 @@ This module defines recipes as structured entities that reference ingredients fr
 library/catalog system, with multilingual support and rich metadata.
 """
 
-from typing import Dict, List, Optional, Any, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Union
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+import copy
 import uuid
 
+if TYPE_CHECKING:
+    import numpy as np
+
 # Import from our ingredient system
-from src.models.ingredient import Ingredient, NutritionInfo, Season
+from src.models.ingredient import (
+    Ingredient, NutritionInfo, Season, NUTRITION_FIELDS, get_ingredient_library_version
+)
+from src.utils.recipe_scaling import ParsedQuantity, parse_quantity_text, format_quantity
+from src.utils.unit_conversion import convert_to_grams
 
 
 class DifficultyLevel(Enum):
@@ -121,10 +129,47 @@ class RecipeIngredient:
     # Optional reference to the full ingredient from catalog
     ingredient: Optional[Ingredient] = None
     
+    # Structured quantity, parsed once when the recipe is loaded (not serialized)
+    parsed_quantity: Optional[ParsedQuantity] = field(default=None, repr=False, compare=False)
+    
+    def parse_quantity(self) -> Optional[ParsedQuantity]:
+        """Parse the quantity into structured form, caching the result"""
+        if self.parsed_quantity is None and self.quantity:
+            self.parsed_quantity = parse_quantity_text(self.quantity, self.unit)
+        return self.parsed_quantity
+    
+    def get_scaled_quantity(self, scale_factor: float) -> str:
+        """Get the quantity (without unit) scaled by a factor"""
+        parsed = self.parse_quantity()
+        if parsed is None or parsed.low == 0:
+            return self.quantity
+        scaled = parsed.scale(scale_factor)
+        return format_quantity(scaled.low, scaled.high)
+    
+    def get_grams(self) -> Optional[float]:
+        """
+        Get the amount of this ingredient in grams.
+        
+        Ranges use their midpoint. Ingredients without a quantity count as one
+        typical piece.
+        
+        Returns:
+            Weight in grams, or None if it cannot be determined
+        """
+        parsed = self.parse_quantity()
+        if parsed is None:
+            if self.ingredient and self.ingredient.typical_weight_grams > 0:
+                return self.ingredient.typical_weight_grams
+            return None
+        
+        amount = parsed.low if parsed.high is None else (parsed.low + parsed.high) / 2
+        return convert_to_grams(amount, parsed.unit, self.ingredient)
+    
     def load_ingredient(self, ingredient_library: Dict[str, Ingredient]) -> None:
         """Load the full ingredient from the ingredient library"""
-        if self.ingredient_id in ingredient_library:
-            self.ingredient = ingredient_library[self.ingredient_id]
+        ingredient = ingredient_library.get(self.ingredient_id)
+        if ingredient is not None:
+            self.ingredient = ingredient
     
     def get_ingredient_name(self, language: str = 'no') -> str:
         """Get ingredient name in specified language"""
@@ -329,6 +374,11 @@ class Recipe:
             self.updated_at = datetime.now()
         
         self.version = kwargs.get('version', 1)
+        
+        # Derived metrics (nutrition, cost, time, shopping list, gram amounts), cached
+        # for the recipe and ingredient library versions they were computed from
+        self._metrics: Dict[str, Any] = {}
+        self._metrics_key: Optional[tuple] = None
     
     def get_name(self, language: str = 'no') -> str:
         """Get recipe name in specified language"""
@@ -407,84 +457,124 @@ class Recipe:
         self.version += 1
     
     def load_ingredients(self, ingredient_library: Dict[str, Ingredient]) -> None:
-        """Load full ingredient data from the ingredient library"""
+        """Load full ingredient data from the ingredient library and parse quantities"""
         for recipe_ingredient in self.recipe_ingredients:
             recipe_ingredient.load_ingredient(ingredient_library)
+            recipe_ingredient.parse_quantity()
+        
+        # Derived metrics depend on the loaded ingredients - rebuild them
+        self.clear_metrics_cache()
+        self.get_gram_vector()
+    
+    def clear_metrics_cache(self) -> None:
+        """Drop all cached derived metrics"""
+        self._metrics = {}
+        self._metrics_key = None
+    
+    def _get_cached_metric(self, name: str, compute):
+        """
+        Get a derived metric, computing it once per recipe and ingredient library version.
+        
+        Args:
+            name: Cache key for the metric
+            compute: Function computing the metric
+            
+        Returns:
+            The cached or freshly computed metric
+        """
+        key = (self.version, self.servings, get_ingredient_library_version())
+        if self._metrics_key != key:
+            self._metrics = {}
+            self._metrics_key = key
+        
+        if name not in self._metrics:
+            self._metrics[name] = compute()
+        return self._metrics[name]
+    
+    def get_gram_vector(self) -> 'np.ndarray':
+        """
+        Get the amount in grams of each recipe ingredient, in recipe order.
+        
+        Ingredients whose amount cannot be converted to grams count as 0 g.
+        The vector is cached until the recipe or ingredient library changes.
+        
+        Returns:
+            Array of gram amounts aligned with recipe_ingredients
+        """
+        return self._get_cached_metric('grams', self._compute_gram_vector)
+    
+    def _compute_gram_vector(self) -> 'np.ndarray':
+        """Compute the gram amounts (read-only, as the array is shared through the cache)"""
+        import numpy as np
+        grams = np.array(
+            [recipe_ingredient.get_grams() or 0.0 for recipe_ingredient in self.recipe_ingredients],
+            dtype=float
+        )
+        grams.flags.writeable = False
+        return grams
     
     def calculate_nutrition_per_serving(self) -> Optional[NutritionInfo]:
-        """Calculate nutrition information per serving from loaded ingredients"""
+        """Calculate nutrition information per serving from loaded ingredients (cached)"""
+        nutrition = self._get_cached_metric('nutrition_per_serving', self._compute_nutrition_per_serving)
+        # Copy so callers can't modify the cached nutrition
+        return copy.deepcopy(nutrition)
+    
+    def _compute_nutrition_per_serving(self) -> Optional[NutritionInfo]:
+        """Compute nutrition information per serving from loaded ingredients"""
         if not self.servings or self.servings <= 0:
             return None
         
-        total_nutrition = NutritionInfo()
-        
-        for recipe_ingredient in self.recipe_ingredients:
-            if not recipe_ingredient.ingredient:
-                continue  # Skip if ingredient not loaded
-            
-            # This is a simplified calculation - in reality, you'd need to
-            # parse quantities and convert units properly
-            # For now, we'll just add up the base nutritional values
-            ing_nutrition = recipe_ingredient.ingredient.nutrition
-            
-            total_nutrition.calories += ing_nutrition.calories
-            total_nutrition.protein += ing_nutrition.protein
-            total_nutrition.carbs += ing_nutrition.carbs
-            total_nutrition.fat += ing_nutrition.fat
-            total_nutrition.fiber += ing_nutrition.fiber
-            total_nutrition.sugar += ing_nutrition.sugar
-            total_nutrition.sodium += ing_nutrition.sodium
-            
-            # Combine vitamins and minerals
+        grams = self.get_gram_vector()
+        loaded = [i for i, ri in enumerate(self.recipe_ingredients) if ri.ingredient]
+        if not loaded:
+            return NutritionInfo()
+        
+        # Nutrition is given per 100 g: totals = grams . (per-100g matrix) / 100
+        import numpy as np
+        weights = grams[loaded] / 100.0
+        nutrient_matrix = np.array(
+            [self.recipe_ingredients[i].ingredient.nutrition.to_vector() for i in loaded],
+            dtype=float
+        ).reshape(len(loaded), len(NUTRITION_FIELDS))
+        total_nutrition = NutritionInfo.from_vector(weights @ nutrient_matrix / self.servings)
+        
+        # Combine vitamins and minerals
+        for weight, i in zip(weights, loaded):
+            ing_nutrition = self.recipe_ingredients[i].ingredient.nutrition
             for vitamin, amount in ing_nutrition.vitamins.items():
-                if vitamin in total_nutrition.vitamins:
-                    total_nutrition.vitamins[vitamin] += amount
-                else:
-                    total_nutrition.vitamins[vitamin] = amount
-            
+                total_nutrition.vitamins[vitamin] = (
+                    total_nutrition.vitamins.get(vitamin, 0.0) + amount * weight / self.servings
+                )
             for mineral, amount in ing_nutrition.minerals.items():
-                if mineral in total_nutrition.minerals:
-                    total_nutrition.minerals[mineral] += amount
-                else:
-                    total_nutrition.minerals[mineral] = amount
-        
-        # Divide by servings to get per-serving values
-        total_nutrition.calories /= self.servings
-        total_nutrition.protein /= self.servings
-        total_nutrition.carbs /= self.servings
-        total_nutrition.fat /= self.servings
-        total_nutrition.fiber /= self.servings
-        total_nutrition.sugar /= self.servings
-        total_nutrition.sodium /= self.servings
-        
-        for vitamin in total_nutrition.vitamins:
-            total_nutrition.vitamins[vitamin] /= self.servings
-        
-        for mineral in total_nutrition.minerals:
-            total_nutrition.minerals[mineral] /= self.servings
+                total_nutrition.minerals[mineral] = (
+                    total_nutrition.minerals.get(mineral, 0.0) + amount * weight / self.servings
+                )
         
         return total_nutrition
     
     def estimate_cost(self) -> float:
-        """Estimate recipe cost from loaded ingredient prices"""
-        total_cost = 0.0
-        
-        for recipe_ingredient in self.recipe_ingredients:
-            if not recipe_ingredient.ingredient:
-                continue  # Skip if ingredient not loaded
-            
-            # Simplified cost calculation - in reality, you'd parse quantities
-            # and calculate based on actual amounts used
-            price_per_kg = recipe_ingredient.ingredient.price_info.average_price_per_kg
-            if price_per_kg > 0 and recipe_ingredient.ingredient.typical_weight_grams > 0:
-                # Rough estimate based on typical weight
-                ingredient_cost = (price_per_kg * recipe_ingredient.ingredient.typical_weight_grams) / 1000
-                total_cost += ingredient_cost
-        
-        return total_cost
+        """Estimate recipe cost from loaded ingredient prices and amounts (cached)"""
+        return self._get_cached_metric('cost', self._compute_cost)
+    
+    def _compute_cost(self) -> float:
+        """Compute recipe cost from loaded ingredient prices and amounts"""
+        if not self.recipe_ingredients:
+            return 0.0
+        
+        import numpy as np
+        prices_per_kg = np.array(
+            [ri.ingredient.price_info.average_price_per_kg if ri.ingredient else 0.0
+             for ri in self.recipe_ingredients],
+            dtype=float
+        )
+        return float(self.get_gram_vector() @ prices_per_kg / 1000)
     
     def get_cost_per_serving(self) -> float:
-        """Get estimated cost per serving"""
+        """Get estimated cost per serving (cached)"""
+        return self._get_cached_metric('cost_per_serving', self._compute_cost_per_serving)
+    
+    def _compute_cost_per_serving(self) -> float:
+        """Compute estimated cost per serving"""
         total_cost = self.estimate_cost()
         if self.servings > 0:
             return total_cost / self.servings
@@ -514,11 +604,11 @@ class Recipe:
             author=self.author
         )
         
-        # Scale ingredients (quantities would need proper parsing in real implementation)
+        # Scale ingredients using their parsed quantities
         for recipe_ingredient in self.recipe_ingredients:
             scaled_recipe.recipe_ingredients.append(RecipeIngredient(
                 ingredient_id=recipe_ingredient.ingredient_id,
-                quantity=recipe_ingredient.quantity,  # Would need actual scaling
+                quantity=recipe_ingredient.get_scaled_quantity(scale_factor),
                 unit=recipe_ingredient.unit,
                 preparation=recipe_ingredient.preparation,
                 note=recipe_ingredient.note,
@@ -541,7 +631,15 @@ class Recipe:
         return scaled_recipe
     
     def get_shopping_list(self, language: str = 'no') -> List[Dict[str, str]]:
-        """Generate a shopping list from recipe ingredients"""
+        """Generate a shopping list from recipe ingredients (cached per language)"""
+        shopping_list = self._get_cached_metric(
+            f'shopping_list_{language}', lambda: self._compute_shopping_list(language)
+        )
+        # Copy the items so callers can't modify the cached list
+        return [dict(item) for item in shopping_list]
+    
+    def _compute_shopping_list(self, language: str = 'no') -> List[Dict[str, str]]:
+        """Compute the shopping list from recipe ingredients"""
         shopping_list = []
         
         for recipe_ingredient in self.recipe_ingredients:
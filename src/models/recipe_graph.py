@@ -0,0 +1,408 @@
+"""
+Recipe dependency graph for recipes that use other recipes' produced ingredients.
+
+Recipes can produce ingredients (pizza dough, stock, pesto) that other recipes use.
+This module links each produced ingredient to its producing recipe, detects cycles,
+orders sub-recipes topologically and memoizes each recipe's fully expanded base
+ingredients, cost and nutrition. Changing a recipe only invalidates the recipes
+that (directly or transitively) depend on it.
+"""
+
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from src.models.ingredient import Ingredient, NutritionInfo, NUTRITION_FIELDS, get_ingredient_library_version
+from src.models.recipe import Recipe
+from src.utils.unit_conversion import convert_to_grams
+
+logger = logging.getLogger(__name__)
+
+
+class RecipeDependencyCycleError(ValueError):
+    """Raised when recipes depend on each other's produced ingredients in a cycle"""
+
+    def __init__(self, cycle: List[str]):
+        self.cycle = cycle
+        super().__init__(f"Recipe dependency cycle: {' -> '.join(cycle)}")
+
+
+@dataclass
+class ExpandedRecipe:
+    """A recipe with all sub-recipes expanded down to base ingredients"""
+    recipe_id: str
+    base_grams: Dict[str, float] = field(default_factory=dict)  # base ingredient ID -> grams
+    cost: float = 0.0
+    nutrition: np.ndarray = field(default_factory=lambda: np.zeros(len(NUTRITION_FIELDS)))
+    sub_recipe_ids: List[str] = field(default_factory=list)  # In dependency order
+
+    @property
+    def total_grams(self) -> float:
+        return sum(self.base_grams.values())
+
+    def get_nutrition_per_serving(self, servings: int) -> Optional[NutritionInfo]:
+        """Get the expanded nutrition per serving"""
+        if not servings or servings <= 0:
+            return None
+        return NutritionInfo.from_vector(self.nutrition / servings)
+
+
+class RecipeDependencyGraph:
+    """Graph of recipes linked through produced ingredients"""
+
+    def __init__(self, recipes: Iterable[Recipe] = ()):
+        """
+        Build the graph for a set of recipes.
+
+        Args:
+            recipes: Recipes to include (producers and consumers)
+        """
+        self.recipes: Dict[str, Recipe] = {}
+        self.producer_by_ingredient: Dict[str, str] = {}
+        self.dependencies: Dict[str, Set[str]] = {}  # recipe -> recipes it uses
+        self.dependants: Dict[str, Set[str]] = {}  # recipe -> recipes using it
+        self.base_ingredients: Dict[str, Ingredient] = {}
+
+        self._expanded: Dict[str, ExpandedRecipe] = {}
+        self._versions: Dict[str, int] = {}
+        self._library_version = get_ingredient_library_version()
+
+        for recipe in recipes:
+            if isinstance(recipe, Recipe):
+                self._register(recipe)
+        for recipe_id in self.recipes:
+            self._link(recipe_id)
+
+    def _register(self, recipe: Recipe) -> None:
+        """Add a recipe and its produced ingredient to the graph (without edges)"""
+        self.recipes[recipe.id] = recipe
+        self._versions[recipe.id] = recipe.version
+        self.dependencies.setdefault(recipe.id, set())
+        self.dependants.setdefault(recipe.id, set())
+
+        if recipe.is_ingredient_producer():
+            existing = self.producer_by_ingredient.get(recipe.produced_ingredient_id)
+            if existing and existing != recipe.id:
+                logger.warning(
+                    f"Ingredient {recipe.produced_ingredient_id} is produced by both {existing} and "
+                    f"{recipe.id}; using {existing}"
+                )
+            else:
+                self.producer_by_ingredient[recipe.produced_ingredient_id] = recipe.id
+
+    def _link(self, recipe_id: str) -> None:
+        """(Re)build the dependency edges of a recipe"""
+        for dependency_id in self.dependencies.get(recipe_id, set()):
+            self.dependants[dependency_id].discard(recipe_id)
+
+        dependencies = set()
+        for recipe_ingredient in self.recipes[recipe_id].recipe_ingredients:
+            producer_id = self.producer_by_ingredient.get(recipe_ingredient.ingredient_id)
+            if producer_id and producer_id != recipe_id:
+                dependencies.add(producer_id)
+            if recipe_ingredient.ingredient is not None:
+                self.base_ingredients.setdefault(recipe_ingredient.ingredient_id, recipe_ingredient.ingredient)
+
+        self.dependencies[recipe_id] = dependencies
+        for dependency_id in dependencies:
+            self.dependants[dependency_id].add(recipe_id)
+
+    def get_dependants(self, recipe_id: str) -> Set[str]:
+        """Get all recipes that directly or transitively depend on a recipe"""
+        found = set()
+        queue = deque([recipe_id])
+        while queue:
+            for dependant_id in self.dependants.get(queue.popleft(), set()):
+                if dependant_id not in found:
+                    found.add(dependant_id)
+                    queue.append(dependant_id)
+        return found
+
+    def invalidate(self, recipe_id: str) -> None:
+        """Drop the memoized expansion of a recipe and of everything depending on it"""
+        for invalid_id in {recipe_id} | self.get_dependants(recipe_id):
+            self._expanded.pop(invalid_id, None)
+
+    def update_recipe(self, recipe: Recipe) -> None:
+        """
+        Add or refresh a recipe after it changed, invalidating only its dependants.
+
+        Args:
+            recipe: The new or changed recipe
+        """
+        old = self.recipes.get(recipe.id)
+        old_product = old.produced_ingredient_id if old and old.is_ingredient_producer() else None
+        if old_product and self.producer_by_ingredient.get(old_product) == recipe.id:
+            del self.producer_by_ingredient[old_product]
+
+        self.invalidate(recipe.id)
+        self._register(recipe)
+        self._link(recipe.id)
+
+        # Recipes using the (old or new) produced ingredient need their edges rebuilt
+        product = recipe.produced_ingredient_id if recipe.is_ingredient_producer() else None
+        if product != old_product:
+            for other_id, other in self.recipes.items():
+                if other_id != recipe.id and any(
+                    ri.ingredient_id in (old_product, product) for ri in other.recipe_ingredients
+                ):
+                    self.invalidate(other_id)
+                    self._link(other_id)
+
+    def remove_recipe(self, recipe_id: str) -> None:
+        """Remove a recipe, invalidating its dependants"""
+        recipe = self.recipes.get(recipe_id)
+        if recipe is None:
+            return
+
+        dependants = set(self.dependants.get(recipe_id, set()))
+        self.invalidate(recipe_id)
+        if recipe.is_ingredient_producer() and self.producer_by_ingredient.get(recipe.produced_ingredient_id) == recipe_id:
+            del self.producer_by_ingredient[recipe.produced_ingredient_id]
+
+        for dependency_id in self.dependencies.pop(recipe_id, set()):
+            self.dependants[dependency_id].discard(recipe_id)
+        del self.dependants[recipe_id]
+        del self.recipes[recipe_id]
+        self._versions.pop(recipe_id, None)
+
+        for dependant_id in dependants:
+            self._link(dependant_id)
+
+    def find_cycle(self) -> Optional[List[str]]:
+        """
+        Find a dependency cycle, if any.
+
+        Returns:
+            List of recipe IDs forming the cycle (first ID repeated at the end), or None
+        """
+        WHITE, GREY, BLACK = 0, 1, 2
+        color = {recipe_id: WHITE for recipe_id in self.recipes}
+
+        for start in self.recipes:
+            if color[start] != WHITE:
+                continue
+            path = [start]
+            stack = [iter(sorted(self.dependencies[start]))]
+            color[start] = GREY
+            while stack:
+                next_id = next(stack[-1], None)
+                if next_id is None:
+                    color[path.pop()] = BLACK
+                    stack.pop()
+                elif color[next_id] == GREY:
+                    return path[path.index(next_id):] + [next_id]
+                elif color[next_id] == WHITE:
+                    color[next_id] = GREY
+                    path.append(next_id)
+                    stack.append(iter(sorted(self.dependencies[next_id])))
+        return None
+
+    def topological_order(self, recipe_ids: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Order recipes so every recipe comes after the sub-recipes it uses.
+
+        Args:
+            recipe_ids: Restrict to these recipes and their transitive sub-recipes
+                (default: all recipes)
+
+        Returns:
+            List of recipe IDs in dependency order
+
+        Raises:
+            RecipeDependencyCycleError: If the recipes depend on each other in a cycle
+        """
+        if recipe_ids is None:
+            nodes = set(self.recipes)
+        else:
+            nodes = set()
+            queue = deque(recipe_id for recipe_id in recipe_ids if recipe_id in self.recipes)
+            while queue:
+                recipe_id = queue.popleft()
+                if recipe_id not in nodes:
+                    nodes.add(recipe_id)
+                    queue.extend(self.dependencies[recipe_id])
+
+        # Kahn's algorithm over the selected subgraph
+        remaining = {recipe_id: len(self.dependencies[recipe_id] & nodes) for recipe_id in nodes}
+        ready = deque(sorted(recipe_id for recipe_id, count in remaining.items() if count == 0))
+        order = []
+        while ready:
+            recipe_id = ready.popleft()
+            order.append(recipe_id)
+            for dependant_id in sorted(self.dependants[recipe_id] & nodes):
+                remaining[dependant_id] -= 1
+                if remaining[dependant_id] == 0:
+                    ready.append(dependant_id)
+
+        if len(order) < len(nodes):
+            raise RecipeDependencyCycleError(self.find_cycle() or sorted(nodes - set(order)))
+        return order
+
+    def uses_sub_recipes(self, recipe: Recipe) -> bool:
+        """Check if a recipe in the graph uses other recipes' produced ingredients"""
+        return self.recipes.get(recipe.id) is recipe and bool(self.dependencies.get(recipe.id))
+
+    def get_sub_recipes(self, recipe_id: str) -> List[str]:
+        """Get the transitive sub-recipes of a recipe in dependency order"""
+        return [other_id for other_id in self.topological_order([recipe_id]) if other_id != recipe_id]
+
+    def _refresh_stale(self, recipe_ids: Iterable[str]) -> None:
+        """Invalidate expansions of recipes (and dependants) changed since they were memoized"""
+        library_version = get_ingredient_library_version()
+        if library_version != self._library_version:
+            self._expanded.clear()
+            self._library_version = library_version
+
+        for recipe_id in list(recipe_ids):
+            recipe = self.recipes[recipe_id]
+            if self._versions.get(recipe_id) != recipe.version:
+                self.update_recipe(recipe)
+
+    def _get_yield_grams(self, recipe: Recipe, expanded: ExpandedRecipe, produced: Optional[Ingredient]) -> float:
+        """Get the weight produced by a producer recipe, falling back to its ingredient weight"""
+        if recipe.yield_amount > 0:
+            grams = convert_to_grams(recipe.yield_amount, recipe.yield_unit, produced)
+            if grams:
+                return grams
+        return expanded.total_grams
+
+    def expand(self, recipe_id: str) -> Optional[ExpandedRecipe]:
+        """
+        Get a recipe fully expanded to base ingredients, with cost and nutrition totals.
+
+        Results are memoized until the recipe, one of its sub-recipes or the
+        ingredient library changes.
+
+        Args:
+            recipe_id: Recipe to expand
+
+        Returns:
+            ExpandedRecipe, or None if the recipe is not in the graph
+
+        Raises:
+            RecipeDependencyCycleError: If the recipe depends on itself through sub-recipes
+        """
+        if recipe_id not in self.recipes:
+            return None
+
+        self._refresh_stale(self.topological_order([recipe_id]))
+        order = self.topological_order([recipe_id])
+
+        for current_id in order:
+            if current_id in self._expanded:
+                continue
+
+            recipe = self.recipes[current_id]
+            expanded = ExpandedRecipe(recipe_id=current_id)
+            sub_recipes = []
+
+            for recipe_ingredient, grams in zip(recipe.recipe_ingredients, recipe.get_gram_vector()):
+                grams = float(grams)
+                if grams <= 0:
+                    continue
+
+                producer_id = self.producer_by_ingredient.get(recipe_ingredient.ingredient_id)
+                if producer_id and producer_id != current_id:
+                    # Use the matching fraction of the sub-recipe's expanded totals
+                    sub = self._expanded[producer_id]
+                    yield_grams = self._get_yield_grams(self.recipes[producer_id], sub, recipe_ingredient.ingredient)
+                    if yield_grams <= 0:
+                        continue
+                    fraction = grams / yield_grams
+                    for base_id, base_grams in sub.base_grams.items():
+                        expanded.base_grams[base_id] = expanded.base_grams.get(base_id, 0.0) + base_grams * fraction
+                    expanded.cost += sub.cost * fraction
+                    expanded.nutrition = expanded.nutrition + sub.nutrition * fraction
+                    for sub_id in sub.sub_recipe_ids + [producer_id]:
+                        if sub_id not in sub_recipes:
+                            sub_recipes.append(sub_id)
+                    continue
+
+                ingredient = recipe_ingredient.ingredient
+                expanded.base_grams[recipe_ingredient.ingredient_id] = (
+                    expanded.base_grams.get(recipe_ingredient.ingredient_id, 0.0) + grams
+                )
+                if ingredient is not None:
+                    expanded.cost += grams * ingredient.price_info.average_price_per_kg / 1000
+                    expanded.nutrition = expanded.nutrition + grams * ingredient.nutrition.to_vector() / 100
+
+            expanded.sub_recipe_ids = sub_recipes
+            self._expanded[current_id] = expanded
+
+        return self._expanded[recipe_id]
+
+    def get_expanded_cost(self, recipe_id: str) -> float:
+        """Get the total cost of a recipe including its sub-recipes"""
+        expanded = self.expand(recipe_id)
+        return expanded.cost if expanded else 0.0
+
+    def get_expanded_nutrition_per_serving(self, recipe_id: str) -> Optional[NutritionInfo]:
+        """Get the nutrition per serving of a recipe including its sub-recipes"""
+        expanded = self.expand(recipe_id)
+        if expanded is None:
+            return None
+        return expanded.get_nutrition_per_serving(self.recipes[recipe_id].servings)
+
+
+def build_recipe_graph(recipes: Iterable[Recipe]) -> RecipeDependencyGraph:
+    """
+    Convenience function to build a dependency graph and check it for cycles.
+
+    Args:
+        recipes: Recipes to include
+
+    Returns:
+        RecipeDependencyGraph for the recipes (cycles are logged, not raised)
+    """
+    graph = RecipeDependencyGraph(recipes)
+    cycle = graph.find_cycle()
+    if cycle:
+        logger.error(f"Recipe dependency cycle detected: {' -> '.join(cycle)}")
+    return graph
+
+
+def expand_sub_recipes(recipe: Recipe, graph: Optional[RecipeDependencyGraph]) -> Optional[ExpandedRecipe]:
+    """Expand a recipe through the graph if it uses sub-recipes (None when its own values apply)"""
+    if graph is None or not graph.uses_sub_recipes(recipe):
+        return None
+    try:
+        return graph.expand(recipe.id)
+    except RecipeDependencyCycleError as e:
+        logger.warning(f"Not expanding sub-recipes of {recipe.id}: {e}")
+        return None
+
+
+def get_recipe_cost(recipe: Recipe, graph: Optional[RecipeDependencyGraph] = None) -> float:
+    """
+    Get the estimated total cost of a recipe, including its sub-recipes.
+
+    Args:
+        recipe: Recipe to price
+        graph: Dependency graph of the corpus (without one, sub-recipes are not expanded)
+
+    Returns:
+        Estimated cost in NOK
+    """
+    expanded = expand_sub_recipes(recipe, graph)
+    return expanded.cost if expanded else recipe.estimate_cost()
+
+
+def get_recipe_cost_per_serving(recipe: Recipe, graph: Optional[RecipeDependencyGraph] = None) -> float:
+    """Get the estimated cost per serving of a recipe, including its sub-recipes"""
+    expanded = expand_sub_recipes(recipe, graph)
+    if expanded is None:
+        return recipe.get_cost_per_serving()
+    return expanded.cost / recipe.servings if recipe.servings > 0 else expanded.cost
+
+
+def get_recipe_nutrition_per_serving(recipe: Recipe,
+                                     graph: Optional[RecipeDependencyGraph] = None) -> Optional[NutritionInfo]:
+    """Get the nutrition per serving of a recipe, including its sub-recipes (macro nutrients only for those)"""
+    expanded = expand_sub_recipes(recipe, graph)
+    if expanded is None:
+        return recipe.calculate_nutrition_per_serving()
+    return expanded.get_nutrition_per_serving(recipe.servings)
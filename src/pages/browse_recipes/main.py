@@ -6,6 +6,8 @@ import streamlit as st
 from src.pages.browse_recipes.session_state import initialize_session_state, get_all_recipes
 from src.pages.browse_recipes.recipe_display import display_recipe_card
 from src.pages.browse_recipes.recipe_filters import filter_recipes
+from src.models.meal_plan import get_recipe_field
+from src.utils.tracing import traced_page
 
 
 def get_all_categories(recipes):
@@ -14,7 +16,7 @@ def get_all_categories(recipes):
     
     for recipe in recipes:
         # Get from collections - handle both old format (strings) and new format (objects)
-        collections = recipe.get('collections', [])
+        collections = get_recipe_field(recipe, 'collections', [])
         for collection in collections:
             if isinstance(collection, dict):
                 categories.add(collection['name'])
@@ -30,7 +32,7 @@ def get_all_sources(recipes):
     sources = set()
     
     for recipe in recipes:
-        source = recipe.get('source', '').strip()
+        source = get_recipe_field(recipe, 'source', '').strip()
         if source:  # Only add non-empty sources
             sources.add(source)
     
@@ -38,6 +40,7 @@ def get_all_sources(recipes):
     return sorted(list(sources))
 
 
+@traced_page("browse_recipes")
 def view_all_recipes():
     """Display all recipes with search and filter options"""
     st.header("View All Recipes")
@@ -3,118 +3,28 @@ Recipe display components for browse recipes page
 """
 
 import streamlit as st
-import requests
-from PIL import Image
-import io
-import numpy as np
-from src.pages.browse_recipes.session_state import add_to_weekly_recipes
+from src.pages.browse_recipes.session_state import add_to_weekly_recipes, get_recipe_index
 from src.config.categories import get_category_group, get_group_color, get_group_icon
 from src.models.recipe import Recipe
-from src.components.price_estimator import display_budget_badge
+from src.models.meal_plan import get_recipe_field, get_recipe_id
+from src.utils.image_cache import get_recipe_thumbnail
+from src.utils.tracing import traced
 
 
-@st.cache_data
+@traced("browse_recipes.process_recipe_image")
 def process_recipe_image(image_url, target_height=200):
     """
-    Download and process recipe image to fixed dimensions with center cropping
-    Uses 16:9 aspect ratio for consistent appearance with robust retry logic
+    Get the recipe image center-cropped to 16:9 at a fixed height
     
     Args:
         image_url: URL of the image to process
         target_height: Desired height in pixels
     
     Returns:
-        PIL Image object or None if processing fails
+        Static URL of the image (JPEG bytes when static file serving is off), or None
+        if the image could not be loaded
     """
-    if not image_url:
-        return None
-    
-    # Retry configuration
-    max_retries = 3
-    timeout = 15
-    backoff_factor = 1.0
-    
-    for attempt in range(max_retries):
-        try:
-            # Calculate timeout with backoff
-            current_timeout = timeout + (attempt * backoff_factor)
-            
-            # Download image with session for connection pooling
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
-            
-            response = session.get(
-                image_url, 
-                timeout=current_timeout,
-                stream=True  # Stream for large images
-            )
-            response.raise_for_status()
-            
-            # Open image with PIL
-            img = Image.open(io.BytesIO(response.content))
-            
-            # Convert to RGB if necessary (handles RGBA, etc.)
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # Calculate target dimensions (16:9 aspect ratio)
-            target_width = int(target_height * 16 / 9)
-            
-            # Get original dimensions
-            original_width, original_height = img.size
-            original_aspect = original_width / original_height
-            target_aspect = target_width / target_height
-            
-            # Determine how to crop to target aspect ratio
-            if original_aspect > target_aspect:
-                # Image is wider than target - crop width
-                new_height = original_height
-                new_width = int(new_height * target_aspect)
-                left = (original_width - new_width) // 2
-                top = 0
-                right = left + new_width
-                bottom = original_height
-            else:
-                # Image is taller than target - crop height
-                new_width = original_width
-                new_height = int(new_width / target_aspect)
-                left = 0
-                top = (original_height - new_height) // 2
-                right = original_width
-                bottom = top + new_height
-            
-            # Crop image to target aspect ratio
-            img = img.crop((left, top, right, bottom))
-            
-            # Resize to final dimensions
-            processed_img = img.resize((target_width, target_height), Image.Resampling.LANCZOS)
-            
-            return np.array(processed_img)
-            
-        except requests.exceptions.Timeout:
-            if attempt < max_retries - 1:
-                continue
-            print(f"Image download timeout after {max_retries} attempts: {image_url}")
-            return None
-            
-        except requests.exceptions.ConnectionError as e:
-            if "Failed to resolve" in str(e) or "getaddrinfo failed" in str(e):
-                print(f"DNS resolution failed for image: {image_url}")
-                return None
-            elif attempt < max_retries - 1:
-                continue
-            print(f"Connection error after {max_retries} attempts: {str(e)}")
-            return None
-            
-        except (requests.RequestException, Image.UnidentifiedImageError, Exception) as e:
-            if attempt < max_retries - 1:
-                continue
-            print(f"Failed to process image after {max_retries} attempts: {str(e)}")
-            return None
-    
-    return None
+    return get_recipe_thumbnail(image_url, target_height)
 
 
 def display_recipe_card(recipe, idx):
@@ -130,16 +40,16 @@ def display_recipe_card(recipe, idx):
         recipe_name = recipe.get_name()
     else:
         # Legacy dictionary format
-        image_url = recipe.get('image')
-        photo_data = recipe.get('photo', {})
+        image_url = get_recipe_field(recipe, 'image')
+        photo_data = get_recipe_field(recipe, 'photo', {})
 
         if not image_url and photo_data.get('hasPhoto'):
             image_url = photo_data.get('url')
 
         # Calculate total time
-        total_time = recipe.get('total_time', 0) or 0
-        prep_time = recipe.get('prep_time', 0) or 0
-        cook_time = recipe.get('cook_time', 0) or 0
+        total_time = get_recipe_field(recipe, 'total_time', 0) or 0
+        prep_time = get_recipe_field(recipe, 'prep_time', 0) or 0
+        cook_time = get_recipe_field(recipe, 'cook_time', 0) or 0
 
         # Use total_time if available, otherwise calculate from prep + cook time
         if total_time > 0:
@@ -148,10 +58,10 @@ def display_recipe_card(recipe, idx):
             total_minutes = (prep_time + cook_time) // 60 if (prep_time + cook_time) > 0 else 0
 
         # Get categories from collections only
-        collections = recipe.get('collections', [])
+        collections = get_recipe_field(recipe, 'collections', [])
         collection_names = [c['name'] if isinstance(c, dict) else c for c in collections]
-        rating = recipe.get('rating', 0)
-        recipe_name = recipe.get('name', 'Unnamed Recipe')
+        rating = get_recipe_field(recipe, 'rating', 0)
+        recipe_name = get_recipe_field(recipe, 'name', 'Unnamed Recipe')
 
     # Build rating stars
     if rating > 0:
@@ -169,7 +79,7 @@ def display_recipe_card(recipe, idx):
         if image_url:
             processed_image = process_recipe_image(image_url, target_height=200)
             if processed_image is not None:
-                st.image(processed_image, width="stretch")
+                st.image(processed_image, width="stretch", output_format="JPEG")
             else:
                 st.markdown("🖼️ *Image could not be loaded*")
                 st.markdown("")  # Add some vertical space
@@ -202,15 +112,17 @@ def display_recipe_card(recipe, idx):
         if isinstance(recipe, Recipe):
             source = recipe.source.strip()
         else:
-            source = recipe.get('source', '').strip()
+            source = get_recipe_field(recipe, 'source', '').strip()
 
         if source:
             badges_markdown += f":green-badge[📚 {source}] "
 
         # Add price badge for Recipe objects
         if isinstance(recipe, Recipe):
-            cost_per_serving = recipe.get_cost_per_serving()
+            from src.models.recipe_graph import get_recipe_cost_per_serving
+            cost_per_serving = get_recipe_cost_per_serving(recipe, get_recipe_index().get_graph())
             if cost_per_serving > 0:
+                from src.components.price_estimator import display_budget_badge
                 price_badge = display_budget_badge(cost_per_serving)
                 if price_badge:
                     badges_markdown += price_badge
@@ -239,13 +151,8 @@ def display_recipe_card(recipe, idx):
             type="secondary",
             icon=":material/visibility:"
         ):
-            # Set the selected recipe and navigate
-            if isinstance(recipe, Recipe):
-                recipe_name = recipe.get_name()
-            else:
-                recipe_name = recipe.get('name', '')
-
-            st.session_state.selected_recipe_name = recipe_name
+            # Set the selected recipe (by ID) and navigate
+            st.session_state.selected_recipe_id = get_recipe_id(recipe)
             st.switch_page("src/pages/view_recipe/main.py")
         
         # Add to this week's recipes button (bottom)
@@ -277,8 +184,8 @@ def display_recipe_details(recipe, idx):
                 'display': ing.get_display_text()
             })
     else:
-        prep_steps = recipe.get('preparation_steps', [])
-        ingredients = recipe.get('ingredients', [])
+        prep_steps = get_recipe_field(recipe, 'preparation_steps', [])
+        ingredients = get_recipe_field(recipe, 'ingredients', [])
 
         # Convert ingredients to a consistent format
         if isinstance(ingredients, list):
@@ -3,8 +3,11 @@ Recipe filtering functionality for browse recipes page
 """
 
 from src.config.categories import get_category_group, get_group_color
+from src.models.meal_plan import get_recipe_field
+from src.utils.tracing import traced
 
 
+@traced("filter_recipes")
 def filter_recipes(recipes, search_term, categories, sources):
     """Filter recipes based on search criteria"""
     filtered = recipes
@@ -15,12 +18,12 @@ def filter_recipes(recipes, search_term, categories, sources):
         search_filtered = []
         for r in filtered:
             # Check recipe name
-            if search_lower in r.get('name', '').lower():
+            if search_lower in get_recipe_field(r, 'name', '').lower():
                 search_filtered.append(r)
                 continue
             
             # Check ingredients (handle both list and dict formats)
-            ingredients = r.get('ingredients', {})
+            ingredients = get_recipe_field(r, 'ingredients', {})
             if isinstance(ingredients, dict):
                 # New format: {ingredient: quantity}
                 if any(search_lower in ing.lower() for ing in ingredients.keys()):
@@ -33,7 +36,7 @@ def filter_recipes(recipes, search_term, categories, sources):
                     continue
             
             # Check collections for search terms
-            collections = r.get('collections', [])
+            collections = get_recipe_field(r, 'collections', [])
             collection_names = [c['name'] if isinstance(c, dict) else c for c in collections]
             if any(search_lower in coll.lower() for coll in collection_names):
                 search_filtered.append(r)
@@ -47,7 +50,7 @@ def filter_recipes(recipes, search_term, categories, sources):
             recipe_categories = set()
             
             # Add from collections - handle both old format (strings) and new format (objects)
-            collections = r.get('collections', [])
+            collections = get_recipe_field(r, 'collections', [])
             collection_names = [c['name'] if isinstance(c, dict) else c for c in collections]
             recipe_categories.update(c.lower() for c in collection_names)
             
@@ -60,13 +63,13 @@ def filter_recipes(recipes, search_term, categories, sources):
     # Filter by sources (only apply filter if sources are selected)
     if sources:
         def matches_sources(r):
-            recipe_source = r.get('source', '').strip()
+            recipe_source = get_recipe_field(r, 'source', '').strip()
             # Check if recipe source matches any of the selected sources
             return recipe_source in sources
         
         filtered = [r for r in filtered if matches_sources(r)]
     
     # Sort by rating (descending - highest first, unrated last)
-    filtered = sorted(filtered, key=lambda r: r.get('rating', 0), reverse=True)
+    filtered = sorted(filtered, key=lambda r: get_recipe_field(r, 'rating', 0), reverse=True)
     
     return filtered
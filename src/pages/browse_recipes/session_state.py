@@ -4,10 +4,27 @@ Session state management for browse recipes page
 
 import streamlit as st
 import logging
+from src.data.recipe_index import RecipeIndex
+from src.models.meal_plan import (
+    PlanSlot,
+    PLAN_FORMAT_VERSION,
+    get_recipe_id,
+    migrate_plan_entries,
+    migrate_weekly_plans,
+    serialize_plan_entries,
+    serialize_weekly_plans
+)
+from src.utils.memory_accounting import register_evictable, touch
+from src.utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
+# The loaded corpus and its index are reloaded when missing, so a session over its
+# memory cap may drop them while they are not in use
+register_evictable('recipe_corpus', 'default_recipes', 'recipe_index', 'default_recipes_loaded')
 
+
+@traced("browse_recipes.initialize_session_state")
 def initialize_session_state():
     """Initialize session state for recipes if not already set"""
     # Initialize recipe storage in session state
@@ -42,6 +59,7 @@ def load_default_recipes():
         default_recipes = load_defaults()
         if default_recipes:
             st.session_state.default_recipes = default_recipes
+            st.session_state.recipe_index = RecipeIndex(default_recipes)
             logger.info(f"Loaded {len(default_recipes)} default recipes")
             st.session_state.default_recipes_loaded = True
         else:
@@ -62,17 +80,30 @@ def load_recipes_from_drive():
         
         storage = get_google_drive_storage()
         if storage:
+            # Stored plans may hold full recipe copies (legacy format) - migrate them
+            # to recipe ID references resolved against the shared corpus
+            index = get_recipe_index()
+            id_by_name = dict(zip(index.names, index.ids))
+            
             # Load meal plans
             meal_plans_data = storage.load_meal_plans()
             if meal_plans_data:
-                st.session_state.weekly_plans = meal_plans_data.get('weekly_plans', {})
+                st.session_state.weekly_plans = migrate_weekly_plans(
+                    meal_plans_data.get('weekly_plans', {}), id_by_name
+                )
                 logger.info(f"Loaded {len(st.session_state.weekly_plans)} meal plans from Drive")
             
             # Load weekly recipes
             weekly_data = storage.load_weekly_recipes()
             if weekly_data:
-                st.session_state.weekly_recipes = weekly_data.get('current_week', [])
+                st.session_state.weekly_recipes = migrate_plan_entries(
+                    weekly_data.get('current_week', []), id_by_name
+                )
                 logger.info(f"Loaded {len(st.session_state.weekly_recipes)} weekly recipes from Drive")
+                
+                # Rewrite legacy plans in the compact format
+                if weekly_data.get('format_version', 1) < PLAN_FORMAT_VERSION:
+                    save_weekly_recipes()
             
             st.session_state.recipes_loaded_from_drive = True
             
@@ -103,10 +134,11 @@ def save_weekly_recipes():
         
         storage = get_google_drive_storage()
         if storage:
-            # Prepare weekly recipes data
+            # Prepare weekly recipes data (recipe ID references only)
             weekly_data = {
-                'current_week': st.session_state.get('weekly_recipes', []),
-                'weekly_plans': st.session_state.get('weekly_plans', {})
+                'format_version': PLAN_FORMAT_VERSION,
+                'current_week': serialize_plan_entries(st.session_state.get('weekly_recipes', [])),
+                'weekly_plans': serialize_weekly_plans(st.session_state.get('weekly_plans', {}))
             }
             
             # Save weekly recipes
@@ -119,6 +151,7 @@ def save_weekly_recipes():
 
 def get_all_recipes():
     """Get all available recipes from session state with fallback"""
+    touch('recipe_corpus')
     all_recipes = []
     
     # Add default recipes first
@@ -146,6 +179,27 @@ def get_all_recipes():
     return all_recipes
 
 
+def get_recipe_index():
+    """
+    Get the shared recipe index for the loaded corpus.
+    
+    The index is built once per corpus and kept in session state; it is only rebuilt
+    when the default recipes are replaced.
+    """
+    corpus = st.session_state.get('default_recipes')
+    if not corpus:
+        get_all_recipes()
+        corpus = st.session_state.get('default_recipes', [])
+    
+    index = st.session_state.get('recipe_index')
+    if index is None or index.corpus is not corpus:
+        index = RecipeIndex(corpus)
+        st.session_state.recipe_index = index
+    
+    touch('recipe_corpus')
+    return index
+
+
 def get_recipe_counts():
     """Get counts of recipes from different sources"""
     counts = {
@@ -167,7 +221,7 @@ def get_default_recipes_info():
 
 
 def add_to_weekly_recipes(recipe):
-    """Add a recipe to the weekly recipes"""
+    """Add a recipe to the weekly recipes (stored as an ID reference)"""
     if 'weekly_recipes' not in st.session_state:
         st.session_state.weekly_recipes = []
-    st.session_state.weekly_recipes.append(recipe)
+    st.session_state.weekly_recipes.append(PlanSlot(recipe_id=get_recipe_id(recipe)))
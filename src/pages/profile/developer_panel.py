@@ -0,0 +1,194 @@
+"""
+Developer panel for the profile page - rerun timing histograms, memory usage and exports
+"""
+
+import pandas as pd
+import streamlit as st
+from src.utils.drive_metrics import CALL_BUDGET, drive_metrics
+from src.utils.image_cache import image_cache, thumbnail_store
+from src.utils.memory_accounting import (
+    cache_usage,
+    get_session_cap_bytes,
+    memory_registry,
+    SESSION_CAP_ENV_VAR,
+    session_usage,
+    shared_usage
+)
+from src.utils.tracing import (
+    export_json,
+    export_prometheus,
+    is_tracing_enabled,
+    set_tracing_enabled,
+    tracer
+)
+
+
+def display_developer_panel():
+    """Display per-page span histograms, recent reruns and the trace exports"""
+    st.header("Developer")
+
+    enabled = st.toggle(
+        "Record rerun timings",
+        value=is_tracing_enabled(),
+        help="Applies to every session of this server process"
+    )
+    if enabled != is_tracing_enabled():
+        set_tracing_enabled(enabled)
+
+    display_drive_metrics()
+    display_memory_usage()
+
+    histograms = tracer.histograms()
+    if not histograms:
+        st.info("No spans recorded yet. Use the app with tracing on to collect timings.")
+        return
+
+    # Histograms per page
+    st.subheader("Span timings per page")
+    rows = [{
+        'Page': h.page,
+        'Span': h.span,
+        'Calls': h.count,
+        'Total (ms)': h.total * 1000,
+        'Mean (ms)': h.mean * 1000,
+        'p50 (ms)': h.quantile(0.5) * 1000,
+        'p95 (ms)': h.quantile(0.95) * 1000,
+        'Max (ms)': h.max * 1000
+    } for h in histograms]
+    pages = sorted({row['Page'] for row in rows})
+    for page, tab in zip(pages, st.tabs(pages)):
+        with tab:
+            st.dataframe(
+                pd.DataFrame([row for row in rows if row['Page'] == page]).drop(columns='Page'),
+                hide_index=True,
+                width='stretch',
+                column_config={
+                    column: st.column_config.NumberColumn(format="%.1f")
+                    for column in ('Total (ms)', 'Mean (ms)', 'p50 (ms)', 'p95 (ms)', 'Max (ms)')
+                }
+            )
+
+    # Recent reruns
+    st.subheader("Recent reruns")
+    st.dataframe(
+        pd.DataFrame([{
+            'Started': rerun.started_at,
+            'Page': rerun.page,
+            'Duration (ms)': round(rerun.duration * 1000, 1),
+            'Slowest span': max(rerun.spans.items(), key=lambda item: item[1][1])[0] if rerun.spans else ''
+        } for rerun in tracer.reruns()]),
+        hide_index=True,
+        width='stretch'
+    )
+
+    # Exports
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button("⬇️ JSON", export_json(), file_name="traces.json",
+                           mime="application/json", width='stretch')
+    with col2:
+        st.download_button("⬇️ Prometheus", export_prometheus(), file_name="traces.prom",
+                           mime="text/plain", width='stretch')
+    with col3:
+        if st.button("🗑️ Reset", width='stretch'):
+            tracer.reset()
+            drive_metrics.reset()
+            memory_registry.reset()
+            st.rerun()
+
+
+def display_drive_metrics():
+    """Display Google Drive API calls by operation, file and caller"""
+    st.subheader("Google Drive API calls")
+    stats = drive_metrics.stats()
+    if not stats:
+        st.caption("No Drive calls recorded yet.")
+        return
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("Calls", sum(s.calls for s in stats))
+    col2.metric("Errors", sum(s.errors for s in stats))
+    col3.metric("Retries", sum(s.retries for s in stats))
+    col4.metric("KB transferred", f"{sum(s.bytes_sent + s.bytes_received for s in stats) / 1024:.1f}")
+    col5.metric("Reruns over budget", drive_metrics.budget_warnings, help=f"More than {CALL_BUDGET} calls in one rerun")
+
+    st.dataframe(
+        pd.DataFrame([{
+            'Operation': s.operation,
+            'File': s.file,
+            'Caller': s.caller,
+            'Calls': s.calls,
+            'Errors': s.errors,
+            'Retries': s.retries,
+            'Mean (ms)': round(s.mean_seconds * 1000, 1),
+            'Max (ms)': round(s.max_seconds * 1000, 1),
+            'Sent (B)': s.bytes_sent,
+            'Received (B)': s.bytes_received
+        } for s in stats]),
+        hide_index=True,
+        width='stretch'
+    )
+
+
+def _usage_frame(usage, show_eviction: bool = False) -> pd.DataFrame:
+    rows = []
+    for u in usage:
+        row = {
+            'Name': u.name,
+            'Entries': u.entries,
+            'Size (KB)': round(u.bytes / 1024, 1) if u.bytes is not None else None
+        }
+        if show_eviction:
+            row['Evictable'] = u.evictable
+            row['Last used (rerun)'] = u.last_used
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def display_memory_usage():
+    """Display memory used by this session's state, all sessions, the caches and shared structures"""
+    st.subheader("Memory")
+
+    usage = session_usage()
+    sessions = memory_registry.sessions()
+    cap_bytes = get_session_cap_bytes()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("This session (MB)", f"{sum(u.bytes or 0 for u in usage) / (1024 * 1024):.1f}")
+    col2.metric("Session cap (MB)", f"{cap_bytes / (1024 * 1024):.0f}" if cap_bytes else "None",
+                help=f"Set with {SESSION_CAP_ENV_VAR} when the server starts. Over the cap, least recently "
+                     "used evictable entries are dropped and reloaded when needed")
+    col3.metric("Sessions tracked", len(sessions),
+                help="Sessions are measured at the end of each rerun while a cap is set or timings are recorded")
+    col4.metric("Evictions", sum(m.evictions for m in sessions))
+
+    tabs = st.tabs(["This session", "Sessions", "Caches", "Shared"])
+    with tabs[0]:
+        st.dataframe(_usage_frame(usage, show_eviction=True), hide_index=True, width='stretch')
+    with tabs[1]:
+        if sessions:
+            st.dataframe(
+                pd.DataFrame([{
+                    'Session': m.session_id[:8],
+                    'Size (MB)': round(m.bytes / (1024 * 1024), 2),
+                    'Entries': m.entries,
+                    'Reruns': m.reruns,
+                    'Evictions': m.evictions,
+                    'Updated': m.to_dict()['updated_at']
+                } for m in sessions]),
+                hide_index=True,
+                width='stretch'
+            )
+        else:
+            st.caption("No sessions measured yet.")
+    with tabs[2]:
+        images = image_cache.stats()
+        st.caption(f"Image cache: {images.entries} photos, {images.bytes / (1024 * 1024):.1f} of "
+                   f"{images.max_bytes / (1024 * 1024):.0f} MB, {images.hits} hits, {images.derived} resized "
+                   f"from a larger image, {images.downloads} downloads, {images.evictions} evictions")
+        thumbnails = thumbnail_store.stats()
+        st.caption(f"Thumbnails on disk: {thumbnails.files} files, {thumbnails.bytes / (1024 * 1024):.1f} of "
+                   f"{thumbnails.max_bytes / (1024 * 1024):.0f} MB, {thumbnails.writes} written, "
+                   f"{thumbnails.deletions} deleted")
+        st.dataframe(_usage_frame(cache_usage()), hide_index=True, width='stretch')
+    with tabs[3]:
+        st.dataframe(_usage_frame(shared_usage()), hide_index=True, width='stretch')
@@ -4,6 +4,8 @@ Profile page - Display user profile information
 
 import streamlit as st
 from src.utils.settings import save_user_settings_to_drive
+from src.utils.developer_access import is_developer
+from src.utils.tracing import traced_page
 
 
 def on_meals_per_week_change():
@@ -18,6 +20,7 @@ def on_meals_per_week_change():
         st.toast(f"❌ Error saving settings: {str(e)}", icon="❌")
 
 
+@traced_page("profile")
 def profile():
     """Display user profile information with tabs"""
     st.title("👤 Profile")
@@ -26,8 +29,13 @@ def profile():
     if "meals_per_week" not in st.session_state:
         st.session_state.meals_per_week = 3
     
-    # Create tabs
-    tab1, tab2 = st.tabs(["📋 Subscription", "👤 Personal Information"])
+    # Create tabs (the developer tab only for the configured developers)
+    tab_labels = ["📋 Subscription", "👤 Personal Information"]
+    if is_developer(getattr(st.user, 'email', None), getattr(st.user, 'email_verified', True)):
+        tab_labels.append("🛠️ Developer")
+    # Switching tabs reruns the page so only the open tab's body runs
+    tabs = st.tabs(tab_labels, key="profile_tab", on_change="rerun")
+    tab1, tab2 = tabs[0], tabs[1]
     
     with tab1:
         st.header("Subscription Details")
@@ -91,5 +99,11 @@ def profile():
         if st.button("🚪 Logout", width='stretch', type="primary"):
             st.logout()
 
+    if len(tabs) > 2 and tabs[2].open:
+        with tabs[2]:
+            # The panel's tables need pandas, so it is only imported when shown
+            from src.pages.profile.developer_panel import display_developer_panel
+            display_developer_panel()
+
 
 profile()
@@ -8,6 +8,7 @@ from src.pages.this_week.recipe_components import (
 )
 from src.pages.this_week.session_manager import WeeklyRecipeManager
 from src.pages.this_week.week_utils import get_relative_week_label
+from src.utils.tracing import traced_page
 
 
 def display_header() -> None:
@@ -41,6 +42,26 @@ def display_recipes(recipes: list, week_offset: int) -> None:
 
 
 
+def display_shopping_list(week_offset: int) -> None:
+    """Display the aggregated shopping list for a week, grouped by category
+    
+    Args:
+        week_offset: Week offset of the plan to build the list for
+    """
+    shopping_list = WeeklyRecipeManager.get_shopping_list(week_offset)
+    
+    with st.expander(f"🛒 Shopping List ({len(shopping_list)} items)", expanded=False):
+        if not len(shopping_list):
+            st.info("No ingredient data available for this week's recipes.")
+            return
+        
+        for category, items in shopping_list.get_items_by_category().items():
+            st.markdown(f"**{category.replace('_', ' ').title()}**")
+            for item in items:
+                quantity = item.format_quantity()
+                st.markdown(f"- {item.name}" + (f" — {quantity}" if quantity else ""))
+
+
 def display_week_tab(week_offset: int) -> None:
     """Display content for a single week tab
     
@@ -72,6 +93,9 @@ def display_week_tab(week_offset: int) -> None:
     if recipes:
         display_recipes(recipes, week_offset)
         
+        # Aggregated shopping list for the week
+        display_shopping_list(week_offset)
+        
         # Add action buttons
         col1, col2 = st.columns(2)
         with col1:
@@ -100,6 +124,7 @@ def display_week_tab(week_offset: int) -> None:
                 st.rerun()
 
 
+@traced_page("this_week")
 def main() -> None:
     """Main orchestrator function for the Weekly Meal Plans page"""
     # Initialize session state and ensure recipes are loaded
@@ -3,115 +3,26 @@ Recipe display components for the This Week page
 """
 
 import streamlit as st
-import requests
-from PIL import Image
-import io
-import numpy as np
 from src.pages.this_week.session_manager import WeeklyRecipeManager
+from src.models.meal_plan import get_recipe_field, get_recipe_id
+from src.utils.image_cache import get_recipe_thumbnail
+from src.utils.tracing import traced
 
 
-@st.cache_data
+@traced("this_week.process_recipe_image")
 def process_recipe_image(image_url, target_height=200):
     """
-    Download and process recipe image to fixed dimensions with center cropping
-    Uses 16:9 aspect ratio for consistent appearance with robust retry logic
+    Get the recipe image center-cropped to 16:9 at a fixed height
     
     Args:
         image_url: URL of the image to process
         target_height: Desired height in pixels
     
     Returns:
-        PIL Image object or None if processing fails
+        Static URL of the image (JPEG bytes when static file serving is off), or None
+        if the image could not be loaded
     """
-    if not image_url:
-        return None
-    
-    # Retry configuration
-    max_retries = 3
-    timeout = 15
-    backoff_factor = 1.0
-    
-    for attempt in range(max_retries):
-        try:
-            # Calculate timeout with backoff
-            current_timeout = timeout + (attempt * backoff_factor)
-            
-            # Download image with session for connection pooling
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
-            
-            response = session.get(
-                image_url, 
-                timeout=current_timeout,
-                stream=True  # Stream for large images
-            )
-            response.raise_for_status()
-            
-            # Open image with PIL
-            img = Image.open(io.BytesIO(response.content))
-            
-            # Convert to RGB if necessary (handles RGBA, etc.)
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # Calculate target dimensions (16:9 aspect ratio)
-            target_width = int(target_height * 16 / 9)
-            
-            # Get original dimensions
-            original_width, original_height = img.size
-            original_aspect = original_width / original_height
-            target_aspect = target_width / target_height
-            
-            # Determine how to crop to target aspect ratio
-            if original_aspect > target_aspect:
-                # Image is wider than target - crop width
-                new_height = original_height
-                new_width = int(new_height * target_aspect)
-                left = (original_width - new_width) // 2
-                top = 0
-                right = left + new_width
-                bottom = original_height
-            else:
-                # Image is taller than target - crop height
-                new_width = original_width
-                new_height = int(new_width / target_aspect)
-                left = 0
-                top = (original_height - new_height) // 2
-                right = original_width
-                bottom = top + new_height
-            
-            # Crop image to target aspect ratio
-            img = img.crop((left, top, right, bottom))
-            
-            # Resize to final dimensions
-            processed_img = img.resize((target_width, target_height), Image.Resampling.LANCZOS)
-            
-            return np.array(processed_img)
-            
-        except requests.exceptions.Timeout:
-            if attempt < max_retries - 1:
-                continue
-            print(f"Image download timeout after {max_retries} attempts: {image_url}")
-            return None
-            
-        except requests.exceptions.ConnectionError as e:
-            if "Failed to resolve" in str(e) or "getaddrinfo failed" in str(e):
-                print(f"DNS resolution failed for image: {image_url}")
-                return None
-            elif attempt < max_retries - 1:
-                continue
-            print(f"Connection error after {max_retries} attempts: {str(e)}")
-            return None
-            
-        except (requests.RequestException, Image.UnidentifiedImageError, Exception) as e:
-            if attempt < max_retries - 1:
-                continue
-            print(f"Failed to process image after {max_retries} attempts: {str(e)}")
-            return None
-    
-    return None
+    return get_recipe_thumbnail(image_url, target_height)
 
 
 def display_recipe_card(recipe: dict, meal_number: int, idx: int, week_offset: int = 0) -> None:
@@ -125,16 +36,16 @@ def display_recipe_card(recipe: dict, meal_number: int, idx: int, week_offset: i
     """
     
     # Get recipe data
-    image_url = recipe.get('image') or recipe.get('picture')
-    photo_data = recipe.get('photo', {})
+    image_url = get_recipe_field(recipe, 'image') or get_recipe_field(recipe, 'picture')
+    photo_data = get_recipe_field(recipe, 'photo', {})
     
     if not image_url and photo_data.get('hasPhoto'):
         image_url = photo_data.get('url')
     
     # Calculate total time
-    total_time = recipe.get('total_time', 0) or 0
-    prep_time = recipe.get('prep_time', 0) or 0
-    cook_time = recipe.get('cook_time', 0) or 0
+    total_time = get_recipe_field(recipe, 'total_time', 0) or 0
+    prep_time = get_recipe_field(recipe, 'prep_time', 0) or 0
+    cook_time = get_recipe_field(recipe, 'cook_time', 0) or 0
     
     # Use total_time if available, otherwise calculate from prep + cook time
     if total_time > 0:
@@ -143,20 +54,20 @@ def display_recipe_card(recipe: dict, meal_number: int, idx: int, week_offset: i
         total_minutes = (prep_time + cook_time) // 60 if (prep_time + cook_time) > 0 else 0
     
     # Get categories
-    collections = recipe.get('collections', [])
+    collections = get_recipe_field(recipe, 'collections', [])
     collection_names = [c['name'] if isinstance(c, dict) else c for c in collections]
-    tags = recipe.get('tags', [])
+    tags = get_recipe_field(recipe, 'tags', [])
     all_tags = collection_names + tags
     
     # Build rating stars
-    rating = recipe.get('rating', 0)
+    rating = get_recipe_field(recipe, 'rating', 0)
     if rating > 0:
         stars = ':material/star:' * rating
     else:
         stars = None
     
     # Recipe name (truncate if too long)
-    recipe_name = recipe.get('name', 'Unnamed Recipe')
+    recipe_name = get_recipe_field(recipe, 'name', 'Unnamed Recipe')
     if len(recipe_name) > 50:
         recipe_name = recipe_name[:47] + "..."
     
@@ -166,7 +77,7 @@ def display_recipe_card(recipe: dict, meal_number: int, idx: int, week_offset: i
         if image_url:
             processed_image = process_recipe_image(image_url, target_height=200)
             if processed_image is not None:
-                st.image(processed_image, width="stretch")
+                st.image(processed_image, width="stretch", output_format="JPEG")
             else:
                 st.markdown("🖼️ *Image could not be loaded*")
                 st.markdown("")  # Add some vertical space
@@ -190,7 +101,7 @@ def display_recipe_card(recipe: dict, meal_number: int, idx: int, week_offset: i
             badges_markdown += f":gray-badge[🏷️ {tag}] "
         
         # Add source badge
-        source = recipe.get('source', '').strip()
+        source = get_recipe_field(recipe, 'source', '').strip()
         if source:
             badges_markdown += f":green-badge[📚 {source}] "
         
@@ -218,12 +129,8 @@ def display_recipe_card(recipe: dict, meal_number: int, idx: int, week_offset: i
             type="secondary",
             icon=":material/visibility:"
         ):
-            # Set the selected recipe and navigate
-            recipe_name = recipe.get('name', '')
-            if 'selected_recipe_name' not in st.session_state:
-                st.session_state.selected_recipe_name = recipe_name
-            else:
-                st.session_state.selected_recipe_name = recipe_name
+            # Set the selected recipe (by ID) and navigate
+            st.session_state.selected_recipe_id = get_recipe_id(recipe)
             st.switch_page("src/pages/view_recipe/main.py")
         
         # Remove from this week's plan button (bottom)
@@ -242,8 +149,8 @@ def display_recipe_card(recipe: dict, meal_number: int, idx: int, week_offset: i
 
 def display_recipe_details(recipe, idx):
     """Display full recipe details in an expander"""
-    prep_steps = recipe.get('preparation_steps', [])
-    ingredients = recipe.get('ingredients', [])
+    prep_steps = get_recipe_field(recipe, 'preparation_steps', [])
+    ingredients = get_recipe_field(recipe, 'ingredients', [])
     
     # Always show the expander, even if no detailed data is available
     with st.expander("View Full Recipe Details"):
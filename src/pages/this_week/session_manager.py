@@ -3,10 +3,18 @@ Session state management for the This Week page
 """
 
 import streamlit as st
-from typing import List, Dict, Any
+from typing import List, Any
 import logging
 import random
 from src.pages.this_week.week_utils import get_week_key
+from src.models.meal_plan import (
+    PlanSlot,
+    PLAN_FORMAT_VERSION,
+    get_recipe_id,
+    serialize_plan_entries,
+    serialize_weekly_plans
+)
+from src.utils.memory_accounting import register_evictable, touch
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +24,7 @@ class WeeklyRecipeManager:
     
     SESSION_KEY = 'weekly_recipes'
     WEEKLY_PLANS_KEY = 'weekly_plans'
+    SHOPPING_LISTS_KEY = 'weekly_shopping_lists'
     
     @classmethod
     def initialize(cls) -> None:
@@ -33,10 +42,11 @@ class WeeklyRecipeManager:
             
             storage = get_google_drive_storage()
             if storage:
-                # Prepare weekly recipes data
+                # Prepare weekly recipes data (recipe ID references only)
                 weekly_data = {
-                    'current_week': st.session_state.get(cls.SESSION_KEY, []),
-                    'weekly_plans': st.session_state.get(cls.WEEKLY_PLANS_KEY, {})
+                    'format_version': PLAN_FORMAT_VERSION,
+                    'current_week': serialize_plan_entries(st.session_state.get(cls.SESSION_KEY, [])),
+                    'weekly_plans': serialize_weekly_plans(st.session_state.get(cls.WEEKLY_PLANS_KEY, {}))
                 }
                 
                 # Save weekly recipes
@@ -52,24 +62,69 @@ class WeeklyRecipeManager:
             return False
     
     @classmethod
-    def get_recipes(cls) -> List[Dict[str, Any]]:
-        """Get the current week's recipes from session state
+    def _get_recipe_index(cls):
+        """Get the shared recipe index used to resolve plan slots"""
+        try:
+            from src.pages.browse_recipes.session_state import get_recipe_index
+            return get_recipe_index()
+        except Exception as e:
+            logger.error(f"Could not load recipe index to resolve plan: {e}")
+            return None
+    
+    @classmethod
+    def resolve_slots(cls, slots: List[PlanSlot]) -> List[Any]:
+        """Resolve plan slots to recipes from the shared corpus
+        
+        Args:
+            slots: Plan slots referencing recipes by ID
+            
+        Returns:
+            List of recipes, skipping slots whose recipe is no longer available
+        """
+        if not slots:
+            return []
+        
+        index = cls._get_recipe_index()
+        if index is None:
+            return []
+        
+        recipes = []
+        for slot in slots:
+            recipe = index.get(slot.recipe_id)
+            if recipe is not None:
+                recipes.append(recipe)
+            else:
+                logger.warning(f"Recipe {slot.recipe_id} in plan not found in recipe corpus")
+        return recipes
+    
+    @classmethod
+    def get_slots(cls) -> List[PlanSlot]:
+        """Get the current week's plan slots from session state
         
         Returns:
-            List of recipe dictionaries
+            List of plan slots
         """
         cls.initialize()  # Ensure initialization
         return st.session_state[cls.SESSION_KEY]
     
     @classmethod
-    def add_recipe(cls, recipe: Dict[str, Any]) -> None:
+    def get_recipes(cls) -> List[Any]:
+        """Get the current week's recipes, resolved from the shared corpus
+        
+        Returns:
+            List of recipes
+        """
+        return cls.resolve_slots(cls.get_slots())
+    
+    @classmethod
+    def add_recipe(cls, recipe: Any) -> None:
         """Add a recipe to the weekly plan
         
         Args:
-            recipe: Recipe dictionary to add
+            recipe: Recipe to add (stored as an ID reference)
         """
         cls.initialize()
-        st.session_state[cls.SESSION_KEY].append(recipe)
+        st.session_state[cls.SESSION_KEY].append(PlanSlot(recipe_id=get_recipe_id(recipe)))
         # Auto-save to Drive
         cls.save_to_drive()
     
@@ -80,9 +135,9 @@ class WeeklyRecipeManager:
         Args:
             index: Index of recipe to remove
         """
-        recipes = cls.get_recipes()
-        if 0 <= index < len(recipes):
-            recipes.pop(index)
+        slots = cls.get_slots()
+        if 0 <= index < len(slots):
+            slots.pop(index)
             # Auto-save to Drive
             cls.save_to_drive()
     
@@ -100,7 +155,7 @@ class WeeklyRecipeManager:
         Returns:
             True if recipes exist, False otherwise
         """
-        return len(cls.get_recipes()) > 0
+        return len(cls.get_slots()) > 0
     
     @classmethod
     def get_recipe_count(cls) -> int:
@@ -109,31 +164,81 @@ class WeeklyRecipeManager:
         Returns:
             Number of recipes
         """
-        return len(cls.get_recipes())
+        return len(cls.get_slots())
     
     # New methods for multi-week support
     
     @classmethod
-    def get_recipes_for_week(cls, week_offset: int) -> List[Dict[str, Any]]:
-        """Get recipes for a specific week offset from current week
+    def get_plan_for_week(cls, week_offset: int) -> List[PlanSlot]:
+        """Get the plan slots for a specific week offset from current week
         
         Args:
             week_offset: Number of weeks from current week (0 = this week, 1 = next week, etc.)
             
         Returns:
-            List of recipe dictionaries for the specified week
+            List of plan slots for the specified week
         """
         cls.initialize()
         week_key = get_week_key(week_offset)
         return st.session_state[cls.WEEKLY_PLANS_KEY].get(week_key, [])
     
     @classmethod
-    def add_recipe_to_week(cls, recipe: Dict[str, Any], week_offset: int) -> None:
+    def get_recipes_for_week(cls, week_offset: int) -> List[Any]:
+        """Get recipes for a specific week offset from current week
+        
+        Args:
+            week_offset: Number of weeks from current week (0 = this week, 1 = next week, etc.)
+            
+        Returns:
+            List of recipes for the specified week, resolved from the shared corpus
+        """
+        return cls.resolve_slots(cls.get_plan_for_week(week_offset))
+    
+    @classmethod
+    def get_shopping_list(cls, week_offset: int):
+        """Get the aggregated shopping list for a specific week
+        
+        The list is kept in session state and synced incrementally with the week's
+        plan, so only added or removed recipes are recomputed.
+        
+        Args:
+            week_offset: Number of weeks from current week
+            
+        Returns:
+            WeeklyShoppingList for the week
+        """
+        from src.utils.shopping_list import WeeklyShoppingList
+        
+        if cls.SHOPPING_LISTS_KEY not in st.session_state:
+            st.session_state[cls.SHOPPING_LISTS_KEY] = {}
+        
+        touch('shopping_lists')
+        week_key = get_week_key(week_offset)
+        shopping_list = st.session_state[cls.SHOPPING_LISTS_KEY].get(week_key)
+        if shopping_list is None:
+            shopping_list = WeeklyShoppingList()
+            st.session_state[cls.SHOPPING_LISTS_KEY][week_key] = shopping_list
+        
+        index = cls._get_recipe_index()
+        slots = cls.get_plan_for_week(week_offset)
+        planned = []
+        if index is not None:
+            for slot in slots:
+                recipe = index.get(slot.recipe_id)
+                if recipe is not None:
+                    planned.append((recipe, slot.scale))
+        
+        shopping_list.sync(planned)
+        return shopping_list
+    
+    @classmethod
+    def add_recipe_to_week(cls, recipe: Any, week_offset: int, scale: float = 1.0) -> None:
         """Add a recipe to a specific week
         
         Args:
-            recipe: Recipe dictionary to add
+            recipe: Recipe to add (stored as an ID reference)
             week_offset: Number of weeks from current week
+            scale: Per-slot scale factor override
         """
         cls.initialize()
         week_key = get_week_key(week_offset)
@@ -141,9 +246,25 @@ class WeeklyRecipeManager:
         if week_key not in st.session_state[cls.WEEKLY_PLANS_KEY]:
             st.session_state[cls.WEEKLY_PLANS_KEY][week_key] = []
         
-        st.session_state[cls.WEEKLY_PLANS_KEY][week_key].append(recipe)
+        st.session_state[cls.WEEKLY_PLANS_KEY][week_key].append(
+            PlanSlot(recipe_id=get_recipe_id(recipe), scale=scale)
+        )
         cls.save_to_drive()
     
+    @classmethod
+    def set_slot_scale(cls, slot_index: int, week_offset: int, scale: float) -> None:
+        """Set the scale factor override for a slot in a specific week
+        
+        Args:
+            slot_index: Index of the slot in the week's plan
+            week_offset: Number of weeks from current week
+            scale: Scale factor to apply to the recipe in this slot
+        """
+        slots = cls.get_plan_for_week(week_offset)
+        if 0 <= slot_index < len(slots):
+            slots[slot_index].scale = scale
+            cls.save_to_drive()
+    
     @classmethod
     def remove_recipe_from_week(cls, recipe_index: int, week_offset: int) -> None:
         """Remove a recipe from a specific week by index
@@ -156,9 +277,9 @@ class WeeklyRecipeManager:
         week_key = get_week_key(week_offset)
         
         if week_key in st.session_state[cls.WEEKLY_PLANS_KEY]:
-            recipes = st.session_state[cls.WEEKLY_PLANS_KEY][week_key]
-            if 0 <= recipe_index < len(recipes):
-                recipes.pop(recipe_index)
+            slots = st.session_state[cls.WEEKLY_PLANS_KEY][week_key]
+            if 0 <= recipe_index < len(slots):
+                slots.pop(recipe_index)
                 cls.save_to_drive()
     
     @classmethod
@@ -187,7 +308,7 @@ class WeeklyRecipeManager:
         cls.initialize()
         
         # Check if week already has recipes (unless force is True)
-        if not force and len(cls.get_recipes_for_week(week_offset)) > 0:
+        if not force and len(cls.get_plan_for_week(week_offset)) > 0:
             return False
         
         # Get user's meals per week preference
@@ -209,12 +330,11 @@ class WeeklyRecipeManager:
         num_recipes_to_add = min(meals_per_week, len(all_recipes))
         
         # Get recipes already used in other weeks to try to avoid duplicates
-        used_recipe_names = set()
+        used_recipe_ids = set()
         for other_week in range(4):  # Check 4 weeks
             if other_week != week_offset:
-                other_week_recipes = cls.get_recipes_for_week(other_week)
-                for recipe in other_week_recipes:
-                    used_recipe_names.add(recipe.get('name', ''))
+                for slot in cls.get_plan_for_week(other_week):
+                    used_recipe_ids.add(slot.recipe_id)
         
         # Use seasonal recipe selector
         try:
@@ -222,7 +342,7 @@ class WeeklyRecipeManager:
             selected_recipes = select_seasonal_recipes(
                 all_recipes, 
                 num_recipes_to_add,
-                used_recipe_names=used_recipe_names
+                used_recipe_ids=used_recipe_ids
             )
             
             if not selected_recipes:
@@ -236,7 +356,7 @@ class WeeklyRecipeManager:
             logger.warning(f"Seasonal selection failed, falling back to random selection: {e}")
             
             # Try to select recipes not used in other weeks first
-            unused_recipes = [r for r in all_recipes if r.get('name', '') not in used_recipe_names]
+            unused_recipes = [r for r in all_recipes if get_recipe_id(r) not in used_recipe_ids]
             
             if len(unused_recipes) >= num_recipes_to_add:
                 # We have enough unused recipes
@@ -253,9 +373,11 @@ class WeeklyRecipeManager:
                 
             logger.info(f"Populated week {week_offset} with {len(selected_recipes)} random recipes (fallback)")
         
-        # Add recipes to the week
+        # Add recipes to the week as ID references into the shared corpus
         week_key = get_week_key(week_offset)
-        st.session_state[cls.WEEKLY_PLANS_KEY][week_key] = selected_recipes.copy()
+        st.session_state[cls.WEEKLY_PLANS_KEY][week_key] = [
+            PlanSlot(recipe_id=get_recipe_id(recipe)) for recipe in selected_recipes
+        ]
         cls.save_to_drive()
         
         return True
@@ -270,7 +392,7 @@ class WeeklyRecipeManager:
         Returns:
             Number of recipes for the specified week
         """
-        return len(cls.get_recipes_for_week(week_offset))
+        return len(cls.get_plan_for_week(week_offset))
     
     @classmethod
     def has_recipes_for_week(cls, week_offset: int) -> bool:
@@ -283,3 +405,7 @@ class WeeklyRecipeManager:
             True if recipes exist for the week, False otherwise
         """
         return cls.get_week_recipe_count(week_offset) > 0
+
+
+# Shopping lists are rebuilt from the plans when missing
+register_evictable('shopping_lists', WeeklyRecipeManager.SHOPPING_LISTS_KEY)
@@ -7,8 +7,9 @@ from src.pages.view_recipe.session_state import (
     initialize_session_state, 
     get_all_recipes, 
     get_selected_recipe, 
-    set_selected_recipe
+    set_selected_recipe_id
 )
+from src.pages.browse_recipes.session_state import get_recipe_index
 from src.pages.view_recipe.recipe_viewer_components import (
     display_recipe_selector,
     display_recipe_hero,
@@ -16,11 +17,12 @@ from src.pages.view_recipe.recipe_viewer_components import (
     display_instructions_section,
     display_recipe_details
 )
-from src.components.nutrition_card import display_nutrition_card, display_daily_values
-from src.components.price_estimator import display_price_card, display_price_breakdown
 from src.models.recipe import Recipe
+from src.models.meal_plan import get_recipe_id
+from src.utils.tracing import traced_page
 
 
+@traced_page("view_recipe")
 def view_recipe():
     """Main function for the recipe viewer page"""
     
@@ -39,15 +41,15 @@ def view_recipe():
     current_recipe = get_selected_recipe()
     
     # Recipe selector at the top
-    selected_recipe = display_recipe_selector(all_recipes, current_recipe)
+    selected_recipe = display_recipe_selector(get_recipe_index(), current_recipe)
     
     if not selected_recipe:
         st.error("Unable to load recipe")
         return
     
     # Update session state if selection changed
-    if current_recipe != selected_recipe:
-        set_selected_recipe(selected_recipe.get('name', ''))
+    if current_recipe is not selected_recipe:
+        set_selected_recipe_id(get_recipe_id(selected_recipe))
     
     st.divider()
     
@@ -82,22 +84,33 @@ def display_full_recipe(recipe):
 
     # Nutrition and Price sections (only for Recipe objects)
     if isinstance(recipe, Recipe):
-        # Use tabs for better organization
-        tab1, tab2 = st.tabs(["🍽️ Næring", "💰 Kostnad"])
+        # Use tabs for better organization; switching tabs reruns the page so only the
+        # open tab's body runs (and imports its component)
+        tab1, tab2 = st.tabs(["🍽️ Næring", "💰 Kostnad"], key="recipe_detail_tab", on_change="rerun")
 
-        with tab1:
-            display_nutrition_card(recipe)
-            st.markdown("")
+        # Cost and nutrition include the recipe's sub-recipes
+        graph = get_recipe_index().get_graph()
 
-            # Daily values
-            nutrition = recipe.calculate_nutrition_per_serving()
-            if nutrition:
-                display_daily_values(nutrition)
+        if tab1.open:
+            with tab1:
+                from src.components.nutrition_card import display_nutrition_card, display_daily_values
+                from src.models.recipe_graph import get_recipe_nutrition_per_serving
 
-        with tab2:
-            display_price_card(recipe)
-            st.markdown("")
-            display_price_breakdown(recipe)
+                display_nutrition_card(recipe, graph=graph)
+                st.markdown("")
+
+                # Daily values
+                nutrition = get_recipe_nutrition_per_serving(recipe, graph)
+                if nutrition:
+                    display_daily_values(nutrition)
+
+        if tab2.open:
+            with tab2:
+                from src.components.price_estimator import display_price_card, display_price_breakdown
+
+                display_price_card(recipe, graph=graph)
+                st.markdown("")
+                display_price_breakdown(recipe)
 
     # Additional details section (full width)
     st.markdown("")
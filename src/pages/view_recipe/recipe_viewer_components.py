@@ -3,125 +3,37 @@ Recipe viewer components for full-page recipe display
 """
 
 import streamlit as st
-import requests
-from PIL import Image
-import io
-import numpy as np
 from src.pages.view_recipe.session_state import add_to_weekly_recipes, get_recipe_scale_factor, set_recipe_scale_factor
-from src.utils.recipe_scaling import get_scaling_options, format_scaled_quantity
+from src.utils.recipe_scaling import get_scaling_options, parse_quantity_text, format_scaled_quantities
 from src.config.categories import get_grouped_categories, get_category_group
+from src.models.meal_plan import get_recipe_field, get_recipe_id, get_recipe_name
+from src.models.recipe import Recipe, RecipeIngredient
+from src.utils.image_cache import get_recipe_thumbnail
+from src.utils.tracing import traced
 
 
-@st.cache_data
+@traced("view_recipe.process_recipe_image_large")
 def process_recipe_image_large(image_url, target_height=400):
     """
-    Download and process recipe image for large display with center cropping
-    Uses 16:9 aspect ratio for consistent appearance with robust retry logic
+    Get the recipe image center-cropped to 16:9 at a fixed height
     
     Args:
         image_url: URL of the image to process
         target_height: Desired height in pixels (larger for full view)
     
     Returns:
-        PIL Image object or None if processing fails
+        Static URL of the image (JPEG bytes when static file serving is off), or None
+        if the image could not be loaded
     """
-    if not image_url:
-        return None
-    
-    # Retry configuration
-    max_retries = 3
-    timeout = 15
-    backoff_factor = 1.0
-    
-    for attempt in range(max_retries):
-        try:
-            # Calculate timeout with backoff
-            current_timeout = timeout + (attempt * backoff_factor)
-            
-            # Download image with session for connection pooling
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
-            
-            response = session.get(
-                image_url, 
-                timeout=current_timeout,
-                stream=True  # Stream for large images
-            )
-            response.raise_for_status()
-            
-            # Open image with PIL
-            img = Image.open(io.BytesIO(response.content))
-            
-            # Convert to RGB if necessary (handles RGBA, etc.)
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # Calculate target dimensions (16:9 aspect ratio)
-            target_width = int(target_height * 16 / 9)
-            
-            # Get original dimensions
-            original_width, original_height = img.size
-            original_aspect = original_width / original_height
-            target_aspect = target_width / target_height
-            
-            # Determine how to crop to target aspect ratio
-            if original_aspect > target_aspect:
-                # Image is wider than target - crop width
-                new_height = original_height
-                new_width = int(new_height * target_aspect)
-                left = (original_width - new_width) // 2
-                top = 0
-                right = left + new_width
-                bottom = original_height
-            else:
-                # Image is taller than target - crop height
-                new_width = original_width
-                new_height = int(new_width / target_aspect)
-                left = 0
-                top = (original_height - new_height) // 2
-                right = original_width
-                bottom = top + new_height
-            
-            # Crop image to target aspect ratio
-            img = img.crop((left, top, right, bottom))
-            
-            # Resize to final dimensions
-            processed_img = img.resize((target_width, target_height), Image.Resampling.LANCZOS)
-            
-            return np.array(processed_img)
-            
-        except requests.exceptions.Timeout:
-            if attempt < max_retries - 1:
-                continue
-            print(f"Image download timeout after {max_retries} attempts: {image_url}")
-            return None
-            
-        except requests.exceptions.ConnectionError as e:
-            if "Failed to resolve" in str(e) or "getaddrinfo failed" in str(e):
-                print(f"DNS resolution failed for image: {image_url}")
-                return None
-            elif attempt < max_retries - 1:
-                continue
-            print(f"Connection error after {max_retries} attempts: {str(e)}")
-            return None
-            
-        except (requests.RequestException, Image.UnidentifiedImageError, Exception) as e:
-            if attempt < max_retries - 1:
-                continue
-            print(f"Failed to process image after {max_retries} attempts: {str(e)}")
-            return None
-    
-    return None
+    return get_recipe_thumbnail(image_url, target_height)
 
 
 def display_recipe_hero(recipe):
     """Display the recipe hero section with large image, title and badges"""
     
     # Get recipe data
-    image_url = recipe.get('image') or recipe.get('picture')
-    photo_data = recipe.get('photo', {})
+    image_url = get_recipe_field(recipe, 'image') or get_recipe_field(recipe, 'picture')
+    photo_data = get_recipe_field(recipe, 'photo', {})
     
     if not image_url and photo_data.get('hasPhoto'):
         image_url = photo_data.get('url')
@@ -132,7 +44,7 @@ def display_recipe_hero(recipe):
         if image_url:
             processed_image = process_recipe_image_large(image_url, target_height=400)
             if processed_image is not None:
-                st.image(processed_image, width="stretch")
+                st.image(processed_image, width="stretch", output_format="JPEG")
             else:
                 # Elegant placeholder for failed image
                 st.markdown(
@@ -175,7 +87,7 @@ def display_recipe_hero(recipe):
             )
         
         # Recipe title
-        recipe_name = recipe.get('name', 'Unnamed Recipe')
+        recipe_name = get_recipe_field(recipe, 'name', 'Unnamed Recipe')
         
         # Category group tabs
         display_category_tabs(recipe)
@@ -210,7 +122,7 @@ def display_category_tabs(recipe):
     """Display category badges grouped by category type"""
     
     # Get recipe categories
-    collections = recipe.get('collections', [])
+    collections = get_recipe_field(recipe, 'collections', [])
     recipe_categories = [c['name'] if isinstance(c, dict) else c for c in collections]
     
     if not recipe_categories:
@@ -265,9 +177,9 @@ def display_recipe_badges(recipe):
     """Display recipe badges with enhanced styling"""
     
     # Calculate total time
-    total_time = recipe.get('total_time', 0) or 0
-    prep_time = recipe.get('prep_time', 0) or 0
-    cook_time = recipe.get('cook_time', 0) or 0
+    total_time = get_recipe_field(recipe, 'total_time', 0) or 0
+    prep_time = get_recipe_field(recipe, 'prep_time', 0) or 0
+    cook_time = get_recipe_field(recipe, 'cook_time', 0) or 0
     
     # Use total_time if available, otherwise calculate from prep + cook time
     if total_time > 0:
@@ -276,11 +188,11 @@ def display_recipe_badges(recipe):
         total_minutes = (prep_time + cook_time) // 60 if (prep_time + cook_time) > 0 else 0
     
     # Get categories from collections
-    collections = recipe.get('collections', [])
+    collections = get_recipe_field(recipe, 'collections', [])
     collection_names = [c['name'] if isinstance(c, dict) else c for c in collections]
     
     # Build rating
-    rating = recipe.get('rating', 0)
+    rating = get_recipe_field(recipe, 'rating', 0)
     
     # Create badge columns (removed category badge - now shown above title)
     col1, col2, col3 = st.columns([1, 1, 1])
@@ -302,7 +214,7 @@ def display_recipe_badges(recipe):
     
     with col3:
         # Source badge
-        source = recipe.get('source', '').strip()
+        source = get_recipe_field(recipe, 'source', '').strip()
         if source:
             st.markdown(f":violet-badge[📚 {source}]")
         else:
@@ -311,7 +223,7 @@ def display_recipe_badges(recipe):
 
 def display_recipe_scaling(recipe):
     """Display recipe scaling slider and rating widget"""
-    recipe_name = recipe.get('name', 'Unnamed Recipe')
+    recipe_name = get_recipe_field(recipe, 'name', 'Unnamed Recipe')
     
     # Get scaling options
     options, default_idx, label = get_scaling_options(recipe)
@@ -379,9 +291,11 @@ def is_ingredient_heading(ingredient):
 def display_ingredients_section(recipe):
     """Display ingredients in a 2-column layout with comments below items in italics"""
     
-    ingredients = recipe.get('ingredients', [])
-    recipe_name = recipe.get('name', 'Unnamed Recipe')
-    current_scale = get_recipe_scale_factor(recipe_name)
+    if isinstance(recipe, Recipe):
+        ingredients = recipe.recipe_ingredients
+    else:
+        ingredients = get_recipe_field(recipe, 'ingredients', [])
+    current_scale = get_recipe_scale_factor(get_recipe_name(recipe) or 'Unnamed Recipe')
     
     # Always show the expander expanded
     with st.expander("Ingredients", expanded=True):
@@ -393,17 +307,53 @@ def display_ingredients_section(recipe):
                 # Old dict format
                 ingredients_list = [{'name': k, 'quantity': v} for k, v in ingredients.items()]
             
+            # Scale all quantities at once
+            scaled_quantities = get_scaled_ingredient_quantities(ingredients_list, current_scale)
+            
             # Display each ingredient
-            for ingredient in ingredients_list:
-                display_ingredient_row(ingredient, current_scale)
+            for ingredient, scaled_quantity in zip(ingredients_list, scaled_quantities):
+                display_ingredient_row(ingredient, scaled_quantity)
         else:
             st.info("📋 No ingredients list available for this recipe.")
 
 
-def display_ingredient_row(ingredient, scale_factor=1.0):
+def get_scaled_ingredient_quantities(ingredients, scale_factor=1.0):
+    """Get display quantities for a list of ingredients, scaled in one pass"""
+    parsed_quantities = []
+    originals = []
+    
+    for ingredient in ingredients:
+        if isinstance(ingredient, RecipeIngredient):
+            # Parsed once at corpus load
+            parsed_quantities.append(ingredient.parse_quantity())
+            originals.append(" ".join(part for part in (ingredient.quantity, ingredient.unit) if part))
+        elif isinstance(ingredient, dict):
+            quantity = ingredient.get('quantity', '').strip()
+            parsed_quantities.append(parse_quantity_text(quantity) if quantity else None)
+            originals.append(quantity)
+        else:
+            parsed_quantities.append(None)
+            originals.append("")
+    
+    if scale_factor == 1.0:
+        return originals
+    
+    return format_scaled_quantities(parsed_quantities, scale_factor, originals)
+
+
+def display_ingredient_row(ingredient, scaled_quantity=""):
     """Display a single ingredient in a 2-column row format with comments below items in italics"""
-    if isinstance(ingredient, dict):
-        quantity = ingredient.get('quantity', '').strip()
+    if isinstance(ingredient, RecipeIngredient):
+        note = ", ".join(part for part in (ingredient.preparation, ingredient.note) if part)
+        
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            st.markdown(scaled_quantity)
+        with col2:
+            st.markdown(ingredient.get_ingredient_name())
+            if note:
+                st.markdown(f"*{note}*")
+    elif isinstance(ingredient, dict):
         name = ingredient.get('name', ingredient.get('rawText', '')).strip()
         note = ingredient.get('note', '').strip()
 
@@ -413,12 +363,6 @@ def display_ingredient_row(ingredient, scale_factor=1.0):
             heading_name = name.rstrip()  # Remove trailing spaces
             st.subheader(heading_name)
         else:
-            # Scale the quantity if we have one
-            if quantity and scale_factor != 1.0:
-                scaled_quantity = format_scaled_quantity(quantity, scale_factor)
-            else:
-                scaled_quantity = quantity
-
             # Display regular ingredient in 2 columns
             col1, col2 = st.columns([1, 3])
             with col1:
@@ -441,7 +385,7 @@ def display_ingredient_row(ingredient, scale_factor=1.0):
 def display_instructions_section(recipe):
     """Display preparation steps in an expanded expander with enhanced layout"""
     
-    prep_steps = recipe.get('preparation_steps', [])
+    prep_steps = get_recipe_field(recipe, 'preparation_steps', [])
     
     # Always show the expander expanded
     with st.expander("Instructions", expanded=True):
@@ -472,22 +416,22 @@ def display_recipe_details(recipe):
     details = {}
     
     # Difficulty
-    difficulty = recipe.get('difficulty')
+    difficulty = get_recipe_field(recipe, 'difficulty')
     if difficulty:
         details['Difficulty'] = difficulty
     
     # Cuisine
-    cuisine = recipe.get('cuisine')
+    cuisine = get_recipe_field(recipe, 'cuisine')
     if cuisine:
         details['Cuisine'] = cuisine
     
     # Notes or description
-    notes = recipe.get('notes') or recipe.get('description')
+    notes = get_recipe_field(recipe, 'notes') or get_recipe_field(recipe, 'description')
     if notes:
         details['Notes'] = notes
     
     # URL
-    url = recipe.get('url')
+    url = get_recipe_field(recipe, 'url')
     if url:
         details['Recipe URL'] = f"[View Original]({url})"
     
@@ -501,33 +445,44 @@ def display_recipe_details(recipe):
                     st.markdown(f"**{key}:** {value}")
 
 
-def display_recipe_selector(recipes, current_selection):
-    """Display recipe selector with search functionality"""
-    if not recipes:
+def display_recipe_selector(index, current_selection, max_results=20):
+    """Display a type-ahead recipe picker backed by the recipe search index
+    
+    Only the current recipe and the top matches for the search text are sent to the
+    selectbox, so the option list stays small regardless of corpus size.
+    """
+    if not len(index):
         st.error("No recipes available")
         return None
     
-    recipe_names = [recipe.get('name', f'Recipe {idx}') for idx, recipe in enumerate(recipes)]
-    
-    # Find current index
-    current_idx = 0
-    if current_selection:
-        current_name = current_selection.get('name', '')
-        if current_name in recipe_names:
-            current_idx = recipe_names.index(current_name)
-    
-    # Recipe selector
-    selected_name = st.selectbox(
-        "Choose a recipe to view:",
-        options=recipe_names,
-        index=current_idx,
-        key="recipe_selector",
-        help="Select any recipe to view it in full detail"
-    )
-    
-    # Find and return selected recipe
-    for recipe in recipes:
-        if recipe.get('name') == selected_name:
-            return recipe
-    
-    return recipes[0] if recipes else None
\ No newline at end of file
+    current_id = get_recipe_id(current_selection) if current_selection else None
+    if current_id not in index:
+        current_id = index.ids[0]
+    
+    col1, col2 = st.columns([1, 2])
+    
+    with col1:
+        query = st.text_input(
+            "Search recipes:",
+            key="recipe_search",
+            placeholder="Type to search...",
+            help="Search recipes by name"
+        )
+    
+    # Current recipe first, followed by the top matches
+    matches = index.search(query, limit=max_results)
+    options = [current_id] + [recipe_id for recipe_id in matches if recipe_id != current_id]
+    
+    with col2:
+        selected_id = st.selectbox(
+            "Choose a recipe to view:",
+            options=options,
+            index=0,
+            format_func=lambda recipe_id: get_recipe_name(index.get(recipe_id)),
+            key="recipe_selector",
+            help=f"Showing up to {max_results} matches - refine the search to narrow the list"
+        )
+        if query and not matches:
+            st.caption("No recipes match your search")
+    
+    return index.get(selected_id) or index.first()
@@ -4,15 +4,19 @@ Session state management for view recipe page
 
 import streamlit as st
 import logging
+from src.models.meal_plan import PlanSlot, get_recipe_id, get_recipe_name
+from src.pages.browse_recipes.session_state import get_recipe_index
+from src.utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
+@traced("view_recipe.initialize_session_state")
 def initialize_session_state():
     """Initialize session state for recipe viewing"""
-    # Initialize selected recipe index
-    if 'selected_recipe_idx' not in st.session_state:
-        st.session_state.selected_recipe_idx = 0
+    # Initialize selected recipe (by ID, resolved through the shared recipe index)
+    if 'selected_recipe_id' not in st.session_state:
+        st.session_state.selected_recipe_id = None
     
     # Initialize recipe scaling state
     if 'recipe_scale_factors' not in st.session_state:
@@ -26,7 +30,8 @@ def initialize_session_state():
     if not st.session_state.default_recipes:
         load_default_recipes()
     
-    # Check if we navigated here with a specific recipe selected
+    # Check if we navigated here with a specific recipe selected by name
+    # (cards navigate by setting selected_recipe_id directly)
     if 'selected_recipe_name' in st.session_state:
         set_selected_recipe(st.session_state.selected_recipe_name)
         # Clear the navigation state
@@ -79,34 +84,39 @@ def get_all_recipes():
 
 def get_selected_recipe():
     """Get the currently selected recipe"""
-    recipes = get_all_recipes()
-    if not recipes:
+    index = get_recipe_index()
+    if not len(index):
         return None
     
-    # Ensure selected index is within bounds
-    if st.session_state.selected_recipe_idx >= len(recipes):
-        st.session_state.selected_recipe_idx = 0
+    # Fall back to the first recipe if nothing (or an unknown ID) is selected
+    recipe = index.get(st.session_state.get('selected_recipe_id'))
+    if recipe is None:
+        recipe = index.first()
+        st.session_state.selected_recipe_id = get_recipe_id(recipe)
     
-    if st.session_state.selected_recipe_idx < 0:
-        st.session_state.selected_recipe_idx = 0
-    
-    return recipes[st.session_state.selected_recipe_idx]
+    return recipe
+
+
+def set_selected_recipe_id(recipe_id):
+    """Set the selected recipe by ID"""
+    if recipe_id in get_recipe_index():
+        st.session_state.selected_recipe_id = recipe_id
+        return True
+    return False
 
 
 def set_selected_recipe(recipe_name):
     """Set the selected recipe by name"""
-    recipes = get_all_recipes()
-    for idx, recipe in enumerate(recipes):
-        if recipe.get('name') == recipe_name:
-            st.session_state.selected_recipe_idx = idx
-            return True
+    recipe_id = get_recipe_index().get_id_by_name(recipe_name)
+    if recipe_id:
+        st.session_state.selected_recipe_id = recipe_id
+        return True
     return False
 
 
 def get_recipe_names():
     """Get list of all recipe names for selectbox"""
-    recipes = get_all_recipes()
-    return [recipe.get('name', f'Recipe {idx}') for idx, recipe in enumerate(recipes)]
+    return get_recipe_index().names
 
 
 def get_recipe_scale_factor(recipe_name: str) -> float:
@@ -131,11 +141,12 @@ def add_to_weekly_recipes(recipe):
         st.session_state.weekly_recipes = []
     
     # Check if recipe is already in weekly recipes
-    recipe_name = recipe.get('name', '')
-    existing_names = [r.get('name', '') for r in st.session_state.weekly_recipes]
+    recipe_id = get_recipe_id(recipe)
+    recipe_name = get_recipe_name(recipe)
+    existing_ids = {slot.recipe_id for slot in st.session_state.weekly_recipes}
     
-    if recipe_name not in existing_names:
-        st.session_state.weekly_recipes.append(recipe)
+    if recipe_id not in existing_ids:
+        st.session_state.weekly_recipes.append(PlanSlot(recipe_id=recipe_id))
         logger.info(f"Added '{recipe_name}' to weekly recipes")
         return True
     else:
@@ -0,0 +1,185 @@
+"""
+Benchmark the indexed ingredient matcher against the old linear library scan
+
+Matches every ingredient line of the recipe corpus against an ingredient library,
+once with the two-pass scan RecipeMigrator used to do and once with IngredientMatcher,
+and reports timings, agreement and the confidence breakdown.
+
+The migrated corpus (src/data/migrated_recipes.json) no longer carries ingredient
+lines, so unless --recipes points at raw recipe dictionaries, deterministic ingredient
+lines are synthesized for every recipe in the corpus.
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add project root to path so we can import our modules
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.data.default_recipes import load_default_recipes
+from src.models.meal_plan import get_recipe_id, get_recipe_name
+from src.scripts.benchmarks.synthetic_data import BASE_INGREDIENTS
+from src.utils.ingredient_extractor import IngredientExtractor
+from src.utils.ingredient_matcher import IngredientMatcher
+
+# Ways a line can name an ingredient differently from the library
+PREFIXES = ['', '', '', 'fersk ', 'finhakket ', 'frossen ', 'økologisk ']
+SUFFIXES = ['', '', '', ' (ca. 200 g)', ' til steking', ' etter smak']
+UNITS = ['', 'g', 'dl', 'ss', 'ts', 'stk', 'pakke', 'boks', 'fedd']
+
+
+def legacy_normalize_ingredient_name(name):
+    """IngredientExtractor._normalize_ingredient_name as it was before the compiled parser"""
+    # Remove extra whitespace
+    name = re.sub(r'\s+', ' ', name.strip())
+
+    # Remove parenthetical notes
+    name = re.sub(r'\([^)]*\)', '', name).strip()
+
+    # Remove size descriptors that vary
+    size_terms = ['stor', 'liten', 'medium', 'små', 'store']
+    words = name.split()
+    words = [w for w in words if w not in size_terms]
+    name = ' '.join(words)
+
+    return name.strip()
+
+
+def legacy_generate_ingredient_id(name):
+    """IngredientExtractor._generate_ingredient_id as it was before the compiled parser"""
+    ingredient_id = name.lower()
+    ingredient_id = re.sub(r'[æ]', 'ae', ingredient_id)
+    ingredient_id = re.sub(r'[ø]', 'o', ingredient_id)
+    ingredient_id = re.sub(r'[å]', 'aa', ingredient_id)
+    ingredient_id = re.sub(r'[^a-z0-9\s]', '', ingredient_id)
+    ingredient_id = re.sub(r'\s+', '_', ingredient_id)
+
+    return ingredient_id
+
+
+def legacy_normalize_name_for_matching(name):
+    """RecipeMigrator._normalize_name_for_matching as it was before IngredientMatcher"""
+    return legacy_normalize_ingredient_name(name).lower()
+
+
+def legacy_find_ingredient_id(name, ingredient_library):
+    """RecipeMigrator._find_ingredient_id as it was before IngredientMatcher (two linear passes)"""
+    if not name:
+        return 'unknown_ingredient'
+
+    # Normalize the name
+    normalized_name = legacy_normalize_name_for_matching(name)
+
+    # Direct match by name
+    for ingredient_id, ingredient in ingredient_library.items():
+        if normalized_name == legacy_normalize_name_for_matching(ingredient.names.get('no', '')):
+            return ingredient_id
+
+    # Partial match
+    for ingredient_id, ingredient in ingredient_library.items():
+        ingredient_name = ingredient.names.get('no', '').lower()
+        if normalized_name in ingredient_name or ingredient_name in normalized_name:
+            return ingredient_id
+
+    # If no match found, generate ID from name
+    return legacy_generate_ingredient_id(name)
+
+
+def misspell(name, rng):
+    """Swap two neighbouring letters of a name"""
+    if len(name) < 4:
+        return name
+    i = rng.randrange(1, len(name) - 2)
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+
+def synthesize_recipes(corpus, lines_per_recipe, seed):
+    """Create raw recipe dictionaries with deterministic ingredient lines for a corpus"""
+    rng = random.Random(seed)
+    recipes = []
+    for recipe in corpus:
+        lines = []
+        for _ in range(lines_per_recipe):
+            name = rng.choice(BASE_INGREDIENTS)
+            if rng.random() < 0.05:
+                name = misspell(name, rng)
+            name = rng.choice(PREFIXES) + name + rng.choice(SUFFIXES)
+            unit = rng.choice(UNITS)
+            lines.append(f"{rng.randint(1, 5)} {unit} {name}".replace('  ', ' '))
+        recipes.append({'id': get_recipe_id(recipe), 'name': get_recipe_name(recipe), 'ingredients': lines})
+    return recipes
+
+
+def load_raw_recipes(path):
+    """Load raw recipe dictionaries from a JSON file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data if isinstance(data, list) else data.get('recipes', [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingredient matching for the migration pipeline")
+    parser.add_argument('--recipes', type=Path, help="JSON file with raw recipe dictionaries (default: synthesize lines)")
+    parser.add_argument('--lines-per-recipe', type=int, default=10, help="Synthesized ingredient lines per recipe")
+    parser.add_argument('--seed', type=int, default=42, help="Seed for synthesized ingredient lines")
+    args = parser.parse_args()
+
+    if args.recipes:
+        recipes = load_raw_recipes(args.recipes)
+    else:
+        recipes = synthesize_recipes(load_default_recipes(), args.lines_per_recipe, args.seed)
+
+    # Library from the unmodified base names, so prefixed, suffixed and misspelled lines need partial/fuzzy matches
+    if args.recipes:
+        ingredient_library = IngredientExtractor.build_ingredient_library(recipes)
+    else:
+        ingredient_library = IngredientExtractor.build_ingredient_library([{'ingredients': BASE_INGREDIENTS}])
+
+    names = [parsed.name for recipe in recipes for parsed in IngredientExtractor.extract_ingredients_from_recipe(recipe)]
+
+    print(f"Recipes: {len(recipes)}")
+    print(f"Ingredient lines: {len(names)}")
+    print(f"Library ingredients: {len(ingredient_library)}")
+
+    start = time.perf_counter()
+    legacy_ids = [legacy_find_ingredient_id(name, ingredient_library) for name in names]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = IngredientMatcher(ingredient_library)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matches = [matcher.match(name) for name in names]
+    match_seconds = time.perf_counter() - start
+
+    agreement = sum(1 for legacy_id, match in zip(legacy_ids, matches) if legacy_id == match.ingredient_id)
+    # Lines where the two disagree, by how the matcher resolved them
+    differences = Counter(match.method for legacy_id, match in zip(legacy_ids, matches) if legacy_id != match.ingredient_id)
+    methods = Counter(match.method for match in matches)
+
+    print("\nTimings:")
+    print(f"  Linear scan: {legacy_seconds * 1000:.1f} ms ({len(names) / max(legacy_seconds, 1e-9):,.0f} lines/s)")
+    print(f"  Matcher build: {build_seconds * 1000:.1f} ms")
+    print(f"  Matcher: {match_seconds * 1000:.1f} ms ({len(names) / max(match_seconds, 1e-9):,.0f} lines/s)")
+    print(f"  Speedup: {legacy_seconds / max(match_seconds + build_seconds, 1e-9):.1f}x (including build)")
+
+    print("\nMatches:")
+    for method in ('exact', 'partial', 'fuzzy', 'generated'):
+        print(f"  {method}: {methods.get(method, 0)}")
+    print(f"  Same ID as linear scan: {agreement}/{len(names)}")
+
+    print("\nDifferent ID from linear scan:")
+    for method in ('exact', 'partial', 'fuzzy', 'generated'):
+        print(f"  {method}: {differences.get(method, 0)}")
+
+
+if __name__ == "__main__":
+    main()
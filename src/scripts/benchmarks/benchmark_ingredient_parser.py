@@ -0,0 +1,125 @@
+"""
+Microbenchmark for the single-pass ingredient line parser
+
+Parses the same ingredient lines with the previous per-step parser (inline regexes,
+a scan per preparation term and per category keyword) and with
+src/utils/ingredient_parser.py, and reports lines per second for both, plus how
+often the two agree.
+
+Lines come from --recipes (raw recipe dictionaries) or are synthesized for the
+recipe corpus as in benchmark_ingredient_matcher.py.
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path so we can import our modules
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.data.default_recipes import load_default_recipes
+from src.scripts.benchmarks.benchmark_ingredient_matcher import load_raw_recipes, synthesize_recipes
+from src.utils import ingredient_parser
+
+
+def legacy_extract_preparation(text):
+    """Preparation split as done before the single-pass parser"""
+    text = text.strip()
+    for prep_term in sorted(ingredient_parser.PREPARATION_TERMS):
+        if prep_term in text:
+            name = text.replace(prep_term, '').strip()
+            name = re.sub(r'\s+', ' ', name)
+            return name.strip(','), prep_term
+    return text, ""
+
+
+def legacy_normalize_name(name):
+    name = re.sub(r'\s+', ' ', name.strip())
+    name = re.sub(r'\([^)]*\)', '', name).strip()
+    words = [w for w in name.split() if w not in ['stor', 'liten', 'medium', 'små', 'store']]
+    return ' '.join(words).strip()
+
+
+def legacy_generate_id(name):
+    ingredient_id = name.lower()
+    ingredient_id = re.sub(r'[æ]', 'ae', ingredient_id)
+    ingredient_id = re.sub(r'[ø]', 'o', ingredient_id)
+    ingredient_id = re.sub(r'[å]', 'aa', ingredient_id)
+    ingredient_id = re.sub(r'[^a-z0-9\s]', '', ingredient_id)
+    return re.sub(r'\s+', '_', ingredient_id)
+
+
+def legacy_category(name):
+    name_lower = name.lower()
+    for category, keywords in ingredient_parser.CATEGORY_KEYWORDS:
+        if any(keyword in name_lower for keyword in keywords):
+            return category
+    return ingredient_parser.DEFAULT_CATEGORY
+
+
+def legacy_parse(text):
+    """Parse a line the way IngredientExtractor did before, returning (quantity, unit, name, prep, id, category)"""
+    text = text.strip().lower()
+    quantity, unit, rest = "", "", text
+
+    match = re.match(r'^(\d+(?:[.,]\d+)?)\s+([a-zæøå]+)\s+(.+)$', text) or \
+        re.match(r'^(\d+/\d+)\s+([a-zæøå]+)\s+(.+)$', text)
+    if match:
+        quantity, unit, rest = match.groups()
+        quantity = quantity.replace(',', '.')
+        if unit not in ingredient_parser.ALL_UNITS:
+            rest = f"{unit} {rest}"
+            unit = ""
+
+    name, preparation = legacy_extract_preparation(rest)
+    normalized = legacy_normalize_name(name)
+    return quantity, unit, name, preparation, legacy_generate_id(normalized), legacy_category(normalized)
+
+
+def parse(text):
+    parsed = ingredient_parser.parse_ingredient_line(text)
+    return parsed.quantity, parsed.unit, parsed.name, parsed.preparation, parsed.ingredient_id, parsed.category
+
+
+def time_parser(func, lines, repeat):
+    """Best-of-repeat time to parse all lines"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            func(line)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingredient line parsing")
+    parser.add_argument('--recipes', type=Path, help="JSON file with raw recipe dictionaries (default: synthesize lines)")
+    parser.add_argument('--lines-per-recipe', type=int, default=10, help="Synthesized ingredient lines per recipe")
+    parser.add_argument('--seed', type=int, default=42, help="Seed for synthesized ingredient lines")
+    parser.add_argument('--repeat', type=int, default=5, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    if args.recipes:
+        recipes = load_raw_recipes(args.recipes)
+    else:
+        recipes = synthesize_recipes(load_default_recipes(), args.lines_per_recipe, args.seed)
+    lines = [line for recipe in recipes for line in recipe.get('ingredients', [])
+             if isinstance(line, str) and line.strip()]
+
+    legacy_seconds = time_parser(legacy_parse, lines, args.repeat)
+    seconds = time_parser(parse, lines, args.repeat)
+    agreement = sum(1 for line in lines if legacy_parse(line) == parse(line))
+
+    print(f"Ingredient lines: {len(lines)}")
+    print(f"  Per-step parser: {legacy_seconds * 1000:.1f} ms ({len(lines) / max(legacy_seconds, 1e-9):,.0f} lines/s)")
+    print(f"  Single-pass parser: {seconds * 1000:.1f} ms ({len(lines) / max(seconds, 1e-9):,.0f} lines/s)")
+    print(f"  Speedup: {legacy_seconds / max(seconds, 1e-9):.1f}x")
+    print(f"  Identical results: {agreement}/{len(lines)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Synthetic recipe corpus generator for scale testing
+
+Generates corpora of any size (10k to 1M+ recipes) in the migrated recipes format
+(the Recipe.to_dict() schema), so loading, search, selection and memory can be
+measured well beyond the real corpus. Field distributions are drawn from the real
+corpus (src/data/migrated_recipes.json): category and season combinations, meal
+types, difficulties, servings, ratings, times, sources, step counts and step texts
+are sampled from real recipes, and names are recombined from real names.
+
+The migrated corpus carries no ingredient lines, so ingredients are drawn from the
+usage counts of the legacy recipe export when it is available, and otherwise from a
+fixed list of common ingredients with a Zipf-like popularity. A matching ingredient
+library is written next to the corpus so the generated recipes link when loaded.
+
+Photo URLs point at the local stand-in image server (image_server.py), which serves
+a generated image for any recipe ID:
+
+    python src/scripts/benchmarks/generate_corpus.py --recipes 100000 --output /tmp/corpus_100k.json
+    python src/scripts/benchmarks/image_server.py --port 8765
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# Add project root to path so we can import our modules
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.data.default_recipes import get_default_recipes_file, get_migrated_recipes_file
+from src.models.ingredient import create_basic_ingredient
+from src.scripts.benchmarks.synthetic_data import BASE_INGREDIENTS
+from src.utils import ingredient_parser
+from src.utils.ingredient_extractor import IngredientExtractor
+from src.utils.parallel_migration import RecipeStreamWriter
+from src.utils.recipe_stream import build_ingredient_library_streaming, iter_recipes
+
+DEFAULT_IMAGE_BASE_URL = "http://localhost:8765"
+
+# Units with typical quantities for synthesized ingredient lines
+UNIT_QUANTITIES: List[Tuple[str, List[str]]] = [
+    ('g', ['50', '100', '200', '250', '400', '500']),
+    ('dl', ['0.5', '1', '2', '3', '4']),
+    ('ss', ['1', '2', '3']),
+    ('ts', ['0.5', '1', '2']),
+    ('stk', ['1', '2', '3', '4', '6']),
+    ('fedd', ['1', '2', '3']),
+    ('pakke', ['1']),
+    ('boks', ['1', '2']),
+    ('', ['1', '2', '3', ''])
+]
+PREPARATIONS = ['', '', '', '', 'hakket', 'revet', 'skåret', 'finhakket', 'presset']
+
+# Ingredient lines per recipe when the corpus has none to sample from
+MIN_INGREDIENTS = 4
+MAX_INGREDIENTS = 14
+
+
+class CorpusProfile:
+    """Field distributions of the real corpus, sampled one field at a time"""
+
+    def __init__(self, recipes: List[Dict[str, Any]]):
+        if not recipes:
+            raise ValueError("Cannot profile an empty corpus")
+        self.recipes = recipes
+        self.name_words = [r.get('names', {}).get('no', '').split() for r in recipes]
+        self.name_words = [words for words in self.name_words if words]
+        self.ingredient_counts = [len(r.get('recipe_ingredients', [])) for r in recipes
+                                  if r.get('recipe_ingredients')]
+
+    def sample(self, rng: random.Random, field: str) -> Any:
+        """Value of a field from a random real recipe"""
+        return rng.choice(self.recipes).get(field)
+
+    def sample_name(self, rng: random.Random) -> str:
+        """Join the start of one real name with the end of another"""
+        first, second = rng.choice(self.name_words), rng.choice(self.name_words)
+        head = first[:rng.randint(1, len(first))]
+        tail = second[rng.randint(0, len(second) - 1):] if len(second) > 1 else []
+        return ' '.join(head + tail)
+
+    def sample_ingredient_count(self, rng: random.Random) -> int:
+        if self.ingredient_counts:
+            return rng.choice(self.ingredient_counts)
+        return rng.randint(MIN_INGREDIENTS, MAX_INGREDIENTS)
+
+
+def load_ingredient_weights() -> Tuple[List[str], List[float]]:
+    """
+    Ingredient names with popularity weights
+
+    Uses the ingredient usage counts of the legacy recipe export when it is available,
+    otherwise the common ingredient list with Zipf-like weights.
+    """
+    legacy_file = get_default_recipes_file()
+    if legacy_file.exists():
+        library = build_ingredient_library_streaming(str(legacy_file))
+        used = [(ingredient.names.get('no', ''), getattr(ingredient, 'usage_count', 0))
+                for ingredient in library.values()]
+        used = [(name, count) for name, count in used if name and count]
+        if used:
+            names, counts = zip(*used)
+            return list(names), [float(count) for count in counts]
+    return list(BASE_INGREDIENTS), [1.0 / (rank + 1) ** 0.8 for rank in range(len(BASE_INGREDIENTS))]
+
+
+def generate_recipe(rng: random.Random, profile: CorpusProfile, ingredient_names: List[str],
+                    cumulative_weights: List[float], image_base_url: str) -> Dict[str, Any]:
+    """Generate one recipe dictionary in the Recipe.to_dict() schema"""
+    recipe_id = f"{rng.getrandbits(128):032x}"
+    name = profile.sample_name(rng)
+
+    ingredients = []
+    chosen = set()
+    for ingredient_name in rng.choices(ingredient_names, cum_weights=cumulative_weights,
+                                       k=profile.sample_ingredient_count(rng)):
+        if ingredient_name in chosen:
+            continue
+        chosen.add(ingredient_name)
+        unit, quantities = rng.choice(UNIT_QUANTITIES)
+        ingredients.append({
+            'ingredient_id': ingredient_parser.generate_ingredient_id(ingredient_name),
+            'quantity': rng.choice(quantities),
+            'unit': unit,
+            'preparation': rng.choice(PREPARATIONS),
+            'note': '',
+            'optional': rng.random() < 0.05,
+            'group': ''
+        })
+
+    steps = profile.sample(rng, 'preparation_steps') or []
+    created_at = profile.sample(rng, 'created_at') or ''
+
+    return {
+        'id': recipe_id,
+        'names': {'no': name, 'en': '', 'description_no': '', 'description_en': ''},
+        'recipe_ingredients': ingredients,
+        'preparation_steps': steps,
+        'prep_time_minutes': profile.sample(rng, 'prep_time_minutes') or 0,
+        'cook_time_minutes': profile.sample(rng, 'cook_time_minutes') or 0,
+        'rest_time_minutes': profile.sample(rng, 'rest_time_minutes') or 0,
+        'servings': profile.sample(rng, 'servings') or 4,
+        'yield_amount': 0.0,
+        'yield_unit': '',
+        'produces_ingredient': False,
+        'produced_ingredient_id': '',
+        'categories': list(profile.sample(rng, 'categories') or []),
+        'tags': ['synthetic'],
+        'difficulty': profile.sample(rng, 'difficulty') or 'easy',
+        'cuisine': profile.sample(rng, 'cuisine') or '',
+        'meal_type': profile.sample(rng, 'meal_type') or '',
+        'seasons': list(profile.sample(rng, 'seasons') or []),
+        'rating': profile.sample(rng, 'rating') or 0,
+        'source': profile.sample(rng, 'source') or '',
+        'source_url': '',
+        'author': '',
+        'photos': [{
+            'url': f"{image_base_url}/recipes/{recipe_id}.jpg",
+            'alt_text': f"Photo of {name}",
+            'caption_no': '',
+            'caption_en': '',
+            'is_primary': True
+        }],
+        'video_url': '',
+        'created_at': created_at,
+        'updated_at': created_at,
+        'version': 1
+    }
+
+
+def generate_corpus(output_path: Path, count: int, seed: int = 42,
+                    image_base_url: str = DEFAULT_IMAGE_BASE_URL) -> Dict[str, str]:
+    """
+    Stream a synthetic corpus to a migrated recipes file
+
+    Args:
+        output_path: Migrated recipes JSON file to write
+        count: Number of recipes
+        seed: Random seed (the same seed gives the same corpus)
+        image_base_url: Base URL of the image server used in photo URLs
+
+    Returns:
+        Ingredient names by ingredient ID for the ingredients used
+    """
+    rng = random.Random(seed)
+    profile = CorpusProfile([r for r in iter_recipes(str(get_migrated_recipes_file())) if isinstance(r, dict)])
+    ingredient_names, weights = load_ingredient_weights()
+    cumulative_weights = []
+    total = 0.0
+    for weight in weights:
+        total += weight
+        cumulative_weights.append(total)
+
+    used: Dict[str, str] = {}
+    start = time.perf_counter()
+    with RecipeStreamWriter(str(output_path)) as writer:
+        for i in range(count):
+            recipe = generate_recipe(rng, profile, ingredient_names, cumulative_weights, image_base_url)
+            writer.write(recipe)
+            for recipe_ingredient in recipe['recipe_ingredients']:
+                used.setdefault(recipe_ingredient['ingredient_id'], '')
+            if (i + 1) % 100000 == 0:
+                print(f"  Generated {i + 1:,} recipes ({(i + 1) / (time.perf_counter() - start):,.0f} recipes/s)")
+
+    by_id = {ingredient_parser.generate_ingredient_id(name): name for name in ingredient_names}
+    return {ingredient_id: by_id.get(ingredient_id, ingredient_id.replace('_', ' ')) for ingredient_id in used}
+
+
+def write_ingredient_library(used: Dict[str, str], library_path: Path) -> int:
+    """
+    Write the ingredient library for a generated corpus
+
+    Args:
+        used: Ingredient names by ingredient ID, as returned by generate_corpus()
+        library_path: Ingredient library JSON file to write
+
+    Returns:
+        Number of ingredients written
+    """
+    ingredient_library = {
+        ingredient_id: create_basic_ingredient(ingredient_id, name, category=ingredient_parser.determine_category(name))
+        for ingredient_id, name in used.items()
+    }
+    IngredientExtractor.save_ingredient_library(ingredient_library, str(library_path),
+                                                export_info={'extraction_method': 'synthetic_corpus'})
+    return len(ingredient_library)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic recipe corpus for scale testing")
+    parser.add_argument('--recipes', type=int, default=10000, help="Number of recipes to generate")
+    parser.add_argument('--output', type=Path, required=True, help="Migrated recipes JSON file to write")
+    parser.add_argument('--library-output', type=Path,
+                        help="Ingredient library file to write (default: <output>_ingredients.json)")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed")
+    parser.add_argument('--image-base-url', default=DEFAULT_IMAGE_BASE_URL,
+                        help="Base URL of the local image server for photo URLs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    library_output = args.library_output or args.output.with_name(f"{args.output.stem}_ingredients.json")
+
+    print(f"Generating {args.recipes:,} recipes into {args.output}...")
+    start = time.perf_counter()
+    used = generate_corpus(args.output, args.recipes, args.seed, args.image_base_url)
+    seconds = time.perf_counter() - start
+
+    ingredient_count = write_ingredient_library(used, library_output)
+
+    size_mb = args.output.stat().st_size / (1024 * 1024)
+    print(f"Wrote {args.recipes:,} recipes ({size_mb:.1f} MB) in {seconds:.1f}s")
+    print(f"Wrote {ingredient_count} ingredients to {library_output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Local stand-in image server for synthetic corpora
+
+Serves a generated JPEG for any path (e.g. /recipes/<recipe id>.jpg, as used in
+the photo URLs written by generate_corpus.py), so image fetching and processing can
+be exercised at scale without hitting the real photo host. Each path always gives
+the same image: a gradient in colours derived from the path. Optional latency,
+jitter and failure rate simulate a slow or flaky host.
+
+    python src/scripts/benchmarks/image_server.py --port 8765 --latency-ms 80 --failure-rate 0.01
+"""
+
+import argparse
+import hashlib
+import io
+import random
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from PIL import Image
+
+DEFAULT_WIDTH = 1200
+DEFAULT_HEIGHT = 800
+MAX_DIMENSION = 4000
+
+
+@lru_cache(maxsize=256)
+def render_image(path: str, width: int, height: int) -> bytes:
+    """Render the JPEG for a path: a vertical gradient between two colours derived from the path"""
+    digest = hashlib.sha256(path.encode('utf-8')).digest()
+    top, bottom = digest[:3], digest[3:6]
+
+    # Build one column of the gradient and stretch it across the width
+    column = Image.new('RGB', (1, height))
+    column.putdata([
+        tuple(int(top[c] + (bottom[c] - top[c]) * y / max(height - 1, 1)) for c in range(3))
+        for y in range(height)
+    ])
+    image = column.resize((width, height))
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=85)
+    return buffer.getvalue()
+
+
+class ImageRequestHandler(BaseHTTPRequestHandler):
+    """Answers every GET with the generated image for its path (size from ?w=&h=)"""
+
+    latency_ms = 0.0
+    jitter_ms = 0.0
+    failure_rate = 0.0
+    quiet = False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+
+        if self.failure_rate and random.random() < self.failure_rate:
+            self.send_error(503, "Simulated failure")
+            return
+
+        query = parse_qs(url.query)
+        try:
+            width = min(int(query.get('w', [DEFAULT_WIDTH])[0]), MAX_DIMENSION)
+            height = min(int(query.get('h', [DEFAULT_HEIGHT])[0]), MAX_DIMENSION)
+        except ValueError:
+            self.send_error(400, "Invalid size")
+            return
+        if width < 1 or height < 1:
+            self.send_error(400, "Invalid size")
+            return
+
+        body = render_image(url.path, width, height)
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'public, max-age=86400')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve generated stand-in recipe photos")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to bind")
+    parser.add_argument('--port', type=int, default=8765, help="Port to listen on")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Added delay per request")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Random extra delay per request, up to this")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument('--quiet', action='store_true', help="Do not log requests")
+    args = parser.parse_args()
+
+    ImageRequestHandler.latency_ms = args.latency_ms
+    ImageRequestHandler.jitter_ms = args.jitter_ms
+    ImageRequestHandler.failure_rate = args.failure_rate
+    ImageRequestHandler.quiet = args.quiet
+
+    server = ThreadingHTTPServer((args.host, args.port), ImageRequestHandler)
+    print(f"Serving stand-in images on http://{args.host}:{args.port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
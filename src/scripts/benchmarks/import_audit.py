@@ -0,0 +1,194 @@
+"""
+Import-time audit and cold start timing for the app entry point and pages
+
+Renders each target once in a fresh interpreter with Streamlit's AppTest and reports:
+- cold render time: the first run of the script, including every app module it
+  imports (Streamlit itself is imported beforehand and not counted)
+- which heavy third-party modules (PIL, numpy, pandas, googleapiclient, ...) the
+  render loaded, and the app module that first imported each of them
+- the slowest imports, from `python -X importtime`
+
+The login target is main.py without a logged-in user, i.e. the time to the first
+login page. Pages are rendered on their own, as after login.
+
+    python src/scripts/benchmarks/import_audit.py
+    python src/scripts/benchmarks/import_audit.py --targets login view_recipe --repeat 5 --output imports.json
+
+run_benchmarks.py runs the cold render timings as the cold_start benchmark.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add project root to path so we can import our modules
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+TARGETS = {
+    'login': project_root / "main.py",
+    'this_week': project_root / "src" / "pages" / "this_week" / "main.py",
+    'browse_recipes': project_root / "src" / "pages" / "browse_recipes" / "main.py",
+    'view_recipe': project_root / "src" / "pages" / "view_recipe" / "main.py",
+    'profile': project_root / "src" / "pages" / "profile" / "main.py"
+}
+
+# Third-party modules that should only load when their feature is used
+HEAVY_MODULES = ['numpy', 'pandas', 'pyarrow', 'PIL', 'requests', 'googleapiclient', 'google.oauth2',
+                 'streamlit_oauth']
+
+# Run in the child interpreter: import Streamlit, then time the first render of the script
+_RENDER_CODE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=300).run()
+seconds = time.perf_counter() - start
+print(json.dumps({'seconds': seconds, 'exceptions': len(at.exception), 'modules': sorted(sys.modules)}))
+"""
+
+
+@dataclass
+class ImportRecord:
+    """One line of `python -X importtime` output"""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+    imported_by: str = ''
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """
+    Parse `-X importtime` output into records, each with the module that imported it
+
+    Children are printed before their parent, one level deeper, so a module's
+    importer is the next record one level up.
+    """
+    records = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        module = name.strip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        records.append(ImportRecord(module, int(self_us), int(cumulative_us), depth))
+
+    pending: List[ImportRecord] = []
+    for record in records:
+        while pending and pending[-1].depth > record.depth:
+            pending.pop().imported_by = record.module
+        pending.append(record)
+    return records
+
+
+def _render(script: Path, importtime: bool = False) -> subprocess.CompletedProcess:
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', _RENDER_CODE, str(script)]
+    return subprocess.run(command, cwd=project_root, capture_output=True, text=True, check=True)
+
+
+def _result(completed: subprocess.CompletedProcess) -> Dict[str, Any]:
+    # Rendering may print logs before the result line
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def time_cold_render(script: Path, repeat: int = 3) -> List[float]:
+    """First-render times of a script, each in a fresh interpreter"""
+    return [_result(_render(script))['seconds'] for _ in range(repeat)]
+
+
+def heavy_module_cost(records: List[ImportRecord], package: str) -> Dict[str, Any]:
+    """
+    Import time of a package and the module that first imported it
+
+    Counts every import of the package (or its submodules) made from outside it, so
+    `from PIL import Image` is charged with PIL.Image and not just the PIL package.
+    """
+    def in_package(module: str) -> bool:
+        return module == package or module.startswith(package + '.')
+
+    entries = [r for r in records if in_package(r.module) and not in_package(r.imported_by)]
+    return {
+        'module': package,
+        'imported_by': (entries[0].imported_by or '(import at first use)') if entries else '',
+        'cumulative_ms': round(sum(r.cumulative_us for r in entries) / 1000, 1)
+    }
+
+
+def audit_target(name: str, script: Path, repeat: int = 3, top: int = 10) -> Dict[str, Any]:
+    """
+    Audit one target: cold render time, heavy modules loaded and the slowest imports
+
+    Args:
+        name: Target name
+        script: Streamlit script to render
+        repeat: Cold renders to time (the median is reported)
+        top: Number of slowest imports to list
+
+    Returns:
+        Audit results for the target
+    """
+    timings = time_cold_render(script, repeat)
+    completed = _render(script, importtime=True)
+    result = _result(completed)
+
+    # Imports made before the render are Streamlit's and AppTest's, not the app's
+    records = parse_importtime(completed.stderr)
+    app_start = next((i for i, record in enumerate(records)
+                      if record.module == 'streamlit.testing.v1' and record.depth == 0), -1) + 1
+    app_records = records[app_start:]
+
+    loaded = set(result['modules'])
+    heavy = [heavy_module_cost(app_records, module) for module in HEAVY_MODULES if module in loaded]
+
+    slowest = sorted((r for r in app_records if r.depth == 0 or r.module.startswith('src.')),
+                     key=lambda r: -r.cumulative_us)[:top]
+    return {
+        'target': name,
+        'script': str(script.relative_to(project_root)),
+        'cold_render_seconds': round(statistics.median(timings), 4),
+        'timings': [round(t, 4) for t in timings],
+        'exceptions': result['exceptions'],
+        'heavy_modules': heavy,
+        'slowest_imports': [{**asdict(r), 'cumulative_ms': round(r.cumulative_us / 1000, 1)} for r in slowest]
+    }
+
+
+def print_audit(audit: Dict[str, Any]) -> None:
+    print(f"\n{audit['target']} ({audit['script']}): cold render {audit['cold_render_seconds'] * 1000:.0f} ms")
+    if audit['exceptions']:
+        print(f"  {audit['exceptions']} exception(s) while rendering")
+    for heavy in audit['heavy_modules']:
+        print(f"  loads {heavy['module']:<16} {heavy['cumulative_ms']:>8.1f} ms  via {heavy['imported_by']}")
+    print("  Slowest imports:")
+    for record in audit['slowest_imports']:
+        print(f"    {record['cumulative_ms']:>8.1f} ms  {record['module']}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Audit import time and cold render time of the app")
+    parser.add_argument('--targets', nargs='+', choices=list(TARGETS), default=list(TARGETS),
+                        help="Entry point and pages to audit (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help="Cold renders per target (the median is reported)")
+    parser.add_argument('--top', type=int, default=10, help="Slowest imports to list per target")
+    parser.add_argument('--output', type=Path, help="Write the audit JSON here")
+    args = parser.parse_args(argv)
+
+    audits = []
+    for name in args.targets:
+        audits.append(audit_target(name, TARGETS[name], args.repeat, args.top))
+        print_audit(audits[-1])
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'audits': audits}, f, indent=2)
+        print(f"\nWrote audit to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
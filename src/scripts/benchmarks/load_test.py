@@ -0,0 +1,463 @@
+"""
+Headless page-render load test
+
+Simulates concurrent users driving the app pages through Streamlit's AppTest, each
+virtual user in its own thread repeating a scripted flow:
+
+  1. Browse recipes: search, then page through the results
+  2. View recipe: search, open one of the matches, scale it
+  3. This week: regenerate the week's plan
+
+AppTest runs one page script at a time (and the multipage entry point needs a
+logged-in user), so each virtual user holds one session per page. AppTest also swaps
+process-wide runtime state during a run, so reruns are executed one at a time: time
+spent waiting for other sessions' reruns is the queueing a busy server would show.
+Every rerun is timed and p50/p95/p99 latency (waiting included) is reported per flow
+step, along with the rerun time alone. Per-session memory is the
+size of everything reachable from a user's session state that no other user shares;
+what users share (cached recipes, the recipe index) is reported separately.
+
+Nothing leaves the machine:
+- Recipe corpus: a synthetic corpus (generate_corpus.py), or a copy of the real one,
+  written to a temporary data directory the app is pointed at (CHEFS_ASSISTANT_DATA_DIR)
+- Images: photo URLs point at the stand-in image server (image_server.py), run in a
+  background thread
+- Google Drive: LocalDriveStorage keeps each user's files in memory behind the real
+  storage class, so loading and saving plans runs as for a signed-in user
+
+    python src/scripts/benchmarks/load_test.py --sessions 20 --iterations 3
+    python src/scripts/benchmarks/load_test.py --sessions 50 --recipes 50000 --image-latency-ms 80
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Add project root to path so we can import our modules
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from streamlit.testing.v1 import AppTest
+
+from src.data import google_drive_storage
+from src.data.default_recipes import DATA_DIR_ENV_VAR, get_migrated_recipes_file
+from src.data.google_drive_storage import GoogleDriveRecipeStorage
+from src.models.recipe import Recipe
+from src.scripts.benchmarks.generate_corpus import generate_corpus, write_ingredient_library
+from src.scripts.benchmarks.image_server import ImageRequestHandler
+from src.scripts.benchmarks.run_benchmarks import get_peak_rss_mb
+from src.utils.drive_metrics import drive_metrics, record_drive_call
+from src.utils.memory_accounting import reachable_sizes
+from src.utils.parallel_migration import RecipeStreamWriter
+from src.utils.recipe_stream import iter_recipes
+
+PAGES_DIR = project_root / "src" / "pages"
+SEARCH_TERMS = ['kylling', 'laks', 'pasta', 'suppe', 'taco', 'salat', 'biff', 'curry', 'gryte', 'fisk']
+
+# Session state key telling the Drive stand-in which virtual user a session belongs to
+USER_KEY = '_load_test_user'
+
+# AppTest is not thread-safe: it replaces the global Runtime instance for each run
+_RUN_LOCK = threading.Lock()
+
+
+class LocalDriveStorage(GoogleDriveRecipeStorage):
+    """
+    In-memory Google Drive stand-in
+
+    Replaces only the request layer (_call/_download) with a dictionary of files, so
+    the storage logic and the Drive call metrics run unchanged.
+    """
+
+    def __init__(self, files: Dict[str, Dict[str, Any]], latency_ms: float = 0.0):
+        super().__init__(service=object())
+        self.files = files
+        self.latency_ms = latency_ms
+
+    def _call(self, operation: str, filename: str, **kwargs) -> Dict:
+        start = time.perf_counter()
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        media = kwargs.get('media_body')
+        content = media.getbytes(0, media.size()) if media is not None else b''
+        if operation == 'list':
+            file_ids = [file_id for file_id, file in self.files.items() if file['name'] == filename]
+            response = {'files': [{'id': file_id, 'name': filename} for file_id in file_ids[:1]]}
+        elif operation == 'create':
+            file_id = uuid.uuid4().hex
+            self.files[file_id] = {'name': kwargs['body']['name'], 'content': content}
+            response = {'id': file_id}
+        elif operation == 'update':
+            self.files[kwargs['fileId']]['content'] = content
+            response = {'id': kwargs['fileId']}
+        else:
+            raise ValueError(f"Unsupported Drive operation: {operation}")
+
+        record_drive_call(operation, filename, time.perf_counter() - start, len(content))
+        return response
+
+    def _download(self, file_id: str, filename: str) -> bytes:
+        start = time.perf_counter()
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        content = self.files[file_id]['content']
+        record_drive_call('get_media', filename, time.perf_counter() - start, bytes_received=len(content))
+        return content
+
+
+def install_drive_stand_in(drives: Dict[int, Dict[str, Dict[str, Any]]], latency_ms: float) -> None:
+    """Make the app get each virtual user's LocalDriveStorage instead of Google Drive"""
+    import streamlit as st
+
+    def get_local_drive_storage() -> Optional[GoogleDriveRecipeStorage]:
+        user_id = st.session_state.get(USER_KEY)
+        return LocalDriveStorage(drives[user_id], latency_ms) if user_id is not None else None
+
+    google_drive_storage.get_google_drive_storage = get_local_drive_storage
+
+
+def start_image_server(latency_ms: float, jitter_ms: float) -> ThreadingHTTPServer:
+    """Serve stand-in photos on a free local port from a background thread"""
+    ImageRequestHandler.latency_ms = latency_ms
+    ImageRequestHandler.jitter_ms = jitter_ms
+    ImageRequestHandler.quiet = True
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ImageRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def prepare_data_dir(data_dir: Path, recipes: int, seed: int, image_base_url: str) -> int:
+    """
+    Write the corpus the app loads during the test
+
+    Args:
+        data_dir: Directory to write migrated_recipes.json (and the ingredient library) to
+        recipes: Number of synthetic recipes, or 0 to copy the real corpus
+        seed: Random seed for the synthetic corpus
+        image_base_url: Base URL of the image server for photo URLs
+
+    Returns:
+        Number of recipes written
+    """
+    corpus_file = data_dir / "migrated_recipes.json"
+    if recipes:
+        used = generate_corpus(corpus_file, recipes, seed, image_base_url)
+        write_ingredient_library(used, data_dir / "ingredient_library.json")
+        return recipes
+
+    # Real corpus with its photos moved to the image server (the app builds the library)
+    count = 0
+    with RecipeStreamWriter(str(corpus_file)) as writer:
+        for recipe in iter_recipes(str(get_migrated_recipes_file())):
+            for photo in recipe.get('photos', []):
+                photo['url'] = f"{image_base_url}/recipes/{recipe['id']}.jpg"
+            writer.write(recipe)
+            count += 1
+    return count
+
+
+def load_recipe_ids_by_name(corpus_file: Path) -> Dict[str, str]:
+    """Recipe IDs by displayed name, to pick recipes from the recipe selector's labels"""
+    ids_by_name: Dict[str, str] = {}
+    for recipe_dict in iter_recipes(str(corpus_file)):
+        recipe = Recipe.from_dict(recipe_dict)
+        ids_by_name.setdefault(recipe.get_name(), recipe.id)
+    return ids_by_name
+
+
+@dataclass
+class RerunTiming:
+    """One timed interaction: a widget change or page load and the rerun it caused"""
+    user: int
+    iteration: int
+    step: str
+    wait_seconds: float
+    rerun_seconds: float
+    errors: int
+
+    @property
+    def seconds(self) -> float:
+        """Latency seen by the user: waiting for other sessions plus the rerun"""
+        return self.wait_seconds + self.rerun_seconds
+
+
+class VirtualUser:
+    """One simulated user running the scripted flow against its own page sessions"""
+
+    def __init__(self, user_id: int, seed: int, think_seconds: float, timeout: float,
+                 recipe_ids_by_name: Dict[str, str]):
+        self.user_id = user_id
+        self.recipe_ids_by_name = recipe_ids_by_name
+        self.rng = random.Random(seed + user_id)
+        self.think_seconds = think_seconds
+        self.timeout = timeout
+        self.sessions: Dict[str, AppTest] = {}
+        self.timings: List[RerunTiming] = []
+        self.error_messages: Counter = Counter()
+        self.iteration = 0
+
+    def session(self, page: str) -> AppTest:
+        """The user's session for a page, created on first use"""
+        if page not in self.sessions:
+            at = AppTest.from_file(str(PAGES_DIR / page / "main.py"), default_timeout=self.timeout)
+            at.session_state[USER_KEY] = self.user_id
+            self.sessions[page] = at
+        return self.sessions[page]
+
+    def rerun(self, step: str, action: Callable[[], AppTest]) -> AppTest:
+        """Time one interaction and the rerun it triggers"""
+        queued = time.perf_counter()
+        with _RUN_LOCK:
+            start = time.perf_counter()
+            at = action()
+            finished = time.perf_counter()
+        for exception in at.exception:
+            self.error_messages[f"{step}: {exception.message}"] += 1
+        self.timings.append(RerunTiming(self.user_id, self.iteration, step, start - queued,
+                                        finished - start, len(at.exception)))
+        if self.think_seconds:
+            time.sleep(self.rng.uniform(0, self.think_seconds))
+        return at
+
+    def browse(self, result_pages: int) -> None:
+        at = self.session("browse_recipes")
+        self.rerun("browse.open", at.run)
+        term = self.rng.choice(SEARCH_TERMS)
+        self.rerun("browse.search", lambda: at.text_input(key='search').input(term).run())
+        for _ in range(result_pages):
+            next_button = next((b for b in at.button if b.label == "Next 10 ➡️" and not b.disabled), None)
+            if next_button is None:
+                break
+            self.rerun("browse.next_page", lambda: next_button.click().run())
+
+    def view_recipe(self) -> None:
+        at = self.session("view_recipe")
+        self.rerun("view_recipe.open", at.run)
+        term = self.rng.choice(SEARCH_TERMS)
+        self.rerun("view_recipe.search", lambda: at.text_input(key='recipe_search').input(term).run())
+
+        # The selector's values are recipe IDs behind displayed names
+        selector = at.selectbox(key='recipe_selector')
+        matches = [self.recipe_ids_by_name[label] for label in selector.options[1:]
+                   if label in self.recipe_ids_by_name]
+        if matches:
+            recipe_id = self.rng.choice(matches)
+            self.rerun("view_recipe.open_recipe", lambda: selector.set_value(recipe_id).run())
+
+        if at.select_slider:
+            slider = at.select_slider[0]
+            options = [option for option in slider.options if option != slider.value]
+            if options:
+                value = self.rng.choice(options)
+                self.rerun("view_recipe.scale", lambda: slider.set_value(value).run())
+
+    def regenerate_week(self) -> None:
+        at = self.session("this_week")
+        self.rerun("this_week.open", at.run)
+        # An empty plan offers to add recipes, a filled one to refresh them
+        button = next((b for b in at.button if b.key in ('refresh_week_0', 'manual_populate_week_0')), None)
+        if button is not None:
+            self.rerun("this_week.regenerate", lambda: button.click().run())
+
+    def run(self, iterations: int, result_pages: int, start_delay: float) -> None:
+        """Run the flow the given number of times"""
+        time.sleep(start_delay)
+        for iteration in range(iterations):
+            self.iteration = iteration
+            self.browse(result_pages)
+            self.view_recipe()
+            self.regenerate_week()
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize_timings(timings: List[RerunTiming]) -> List[Dict[str, Any]]:
+    """Latency percentiles per flow step, followed by all steps together"""
+    by_step: Dict[str, List[RerunTiming]] = defaultdict(list)
+    for timing in timings:
+        by_step[timing.step].append(timing)
+    groups = list(by_step.items()) + [('all', timings)]
+
+    rows = []
+    for step, step_timings in groups:
+        seconds = sorted(t.seconds for t in step_timings)
+        rerun_seconds = sorted(t.rerun_seconds for t in step_timings)
+        rows.append({
+            'step': step,
+            'reruns': len(seconds),
+            'errors': sum(t.errors for t in step_timings),
+            'p50_ms': round(percentile(seconds, 0.50) * 1000, 1),
+            'p95_ms': round(percentile(seconds, 0.95) * 1000, 1),
+            'p99_ms': round(percentile(seconds, 0.99) * 1000, 1),
+            'max_ms': round(seconds[-1] * 1000, 1) if seconds else 0.0,
+            'rerun_p50_ms': round(percentile(rerun_seconds, 0.50) * 1000, 1),
+            'rerun_p95_ms': round(percentile(rerun_seconds, 0.95) * 1000, 1)
+        })
+    return rows
+
+
+def measure_session_memory(users: List[VirtualUser]) -> Dict[str, Any]:
+    """
+    Split session state memory into what each user holds alone and what users share
+
+    Returns:
+        Per-user own bytes (by page and in total) and the bytes reachable from more than one user
+    """
+    per_user = []
+    for user in users:
+        pages = {page: reachable_sizes([dict(at.session_state.items())])
+                 for page, at in user.sessions.items()}
+        merged = {}
+        for sizes in pages.values():
+            merged.update(sizes)
+        per_user.append((pages, merged))
+
+    owners = Counter(object_id for _, merged in per_user for object_id in merged)
+    shared = {}
+    results = []
+    for user, (pages, merged) in zip(users, per_user):
+        shared.update({object_id: size for object_id, size in merged.items() if owners[object_id] > 1})
+        results.append({
+            'user': user.user_id,
+            'own_bytes': sum(size for object_id, size in merged.items() if owners[object_id] == 1),
+            'pages': {page: sum(size for object_id, size in sizes.items() if owners[object_id] == 1)
+                      for page, sizes in pages.items()}
+        })
+    return {'sessions': results, 'shared_bytes': sum(shared.values())}
+
+
+def run_load_test(sessions: int, iterations: int, result_pages: int, think_seconds: float,
+                  ramp_up_seconds: float, seed: int, timeout: float,
+                  recipe_ids_by_name: Dict[str, str]) -> List[VirtualUser]:
+    """Run the virtual users concurrently and return them with their timings"""
+    users = [VirtualUser(user_id, seed, think_seconds, timeout, recipe_ids_by_name)
+             for user_id in range(sessions)]
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        futures = [executor.submit(user.run, iterations, result_pages, ramp_up_seconds * i / sessions)
+                   for i, user in enumerate(users)]
+        for future in futures:
+            future.result()
+    return users
+
+
+def print_report(latency: List[Dict[str, Any]], memory: Dict[str, Any], seconds: float) -> None:
+    print(f"\nRerun latency including queueing ({seconds:.1f}s wall clock)")
+    print(f"  {'Step':<26} {'Reruns':>7} {'Errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'Max ms':>9} {'Rerun p50':>10} {'Rerun p95':>10}")
+    for row in latency:
+        print(f"  {row['step']:<26} {row['reruns']:>7} {row['errors']:>7} {row['p50_ms']:>9.1f} "
+              f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f} "
+              f"{row['rerun_p50_ms']:>10.1f} {row['rerun_p95_ms']:>10.1f}")
+
+    own = sorted(session['own_bytes'] for session in memory['sessions'])
+    print("\nSession memory")
+    if own:
+        print(f"  Per session: mean {sum(own) / len(own) / 1024:,.0f} KB, "
+              f"p95 {percentile(own, 0.95) / 1024:,.0f} KB, max {own[-1] / 1024:,.0f} KB")
+    print(f"  Shared between sessions: {memory['shared_bytes'] / (1024 * 1024):,.1f} MB")
+    peak_rss = get_peak_rss_mb()
+    if peak_rss is not None:
+        print(f"  Peak process RSS: {peak_rss:,.1f} MB")
+
+    stats = drive_metrics.stats()
+    if stats:
+        print(f"\nDrive stand-in: {sum(s.calls for s in stats)} calls, "
+              f"{drive_metrics.budget_warnings} reruns over budget")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the app pages with concurrent headless sessions")
+    parser.add_argument('--sessions', type=int, default=10, help="Number of concurrent virtual users")
+    parser.add_argument('--iterations', type=int, default=2, help="Times each user runs the flow")
+    parser.add_argument('--result-pages', type=int, default=2, help="Search result pages each user pages through")
+    parser.add_argument('--think-ms', type=float, default=0.0, help="Random pause after each interaction, up to this")
+    parser.add_argument('--ramp-up', type=float, default=0.0, help="Seconds over which the users start")
+    parser.add_argument('--recipes', type=int, default=0,
+                        help="Synthetic corpus size (default: a copy of the real corpus)")
+    parser.add_argument('--image-latency-ms', type=float, default=0.0, help="Added delay per image request")
+    parser.add_argument('--image-jitter-ms', type=float, default=0.0, help="Random extra delay per image request")
+    parser.add_argument('--drive-latency-ms', type=float, default=0.0, help="Added delay per Drive request")
+    parser.add_argument('--timeout', type=float, default=120.0, help="Seconds allowed for a single rerun")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed")
+    parser.add_argument('--output', type=Path, help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    # Driving AppTest from worker threads logs a harmless missing-context warning per interaction
+    # (a filter, as Streamlit resets its loggers' levels when the config is reloaded)
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(
+        lambda record: record.levelno >= logging.ERROR)
+
+    server = start_image_server(args.image_latency_ms, args.image_jitter_ms)
+    image_base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    drives: Dict[int, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+    install_drive_stand_in(drives, args.drive_latency_ms)
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="load_test_") as workdir:
+            corpus_size = prepare_data_dir(Path(workdir), args.recipes, args.seed, image_base_url)
+            os.environ[DATA_DIR_ENV_VAR] = workdir
+            print(f"Corpus: {corpus_size:,} recipes, images from {image_base_url}")
+            print(f"Running {args.sessions} sessions x {args.iterations} iterations...")
+
+            start = time.perf_counter()
+            users = run_load_test(args.sessions, args.iterations, args.result_pages, args.think_ms / 1000,
+                                  args.ramp_up, args.seed, args.timeout,
+                                  load_recipe_ids_by_name(Path(workdir) / "migrated_recipes.json"))
+            seconds = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    timings = [timing for user in users for timing in user.timings]
+    latency = summarize_timings(timings)
+    memory = measure_session_memory(users)
+    print_report(latency, memory, seconds)
+
+    errors = sum((user.error_messages for user in users), Counter())
+    if errors:
+        print("\nErrors")
+        for message, count in errors.most_common(10):
+            print(f"  {count:>5}x {message}")
+
+    if args.output:
+        report = {
+            'run_at': datetime.now().isoformat(),
+            'settings': {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+            'corpus_recipes': corpus_size,
+            'wall_clock_seconds': round(seconds, 2),
+            'latency': latency,
+            'memory': memory,
+            'peak_rss_mb': get_peak_rss_mb(),
+            'drive_calls': [s.to_dict() for s in drive_metrics.stats()],
+            'errors': dict(errors),
+            'timings': [asdict(timing) for timing in timings]
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""
+Offline benchmark suite for the recipe hot paths
+
+Times corpus loading, the Recipe dictionary round trip, recipe filtering, the
+seasonal selector, quantity parsing/scaling, ingredient line parsing and a full
+migration against the real corpus (src/data/migrated_recipes.json) and against
+synthetic corpora made by replicating it (10x, 100x), or against a corpus from
+generate_corpus.py (--corpus). The cold_start benchmark times the first render of
+the login page and each app page in a fresh interpreter (see import_audit.py).
+Nothing touches the network.
+
+Results are written as JSON, and can be compared against a saved baseline:
+
+    python src/scripts/benchmarks/run_benchmarks.py --output results.json
+    python src/scripts/benchmarks/run_benchmarks.py --save-baseline baseline.json
+    python src/scripts/benchmarks/run_benchmarks.py --baseline baseline.json --threshold 0.15
+
+With --baseline, the exit status is 1 if any benchmark's median time regressed by
+more than the threshold.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Add project root to path so we can import our modules
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.data.default_recipes import get_migrated_recipes_file, load_migrated_recipes
+from src.models.recipe import Recipe
+from src.pages.browse_recipes.recipe_filters import filter_recipes
+from src.scripts.benchmarks.benchmark_ingredient_matcher import synthesize_recipes
+from src.scripts.benchmarks.import_audit import TARGETS as COLD_START_TARGETS, time_cold_render
+from src.utils.ingredient_extractor import IngredientExtractor
+from src.utils.parallel_migration import migrate_recipes_parallel
+from src.utils.recipe_scaling import format_scaled_quantity, parse_quantity
+from src.utils.recipe_stream import iter_recipes
+from src.utils.seasonal_recipe_selector import select_seasonal_recipes
+
+BENCHMARKS = [
+    'corpus_load', 'recipe_round_trip', 'filter_recipes', 'seasonal_selector',
+    'quantity_scaling', 'ingredient_parsing', 'migration', 'cold_start'
+]
+
+# Benchmarks of the app itself rather than the corpus, run once instead of per scale
+APP_BENCHMARKS = ['cold_start']
+
+# Collection names the seasonal selector looks for, by Season value
+SEASON_COLLECTIONS = {'winter': 'Vinter', 'spring': 'Vår', 'summer': 'Sommer', 'fall': 'Høst'}
+
+QUANTITY_UNITS = ['', 'dl', 'ss', 'ts', 'g', 'kg', 'stk', 'l', 'pakke', 'boks']
+
+
+class BenchmarkCorpus:
+    """A corpus of serialized recipes and the inputs derived from it"""
+
+    def __init__(self, recipe_dicts: List[Dict[str, Any]], source_file: Path, scale: int, workdir: Path, seed: int):
+        self.recipe_dicts = recipe_dicts
+        self.source_file = source_file
+        self.scale = scale
+        self.workdir = workdir
+        self.seed = seed
+        self._raw_recipes = None
+        self._browse_recipes = None
+        self._corpus_file = None
+
+    def __len__(self) -> int:
+        return len(self.recipe_dicts)
+
+    @property
+    def corpus_file(self) -> Path:
+        """Migrated recipes file for this corpus (the source file at scale 1)"""
+        if self._corpus_file is None:
+            if self.scale == 1:
+                self._corpus_file = self.source_file
+            else:
+                self._corpus_file = self.workdir / f"migrated_recipes_{self.scale}x.json"
+                with open(self._corpus_file, 'w', encoding='utf-8') as f:
+                    json.dump({'recipes': self.recipe_dicts}, f, ensure_ascii=False)
+        return self._corpus_file
+
+    @property
+    def raw_recipes(self) -> List[Dict[str, Any]]:
+        """Legacy recipe dictionaries with synthesized ingredient lines"""
+        if self._raw_recipes is None:
+            self._raw_recipes = synthesize_recipes(self.recipe_dicts, 10, self.seed)
+            for raw, recipe_dict in zip(self._raw_recipes, self.recipe_dicts):
+                raw['name'] = recipe_dict.get('names', {}).get('no', '')
+                raw['collections'] = recipe_dict.get('categories', []) + [
+                    SEASON_COLLECTIONS[season] for season in recipe_dict.get('seasons', [])
+                    if season in SEASON_COLLECTIONS
+                ]
+                raw['source'] = recipe_dict.get('source', '')
+                raw['rating'] = recipe_dict.get('rating', 0)
+        return self._raw_recipes
+
+    @property
+    def browse_recipes(self) -> List[Dict[str, Any]]:
+        """Recipe dictionaries in the shape filter_recipes and the seasonal selector read"""
+        if self._browse_recipes is None:
+            self._browse_recipes = [
+                {key: raw[key] for key in ('id', 'name', 'ingredients', 'collections', 'source', 'rating')}
+                for raw in self.raw_recipes
+            ]
+        return self._browse_recipes
+
+    @property
+    def ingredient_lines(self) -> List[str]:
+        return [line for raw in self.raw_recipes for line in raw['ingredients']]
+
+
+def load_corpus(source_file: Path, scale: int, workdir: Path, seed: int) -> BenchmarkCorpus:
+    """Load a migrated recipes file, replicated scale times with unique IDs"""
+    base = [recipe for recipe in iter_recipes(str(source_file)) if isinstance(recipe, dict)]
+    recipe_dicts = list(base)
+    for copy in range(1, scale):
+        recipe_dicts.extend({**recipe, 'id': f"{recipe.get('id', '')}-{copy}"} for recipe in base)
+    return BenchmarkCorpus(recipe_dicts, source_file, scale, workdir, seed)
+
+
+def make_quantities(count: int, seed: int) -> List[str]:
+    """Deterministic quantity strings: integers, decimals, fractions and ranges with units"""
+    rng = random.Random(seed)
+    quantities = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            number = str(rng.randint(1, 500))
+        elif kind < 0.6:
+            number = f"{rng.randint(0, 3)},{rng.randint(1, 9)}"
+        elif kind < 0.8:
+            number = rng.choice(['1/2', '1/4', '3/4', '1 1/2', '2/3'])
+        else:
+            low = rng.randint(1, 4)
+            number = f"{low}-{low + rng.randint(1, 3)}"
+        quantities.append(f"{number} {rng.choice(QUANTITY_UNITS)}".strip())
+    return quantities
+
+
+def prepare_benchmark(name: str, corpus: BenchmarkCorpus) -> tuple:
+    """
+    Prepare a benchmark's inputs outside the timed region
+
+    Returns:
+        Tuple of (function to time, operations per call)
+    """
+    if name == 'corpus_load':
+        corpus_file = corpus.corpus_file
+        return (lambda: load_migrated_recipes(corpus_file)), len(corpus)
+
+    if name == 'recipe_round_trip':
+        recipe_dicts = corpus.recipe_dicts
+        return (lambda: [Recipe.from_dict(d).to_dict() for d in recipe_dicts]), len(corpus)
+
+    if name == 'filter_recipes':
+        recipes = corpus.browse_recipes
+        categories = sorted({c for r in recipes for c in r['collections']})
+        sources = sorted({r['source'] for r in recipes if r['source']})
+        queries = [
+            ('kylling', [], []),
+            ('', categories[:1], []),
+            ('', categories[:3], sources[:2]),
+            ('pasta', categories[:2], []),
+            ('finnes ikke', [], [])
+        ]
+        return (lambda: [filter_recipes(recipes, *query) for query in queries]), len(queries)
+
+    if name == 'seasonal_selector':
+        recipes = corpus.browse_recipes
+        selections = 20
+
+        def select():
+            random.seed(corpus.seed)
+            for _ in range(selections):
+                select_seasonal_recipes(recipes, 7)
+        return select, selections
+
+    if name == 'quantity_scaling':
+        quantities = make_quantities(10 * len(corpus), corpus.seed)
+
+        def scale():
+            for quantity in quantities:
+                parse_quantity(quantity)
+                format_scaled_quantity(quantity, 1.5)
+        return scale, len(quantities)
+
+    if name == 'ingredient_parsing':
+        lines = corpus.ingredient_lines
+        parse = IngredientExtractor.parse_ingredient_text
+        return (lambda: [parse(line) for line in lines]), len(lines)
+
+    if name == 'migration':
+        raw_recipes = corpus.raw_recipes
+        output_path = corpus.workdir / f"migration_{corpus.scale}x.json"
+        return (lambda: migrate_recipes_parallel(raw_recipes, str(output_path), workers=1)), len(raw_recipes)
+
+    raise ValueError(f"Unknown benchmark: {name}")
+
+
+def time_benchmark(func: Callable, repeat: int) -> List[float]:
+    """Time repeat calls of func"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_suite(benchmarks: List[str], source_file: Path, scales: List[int], repeat: int,
+              seed: int) -> List[Dict[str, Any]]:
+    """Run the benchmarks on the corpus at every scale"""
+    results = []
+    corpus_benchmarks = [name for name in benchmarks if name not in APP_BENCHMARKS]
+    with tempfile.TemporaryDirectory(prefix='chefs_benchmarks_') as tmp:
+        for scale in scales if corpus_benchmarks else []:
+            corpus = load_corpus(source_file, scale, Path(tmp), seed)
+            for name in corpus_benchmarks:
+                func, ops = prepare_benchmark(name, corpus)
+                timings = time_benchmark(func, repeat)
+                median = statistics.median(timings)
+                results.append({
+                    'benchmark': name,
+                    'corpus': source_file.name,
+                    'scale': scale,
+                    'recipes': len(corpus),
+                    'ops': ops,
+                    'repeat': repeat,
+                    'best_seconds': round(min(timings), 6),
+                    'median_seconds': round(median, 6),
+                    'ops_per_second': round(ops / median, 1) if median > 0 else 0.0
+                })
+                print(f"  {name:<20} {scale:>4}x  {median * 1000:>10.1f} ms  {results[-1]['ops_per_second']:>14,.0f} ops/s")
+
+    if 'cold_start' in benchmarks:
+        results.extend(run_cold_start(repeat))
+    return results
+
+
+def run_cold_start(repeat: int) -> List[Dict[str, Any]]:
+    """Time the first render of the login page and each page, each in a fresh interpreter"""
+    results = []
+    for target, script in COLD_START_TARGETS.items():
+        timings = time_cold_render(script, repeat)
+        median = statistics.median(timings)
+        results.append({
+            'benchmark': f"cold_start.{target}",
+            'corpus': 'app',
+            'scale': 1,
+            'recipes': 0,
+            'ops': 1,
+            'repeat': repeat,
+            'best_seconds': round(min(timings), 6),
+            'median_seconds': round(median, 6),
+            'ops_per_second': round(1 / median, 1) if median > 0 else 0.0
+        })
+        print(f"  {results[-1]['benchmark']:<26} {median * 1000:>10.1f} ms")
+    return results
+
+
+def get_peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of the benchmark process (None where unavailable)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def compare_to_baseline(results: List[Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Compare median times against a baseline run
+
+    Returns:
+        Comparison rows for benchmarks present in both runs, with a regression flag
+    """
+    def key(result):
+        return result['benchmark'], result.get('corpus', 'migrated_recipes.json'), result['scale']
+
+    baseline_results = {key(r): r for r in baseline.get('results', [])}
+    comparisons = []
+    for result in results:
+        previous = baseline_results.get(key(result))
+        if not previous or not previous['median_seconds']:
+            continue
+        ratio = result['median_seconds'] / previous['median_seconds']
+        comparisons.append({
+            'benchmark': result['benchmark'],
+            'scale': result['scale'],
+            'baseline_seconds': previous['median_seconds'],
+            'median_seconds': result['median_seconds'],
+            'ratio': round(ratio, 3),
+            'regression': ratio > 1 + threshold
+        })
+    return comparisons
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline recipe benchmark suite")
+    parser.add_argument('--benchmarks', nargs='+', choices=BENCHMARKS, default=BENCHMARKS,
+                        help="Benchmarks to run (default: all)")
+    parser.add_argument('--corpus', type=Path, default=get_migrated_recipes_file(),
+                        help="Migrated recipes file to benchmark (e.g. from generate_corpus.py)")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100],
+                        help="Corpus sizes as multiples of the real corpus")
+    parser.add_argument('--repeat', type=int, default=3, help="Timing repetitions (the median is reported)")
+    parser.add_argument('--seed', type=int, default=42, help="Seed for synthesized inputs")
+    parser.add_argument('--output', type=Path, help="Write the results JSON here")
+    parser.add_argument('--save-baseline', type=Path, help="Write the results JSON as a baseline")
+    parser.add_argument('--baseline', type=Path, help="Compare against a saved baseline")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Relative slowdown of the median time counted as a regression")
+    args = parser.parse_args()
+
+    # Keep migration and loading logs out of the timings output
+    logging.basicConfig(level=logging.WARNING)
+
+    print(f"Running {len(args.benchmarks)} benchmarks on {args.corpus.name} "
+          f"at scales {', '.join(f'{s}x' for s in args.scales)}")
+    results = run_suite(args.benchmarks, args.corpus, args.scales, args.repeat, args.seed)
+
+    report: Dict[str, Any] = {
+        'generated_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'peak_rss_mb': get_peak_rss_mb(),
+        'results': results
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        comparisons = compare_to_baseline(results, baseline, args.threshold)
+        report['baseline'] = {'path': str(args.baseline), 'threshold': args.threshold, 'comparisons': comparisons}
+
+        print(f"\nCompared to {args.baseline}:")
+        for row in comparisons:
+            marker = "REGRESSION" if row['regression'] else ""
+            print(f"  {row['benchmark']:<20} {row['scale']:>4}x  {row['ratio']:>6.2f}x  {marker}")
+        if any(row['regression'] for row in comparisons):
+            exit_code = 1
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"Wrote results to {path}")
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+Shared data for the benchmark scripts that synthesize ingredient lines and corpora
+"""
+
+# Common ingredient names, most popular first
+BASE_INGREDIENTS = [
+    'løk', 'rødløk', 'vårløk', 'hvitløk', 'gulrot', 'potet', 'søtpotet', 'paprika', 'rød paprika',
+    'tomat', 'cherrytomater', 'hermetiske tomater', 'agurk', 'brokkoli', 'blomkål', 'spinat',
+    'squash', 'aubergine', 'sopp', 'sjampinjong', 'purre', 'selleri', 'ingefær', 'chili',
+    'kyllingfilet', 'kyllinglår', 'kjøttdeig', 'svinekotelett', 'bacon', 'laks', 'torsk',
+    'reker', 'egg', 'melk', 'fløte', 'matfløte', 'rømme', 'crème fraîche', 'smør', 'revet ost',
+    'parmesan', 'mozzarella', 'fetaost', 'yoghurt', 'hvetemel', 'sukker', 'brunt sukker',
+    'salt', 'pepper', 'olivenolje', 'rapsolje', 'soyasaus', 'fiskesaus', 'kokosmelk', 'ris',
+    'basmatiris', 'pasta', 'spaghetti', 'nudler', 'linser', 'kikerter', 'kidneybønner',
+    'buljong', 'kyllingbuljong', 'tomatpuré', 'sitron', 'lime', 'honning', 'sennep',
+    'karri', 'spisskummen', 'paprikapulver', 'oregano', 'basilikum', 'persille', 'koriander',
+    'timian', 'rosmarin', 'kanel', 'muskatnøtt', 'laurbærblad', 'mais', 'erter', 'avokado',
+]
@@ -1,7 +1,11 @@
 """
 Script to run the full migration from dictionary recipes to Recipe/Ingredient classes
+
+Recipes are processed in chunks on a process pool; see src/utils/parallel_migration.py.
 """
 
+import argparse
+import json
 import sys
 import logging
 from pathlib import Path
@@ -11,9 +15,11 @@ project_root = Path(__file__).parent.parent.parent.parent
 src_path = project_root / "src"
 sys.path.insert(0, str(project_root))
 
-from src.data.default_recipes import load_default_recipes
+from src.data.default_recipes import load_legacy_recipes
 from src.utils.ingredient_extractor import IngredientExtractor
-from src.utils.recipe_migrator import RecipeMigrator
+from src.utils.incremental_migration import build_manifest, can_migrate_incrementally, migrate_incrementally
+from src.utils.parallel_migration import DEFAULT_CHUNK_SIZE, migrate_recipes_parallel
+from src.utils.recipe_stream import stream_migrate_file
 
 # Setup logging
 logging.basicConfig(
@@ -23,48 +29,153 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def parse_args():
+    """Parse command line arguments"""
+    data_dir = project_root / "src" / "data"
+    parser = argparse.ArgumentParser(description="Migrate dictionary recipes to Recipe/Ingredient classes")
+    parser.add_argument('--input', type=Path, help="Recipe export JSON file (default: src/data/default_recipes.json)")
+    parser.add_argument('--output', type=Path, default=data_dir / "migrated_recipes.json",
+                        help="Migrated recipes JSON file")
+    parser.add_argument('--library-output', type=Path, default=data_dir / "ingredient_library.json",
+                        help="Ingredient library JSON file")
+    parser.add_argument('--failure-report', type=Path, default=data_dir / "migration_failures.json",
+                        help="Structured report of recipes that failed to migrate")
+    parser.add_argument('--manifest', type=Path, default=data_dir / "migration_manifest.json",
+                        help="Content hashes of the migrated source recipes, used for incremental runs")
+    parser.add_argument('--full', action='store_true',
+                        help="Re-migrate every recipe even if a previous migration can be patched")
+    parser.add_argument('--stream', action='store_true',
+                        help="Stream --input (JSON or NDJSON) recipe by recipe with bounded memory")
+    parser.add_argument('--index-output', type=Path, default=data_dir / "migrated_recipes_index.ndjson",
+                        help="Byte-offset index of the migrated recipes (written with --stream)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes (default: CPU count; 1 runs in-process)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Recipes per worker chunk")
+    return parser.parse_args()
+
+
+def load_input_recipes(input_path):
+    """Load recipe dictionaries from an export file, or the default legacy recipes"""
+    if input_path is None:
+        return load_legacy_recipes()
+
+    with open(input_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data if isinstance(data, list) else data.get('recipes', [])
+
+
+def print_changes(changes):
+    """Print what an incremental migration changed"""
+    print("\n" + "="*60)
+    print("INCREMENTAL MIGRATION SUMMARY")
+    print("="*60)
+    print(changes.summary())
+
+    for label, keys in [("Added", changes.added), ("Changed", changes.changed), ("Removed", changes.removed),
+                        ("Failed", changes.failed), ("Ingredients added", changes.ingredients_added),
+                        ("Ingredients removed", changes.ingredients_removed)]:
+        if keys:
+            shown = ', '.join(keys[:10]) + (f" ... (+{len(keys) - 10} more)" if len(keys) > 10 else "")
+            print(f"{label}: {shown}")
+
+    print("="*60)
+
+
+def run_streaming_migration(args):
+    """Migrate a large export recipe by recipe without loading it into memory"""
+    if args.input is None:
+        logger.error("--stream needs an --input file")
+        return
+
+    failure_report = args.failure_report.with_suffix('.ndjson')
+    ingredient_library, stats = stream_migrate_file(
+        str(args.input),
+        str(args.output),
+        str(args.index_output),
+        failure_report_path=str(failure_report)
+    )
+    IngredientExtractor.save_ingredient_library(ingredient_library, str(args.library_output))
+
+    print("\n" + "="*60)
+    print("STREAMING MIGRATION SUMMARY")
+    print("="*60)
+    print(f"Recipes read: {stats.read}")
+    print(f"Migrated recipes: {stats.migrated}")
+    print(f"Failed recipes: {stats.failed}")
+    print(f"Unique ingredients: {len(ingredient_library)}")
+    print(f"Recipes migrated in {stats.seconds:.1f}s ({stats.recipes_per_second:.0f} recipes/s)")
+    print(f"Migrated recipes: {args.output}")
+    print(f"Recipe index: {args.index_output}")
+    print(f"Failure report: {failure_report}")
+    print("="*60)
+
+
 def main():
     """Run the full migration process"""
+    args = parse_args()
     logger.info("Starting migration process...")
 
+    if args.stream:
+        run_streaming_migration(args)
+        return
+
     # Step 1: Load existing recipes
-    logger.info("Loading default recipes...")
-    recipes = load_default_recipes()
+    logger.info("Loading recipes...")
+    recipes = load_input_recipes(args.input)
     logger.info(f"Loaded {len(recipes)} recipes")
 
     if not recipes:
         logger.error("No recipes loaded. Cannot proceed with migration.")
         return
 
-    # Step 2: Build ingredient library
-    logger.info("Building ingredient library...")
-    ingredient_library = IngredientExtractor.build_ingredient_library(recipes)
-    logger.info(f"Built ingredient library with {len(ingredient_library)} ingredients")
+    # Re-migrate only new and changed recipes when a previous run can be patched
+    if not args.full and can_migrate_incrementally(args.output, args.library_output, args.manifest):
+        logger.info("Previous migration found, migrating new and changed recipes only...")
+        changes = migrate_incrementally(
+            recipes,
+            str(args.output),
+            str(args.library_output),
+            str(args.manifest),
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            failure_report_path=str(args.failure_report)
+        )
+        print_changes(changes)
+        return
 
-    # Step 3: Save ingredient library
-    ingredient_library_path = project_root / "src" / "data" / "ingredient_library.json"
-    logger.info(f"Saving ingredient library to {ingredient_library_path}")
-    IngredientExtractor.save_ingredient_library(ingredient_library, str(ingredient_library_path))
+    # Step 2: Build ingredient library and migrate recipes, streaming them to the output file
+    logger.info("Building ingredient library and migrating recipes...")
+    ingredient_library, stats = migrate_recipes_parallel(
+        recipes,
+        str(args.output),
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        failure_report_path=str(args.failure_report)
+    )
 
-    # Step 4: Migrate recipes
-    logger.info("Migrating recipes to Recipe class objects...")
-    migrated_recipes = RecipeMigrator.migrate_all_recipes(recipes, ingredient_library)
-    logger.info(f"Successfully migrated {len(migrated_recipes)} recipes")
+    # Step 3: Save ingredient library
+    logger.info(f"Saving ingredient library to {args.library_output}")
+    IngredientExtractor.save_ingredient_library(ingredient_library, str(args.library_output))
 
-    # Step 5: Save migrated recipes
-    migrated_recipes_path = project_root / "src" / "data" / "migrated_recipes.json"
-    logger.info(f"Saving migrated recipes to {migrated_recipes_path}")
-    RecipeMigrator.save_migrated_recipes(migrated_recipes, str(migrated_recipes_path))
+    # Step 4: Save the manifest for later incremental runs
+    logger.info(f"Saving migration manifest to {args.manifest}")
+    build_manifest(recipes, str(args.output), stats.failed_indexes).save(str(args.manifest))
 
-    # Step 6: Print summary statistics
+    # Step 5: Print summary statistics
     print("\n" + "="*60)
     print("MIGRATION SUMMARY")
     print("="*60)
-    print(f"Original recipes: {len(recipes)}")
-    print(f"Migrated recipes: {len(migrated_recipes)}")
-    print(f"Unique ingredients: {len(ingredient_library)}")
-    print(f"Ingredient library: {ingredient_library_path}")
-    print(f"Migrated recipes: {migrated_recipes_path}")
+    print(f"Original recipes: {stats.total_recipes}")
+    print(f"Migrated recipes: {stats.migrated}")
+    print(f"Failed recipes: {stats.failed}")
+    print(f"Recipes left out of the ingredient library: {stats.library_failures}")
+    print(f"Unique ingredients: {stats.unique_ingredients}")
+    print(f"Workers: {stats.workers} (chunks of {stats.chunk_size})")
+    print(f"Ingredient library built in {stats.library_seconds:.1f}s")
+    print(f"Recipes migrated in {stats.migration_seconds:.1f}s ({stats.recipes_per_second:.0f} recipes/s)")
+    print(f"Ingredient library: {args.library_output}")
+    print(f"Migrated recipes: {args.output}")
+    print(f"Failure report: {args.failure_report}")
 
     # Show ingredient categories
     categories = {}
@@ -77,26 +188,21 @@ def main():
         print(f"  {cat}: {count} ingredients")
 
     # Show recipe categories
-    meal_types = {}
-    difficulties = {}
-    for recipe in migrated_recipes:
-        if recipe.meal_type:
-            meal_types[recipe.meal_type.value] = meal_types.get(recipe.meal_type.value, 0) + 1
-        diff = recipe.difficulty.value
-        difficulties[diff] = difficulties.get(diff, 0) + 1
-
     print(f"\nRecipe meal types:")
-    for meal_type, count in sorted(meal_types.items()):
+    for meal_type, count in sorted(stats.meal_types.items()):
         print(f"  {meal_type}: {count} recipes")
 
     print(f"\nRecipe difficulties:")
-    for diff, count in sorted(difficulties.items()):
+    for diff, count in sorted(stats.difficulties.items()):
         print(f"  {diff}: {count} recipes")
 
     print("\n" + "="*60)
-    print("Migration completed successfully!")
+    if stats.failed:
+        print(f"Migration completed with {stats.failed} failures - see {args.failure_report}")
+    else:
+        print("Migration completed successfully!")
     print("="*60)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
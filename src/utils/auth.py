@@ -63,7 +63,7 @@ def show_login_page():
                    ```
                    Or specifically:
                    ```bash
-                   pip install "streamlit[auth]>=1.37.0"
+                   pip install "streamlit[auth]>=1.55.0"
                    ```
                 
                 2. **Get Google OAuth Credentials:**
@@ -0,0 +1,33 @@
+"""
+Developer access - which signed-in users may see the developer panel
+
+The developer panel shows process-wide tracing, memory and cache data for every
+session on the server, and its controls (switching tracing on or off, resetting the
+statistics) affect every session. It is only shown to the users listed by email in
+the CHEFS_ASSISTANT_DEVELOPERS environment variable (comma separated); when the
+variable is unset or empty, nobody sees it.
+"""
+
+import os
+from typing import FrozenSet, Optional
+
+DEVELOPERS_ENV_VAR = "CHEFS_ASSISTANT_DEVELOPERS"
+
+
+def get_developer_emails() -> FrozenSet[str]:
+    """Get the (lowercased) email addresses allowed to see the developer panel"""
+    value = os.environ.get(DEVELOPERS_ENV_VAR, "")
+    return frozenset(email.strip().lower() for email in value.split(",") if email.strip())
+
+
+def is_developer(email: Optional[str], email_verified: bool = True) -> bool:
+    """
+    Check whether a signed-in user may see the developer panel
+
+    Args:
+        email: Email address of the signed-in user
+        email_verified: Whether the identity provider verified the address
+    """
+    if not email or not email_verified:
+        return False
+    return email.strip().lower() in get_developer_emails()
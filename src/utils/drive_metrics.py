@@ -0,0 +1,181 @@
+"""
+Google Drive API call accounting
+
+Every Drive request made by GoogleDriveRecipeStorage is recorded with its operation
+(list/get_media/create/update), the Drive file it concerns and the app function that
+triggered it, along with latency, bytes transferred and retries. Totals are kept per
+(operation, file, caller) for the server process.
+
+Each session also counts its calls per rerun: main.py starts a rerun budget before
+the page runs and checks it afterwards, logging a warning when a single interaction
+made more than the budgeted number of calls (CHEFS_ASSISTANT_DRIVE_CALL_BUDGET,
+default 10) - e.g. settings being reloaded from Drive on every rerun.
+"""
+
+import logging
+import os
+import sys
+import threading
+from collections import Counter
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CALL_BUDGET_ENV_VAR = "CHEFS_ASSISTANT_DRIVE_CALL_BUDGET"
+DEFAULT_CALL_BUDGET = 10
+
+# Session state key holding the calls made during the current rerun
+RERUN_CALLS_KEY = '_drive_rerun_calls'
+
+# Frames in these modules are skipped when looking for the calling app function
+_SKIPPED_MODULES = ('src.data.google_drive_storage', 'src.utils.drive_metrics', 'src.utils.tracing')
+
+
+def _read_call_budget() -> int:
+    try:
+        return int(os.environ.get(CALL_BUDGET_ENV_VAR, DEFAULT_CALL_BUDGET))
+    except ValueError:
+        logger.warning(f"Invalid {CALL_BUDGET_ENV_VAR}, using the default budget of {DEFAULT_CALL_BUDGET} calls")
+        return DEFAULT_CALL_BUDGET
+
+
+CALL_BUDGET = _read_call_budget()
+
+
+@dataclass
+class DriveCallStats:
+    """Totals for one (operation, file, caller) combination"""
+    operation: str
+    file: str
+    caller: str
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization"""
+        data = asdict(self)
+        data['mean_seconds'] = round(self.mean_seconds, 6)
+        return data
+
+
+class DriveMetrics:
+    """Process-wide Drive call totals"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str, str], DriveCallStats] = {}
+        self.budget_warnings = 0
+
+    def record(self, operation: str, file: str, caller: str, seconds: float, bytes_sent: int = 0,
+               bytes_received: int = 0, retries: int = 0, error: bool = False) -> None:
+        with self._lock:
+            stats = self._stats.get((operation, file, caller))
+            if stats is None:
+                stats = self._stats[(operation, file, caller)] = DriveCallStats(operation, file, caller)
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.retries += retries
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.bytes_sent += bytes_sent
+            stats.bytes_received += bytes_received
+
+    def record_budget_warning(self) -> None:
+        with self._lock:
+            self.budget_warnings += 1
+
+    def stats(self) -> List[DriveCallStats]:
+        """Totals ordered by number of calls"""
+        with self._lock:
+            return sorted(self._stats.values(), key=lambda s: -s.calls)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self.budget_warnings = 0
+
+
+drive_metrics = DriveMetrics()
+
+
+def find_caller() -> str:
+    """Get the app function ('module.function') that triggered the current Drive call"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if not module.startswith(_SKIPPED_MODULES):
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def _get_session_state():
+    """Session state of the running script, or None outside a Streamlit session"""
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    return st.session_state if get_script_run_ctx(suppress_warning=True) is not None else None
+
+
+def record_drive_call(operation: str, file: str, seconds: float, bytes_sent: int = 0,
+                      bytes_received: int = 0, retries: int = 0, error: bool = False) -> None:
+    """
+    Record one Drive request
+
+    Args:
+        operation: Drive operation (list, get_media, create, update)
+        file: Drive file or folder name the request concerns
+        seconds: Request latency including retries
+        bytes_sent: Media bytes uploaded
+        bytes_received: Media bytes downloaded
+        retries: Attempts made after the first
+        error: Whether the request ultimately failed
+    """
+    caller = find_caller()
+    drive_metrics.record(operation, file, caller, seconds, bytes_sent, bytes_received, retries, error)
+
+    session_state = _get_session_state()
+    if session_state is not None:
+        calls = session_state.get(RERUN_CALLS_KEY)
+        if calls is not None:
+            calls.append((operation, file, caller))
+
+
+def start_rerun_budget() -> None:
+    """Start counting this session's Drive calls for the current rerun"""
+    session_state = _get_session_state()
+    if session_state is not None:
+        session_state[RERUN_CALLS_KEY] = []
+
+
+def check_rerun_budget(budget: Optional[int] = None) -> int:
+    """
+    Warn if this session's current rerun made more Drive calls than the budget
+
+    Args:
+        budget: Maximum calls per rerun (defaults to CALL_BUDGET)
+
+    Returns:
+        Number of Drive calls made during the rerun
+    """
+    session_state = _get_session_state()
+    calls = session_state.get(RERUN_CALLS_KEY) if session_state is not None else None
+    if not calls:
+        return 0
+
+    budget = CALL_BUDGET if budget is None else budget
+    if len(calls) > budget:
+        drive_metrics.record_budget_warning()
+        breakdown = ', '.join(f"{caller} {operation} {file} x{count}"
+                              for (operation, file, caller), count in Counter(calls).most_common())
+        logger.warning(f"Drive call budget exceeded: {len(calls)} calls in one rerun (budget {budget}): {breakdown}")
+    return len(calls)
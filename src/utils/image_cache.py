@@ -0,0 +1,563 @@
+"""
+Process-wide cache of processed recipe images
+
+Recipe photos are downloaded once and decoded once into every size the pages show
+them at (DERIVATIVE_HEIGHTS: the 200 px cards and the 400 px recipe viewer image),
+center-cropped to 16:9. The decoder is asked for a reduced-size image
+(Image.draft, which JPEG decodes at 1/2, 1/4 or 1/8 scale almost for free), and
+each size is resized from the next larger one, reducing by an integer factor
+before the LANCZOS pass. All sizes of a photo are stored together as encoded JPEG
+bytes (a 200 px card image is ~10 KB where the RGB array was ~210 KB), so opening a
+recipe from its card never fetches the photo again. st.image passes JPEG bytes
+through to the browser as they are, so a cache hit costs neither a copy nor a
+re-encode.
+
+The cache holds at most CHEFS_ASSISTANT_IMAGE_CACHE_MB (default 64) megabytes for
+the whole server process, evicting the least recently used photos (with all their
+sizes) first. A size outside DERIVATIVE_HEIGHTS is resized from a larger cached
+one when there is one. Failed downloads are remembered for FAILURE_TTL_SECONDS so
+a missing photo is not fetched again on every rerun.
+
+With Streamlit's static file serving on (server.enableStaticServing in
+.streamlit/config.toml), the pages don't send image bytes at all: every size of a
+photo is also written once to static/thumbnails/ and the pages reference it by URL
+(/app/static/thumbnails/<name>). The browser then fetches each thumbnail over plain
+HTTP and caches it like any other static file. A name is the hash of the file's
+content plus its height, so a file is never rewritten and a photo replaced at the
+same URL gets new names (and so new URLs) once it is downloaded again; photos are
+downloaded again after THUMBNAIL_REVALIDATE_SECONDS. Every file is dated
+THUMBNAIL_MTIME, so its Last-Modified and ETag (Streamlit derives it from the
+modification time and size) are the same on every server and after restarts, and
+browsers - which cache files without a Cache-Control header for a tenth of their
+age - keep thumbnails for years without asking again. The folder holds at most
+CHEFS_ASSISTANT_THUMBNAIL_DISK_MB (default 256) megabytes: files no photo currently
+uses (older versions, earlier runs) are deleted first, then the thumbnails of the
+least recently used photos. The folder is a cache and can be deleted at any time.
+"""
+
+import hashlib
+import io
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from src.utils.memory_accounting import register_shared_structure
+
+logger = logging.getLogger(__name__)
+
+IMAGE_CACHE_ENV_VAR = "CHEFS_ASSISTANT_IMAGE_CACHE_MB"
+DEFAULT_IMAGE_CACHE_MB = 64
+
+# Seconds before a photo that failed to download is tried again
+FAILURE_TTL_SECONDS = 300
+
+# Heights the pages show photos at (cards, recipe viewer)
+DERIVATIVE_HEIGHTS = (200, 400)
+
+JPEG_QUALITY = 85
+ASPECT_RATIO = 16 / 9
+
+# Folder served by Streamlit's static file serving (next to main.py) and the URL it is served at
+STATIC_DIR = Path(__file__).parent.parent.parent / "static"
+THUMBNAIL_DIR = STATIC_DIR / "thumbnails"
+THUMBNAIL_URL_PREFIX = "/app/static/thumbnails/"
+
+# Modification time given to every thumbnail (2000-01-01 UTC)
+THUMBNAIL_MTIME = 946684800
+
+THUMBNAIL_DISK_ENV_VAR = "CHEFS_ASSISTANT_THUMBNAIL_DISK_MB"
+DEFAULT_THUMBNAIL_DISK_MB = 256
+
+# Seconds after which a photo is downloaded again, in case it was replaced at the same URL
+THUMBNAIL_REVALIDATE_SECONDS = 24 * 3600
+
+# Resize reduces by an integer factor first while the image is over this many times the target size
+REDUCING_GAP = 2.0
+
+
+@dataclass
+class ImageCacheStats:
+    """Counters and current size of the image cache"""
+    hits: int = 0
+    derived: int = 0  # Misses served by resizing a larger cached rendition
+    downloads: int = 0  # Photos downloaded and decoded into all their sizes
+    failures: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+    max_bytes: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization"""
+        return asdict(self)
+
+
+class ImageCache:
+    """Encoded sizes of each photo by URL, bounded by a total byte budget with LRU eviction"""
+
+    def __init__(self, max_bytes: int):
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, Dict[int, bytes]]' = OrderedDict()
+        self._failures: Dict[str, float] = {}
+        self._stats = ImageCacheStats(max_bytes=max_bytes)
+
+    def get(self, url: str, height: int) -> Optional[bytes]:
+        """Cached size of a photo, marking the photo as recently used"""
+        with self._lock:
+            sizes = self._entries.get(url)
+            data = sizes.get(height) if sizes else None
+            if data is not None:
+                self._entries.move_to_end(url)
+                self._stats.hits += 1
+            return data
+
+    def get_larger(self, url: str, height: int) -> Optional[bytes]:
+        """Smallest cached size of a photo taller than the given height"""
+        with self._lock:
+            sizes = self._entries.get(url)
+            heights = [h for h in sizes if h > height] if sizes else []
+            return sizes[min(heights)] if heights else None
+
+    def discard(self, url: str) -> None:
+        """Drop all sizes of a photo, so it is downloaded again on its next use"""
+        with self._lock:
+            evicted = self._entries.pop(url, None)
+            if evicted is not None:
+                self._stats.bytes -= sum(len(data) for data in evicted.values())
+
+    def get_all(self, url: str) -> Dict[int, bytes]:
+        """All cached sizes of a photo by height"""
+        with self._lock:
+            return dict(self._entries.get(url) or {})
+
+    def put(self, url: str, sizes: Dict[int, bytes], derived: bool = False) -> None:
+        """Store sizes of a photo, evicting the least recently used photos over the byte budget"""
+        with self._lock:
+            entry = self._entries.setdefault(url, {})
+            for height, data in sizes.items():
+                self._stats.bytes += len(data) - len(entry.get(height, b''))
+                entry[height] = data
+            self._entries.move_to_end(url)
+            if derived:
+                self._stats.derived += 1
+            else:
+                self._stats.downloads += 1
+            self._failures.pop(url, None)
+
+            # Always keep the photo just stored, even when it alone exceeds the budget
+            while self._stats.bytes > self._stats.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._stats.bytes -= sum(len(data) for data in evicted.values())
+                self._stats.evictions += 1
+
+    def has_failed(self, url: str) -> bool:
+        """Whether downloading the photo failed within the last FAILURE_TTL_SECONDS"""
+        with self._lock:
+            failed_at = self._failures.get(url)
+            if failed_at is None:
+                return False
+            if time.time() - failed_at > FAILURE_TTL_SECONDS:
+                del self._failures[url]
+                return False
+            return True
+
+    def record_failure(self, url: str) -> None:
+        with self._lock:
+            self._failures[url] = time.time()
+            self._stats.failures += 1
+
+    def stats(self) -> ImageCacheStats:
+        with self._lock:
+            return ImageCacheStats(**{**asdict(self._stats), 'entries': len(self._entries)})
+
+    def set_max_bytes(self, max_bytes: int) -> None:
+        """Change the byte budget (takes effect from the next stored photo)"""
+        with self._lock:
+            self._stats.max_bytes = max_bytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._failures.clear()
+            self._stats = ImageCacheStats(max_bytes=self._stats.max_bytes)
+
+
+def _read_max_bytes(env_var: str = IMAGE_CACHE_ENV_VAR, default_mb: float = DEFAULT_IMAGE_CACHE_MB) -> int:
+    try:
+        max_mb = float(os.environ.get(env_var, default_mb))
+    except ValueError:
+        logger.warning(f"Invalid {env_var}, using {default_mb} MB")
+        max_mb = default_mb
+    return int(max_mb * 1024 * 1024)
+
+
+image_cache = ImageCache(_read_max_bytes())
+register_shared_structure('image_cache', lambda: image_cache._entries)
+
+
+def download_image(image_url: str):
+    """
+    Download a photo with retries
+
+    Returns:
+        PIL Image, opened but not decoded yet (so the decoder can still be set up with
+        Image.draft), or None if the download fails
+    """
+    # Imported on first use so pages render without loading the image stack
+    import requests
+    from PIL import Image
+
+    # Retry configuration
+    max_retries = 3
+    timeout = 15
+    backoff_factor = 1.0
+
+    # One session per download so the retries reuse the connection
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    })
+
+    for attempt in range(max_retries):
+        try:
+            # Calculate timeout with backoff
+            current_timeout = timeout + (attempt * backoff_factor)
+            response = session.get(image_url, timeout=current_timeout)
+            response.raise_for_status()
+
+        except requests.exceptions.Timeout:
+            if attempt < max_retries - 1:
+                continue
+            logger.warning(f"Image download timeout after {max_retries} attempts: {image_url}")
+            return None
+
+        except requests.exceptions.ConnectionError as e:
+            if "Failed to resolve" in str(e) or "getaddrinfo failed" in str(e):
+                logger.warning(f"DNS resolution failed for image: {image_url}")
+                return None
+            elif attempt < max_retries - 1:
+                continue
+            logger.warning(f"Connection error after {max_retries} attempts: {image_url}: {e}")
+            return None
+
+        except requests.exceptions.HTTPError as e:
+            # Only server errors and rate limiting can go away on a retry
+            status = e.response.status_code if e.response is not None else None
+            if (status == 429 or (status or 0) >= 500) and attempt < max_retries - 1:
+                continue
+            logger.warning(f"Image download failed: {image_url}: {e}")
+            return None
+
+        except requests.RequestException as e:
+            logger.warning(f"Image download failed: {image_url}: {e}")
+            return None
+
+        try:
+            return Image.open(io.BytesIO(response.content))
+        except Image.UnidentifiedImageError:
+            logger.warning(f"Downloaded file is not an image: {image_url}")
+            return None
+
+    return None
+
+
+def crop_to_aspect(img, aspect_ratio: float = ASPECT_RATIO):
+    """Center-crop a PIL image to the given width/height ratio"""
+    original_width, original_height = img.size
+    if original_width / original_height > aspect_ratio:
+        # Image is wider than target - crop width
+        new_width = int(original_height * aspect_ratio)
+        left = (original_width - new_width) // 2
+        return img.crop((left, 0, left + new_width, original_height))
+
+    # Image is taller than target - crop height
+    new_height = int(original_width / aspect_ratio)
+    top = (original_height - new_height) // 2
+    return img.crop((0, top, original_width, top + new_height))
+
+
+def _encode(img) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=JPEG_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def render_derivatives(img, heights) -> Dict[int, bytes]:
+    """
+    Decode a photo once into several 16:9 sizes
+
+    Args:
+        img: Opened PIL Image, not decoded yet
+        heights: Heights in pixels to produce
+
+    Returns:
+        JPEG bytes by height
+    """
+    from PIL import Image
+
+    heights = sorted(set(heights), reverse=True)
+    largest_width = int(heights[0] * ASPECT_RATIO)
+
+    # Let the JPEG decoder scale down while decoding, keeping the 16:9 crop at least
+    # as large as the largest size (no effect for other formats)
+    width, height = img.size
+    crop_width, crop_height = min(width, int(height * ASPECT_RATIO)), min(height, int(width / ASPECT_RATIO))
+    scale = max(largest_width / crop_width, heights[0] / crop_height)
+    if scale < 1:
+        img.draft('RGB', (math.ceil(width * scale), math.ceil(height * scale)))
+
+    # Convert to RGB if necessary (handles RGBA, etc.)
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    source = crop_to_aspect(img)
+
+    # Each size is resized from the previous (larger) one
+    derivatives = {}
+    for target_height in heights:
+        target_size = (int(target_height * ASPECT_RATIO), target_height)
+        if source.size != target_size:
+            source = source.resize(target_size, Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+        derivatives[target_height] = _encode(source)
+    return derivatives
+
+
+def get_recipe_image(image_url: str, target_height: int = 200) -> Optional[bytes]:
+    """
+    Recipe photo center-cropped to 16:9 at the given height, as JPEG bytes
+
+    Served from the image cache when possible. Otherwise the size is resized from a
+    larger cached one, or the photo is downloaded and decoded into this size and
+    all of DERIVATIVE_HEIGHTS.
+
+    Args:
+        image_url: URL of the photo
+        target_height: Height in pixels
+
+    Returns:
+        JPEG bytes (pass to st.image with output_format="JPEG"), or None if the photo
+        could not be loaded
+    """
+    if not image_url:
+        return None
+
+    data = image_cache.get(image_url, target_height)
+    if data is not None:
+        return data
+
+    larger = image_cache.get_larger(image_url, target_height)
+    if larger is not None:
+        from PIL import Image
+
+        sizes = render_derivatives(Image.open(io.BytesIO(larger)), [target_height])
+        image_cache.put(image_url, sizes, derived=True)
+        return sizes[target_height]
+
+    if image_cache.has_failed(image_url):
+        return None
+
+    img = download_image(image_url)
+    if img is None:
+        image_cache.record_failure(image_url)
+        return None
+
+    try:
+        sizes = render_derivatives(img, DERIVATIVE_HEIGHTS + (target_height,))
+    except Exception as e:
+        logger.warning(f"Failed to process image: {image_url}: {e}")
+        image_cache.record_failure(image_url)
+        return None
+
+    image_cache.put(image_url, sizes)
+    return sizes[target_height]
+
+
+def is_static_serving_enabled() -> bool:
+    """Whether Streamlit serves the static/ folder (server.enableStaticServing)"""
+    import streamlit as st
+    return bool(st.get_option('server.enableStaticServing'))
+
+
+def thumbnail_name(data: bytes, height: int) -> str:
+    """File name of a thumbnail, derived from its content and height"""
+    return f"{hashlib.sha256(data).hexdigest()[:32]}-{height}.jpg"
+
+
+@dataclass
+class ThumbnailStoreStats:
+    """Counters and current size of the thumbnail folder"""
+    files: int = 0
+    bytes: int = 0
+    max_bytes: int = 0
+    writes: int = 0
+    deletions: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization"""
+        return asdict(self)
+
+
+class ThumbnailStore:
+    """Thumbnail files named by content, the file names of each photo's sizes and a disk budget"""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self._lock = threading.Lock()
+        # Photo URL -> (file name by height, time written), least recently used first
+        self._photos: 'OrderedDict[str, Tuple[Dict[int, str], float]]' = OrderedDict()
+        self._files: Optional[Dict[str, int]] = None  # File name -> size, read from the folder on first use
+        self._stats = ThumbnailStoreStats(max_bytes=max_bytes)
+
+    def _scan(self) -> Dict[str, int]:
+        """Files in the folder (read once; the folder may hold thumbnails of earlier runs)"""
+        if self._files is None:
+            self._files = {}
+            if self.directory.exists():
+                for path in self.directory.glob('*.jpg'):
+                    self._files[path.name] = path.stat().st_size
+            self._stats.bytes = sum(self._files.values())
+        return self._files
+
+    def get(self, url: str, height: int) -> Optional[str]:
+        """File name of a photo's thumbnail at a height, marking the photo as recently used"""
+        with self._lock:
+            entry = self._photos.get(url)
+            name = entry[0].get(height) if entry else None
+            if name is not None:
+                self._photos.move_to_end(url)
+            return name
+
+    def pop_expired(self, url: str) -> bool:
+        """Forget a photo written more than THUMBNAIL_REVALIDATE_SECONDS ago, returning whether it was"""
+        with self._lock:
+            entry = self._photos.get(url)
+            if entry is None or time.time() - entry[1] <= THUMBNAIL_REVALIDATE_SECONDS:
+                return False
+            del self._photos[url]
+            return True
+
+    def put(self, url: str, sizes: Dict[int, bytes]) -> Dict[int, str]:
+        """
+        Write the sizes of a photo that are not in the folder yet, then delete files over the disk budget
+
+        Returns:
+            File name by height
+        """
+        names = {height: thumbnail_name(data, height) for height, data in sizes.items()}
+        with self._lock:
+            files = self._scan()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for height, data in sizes.items():
+                name = names[height]
+                if name in files and (self.directory / name).exists():
+                    continue
+                _write_thumbnail(self.directory / name, data)
+                self._stats.bytes += len(data) - files.get(name, 0)
+                files[name] = len(data)
+                self._stats.writes += 1
+            self._photos[url] = (names, time.time())
+            self._photos.move_to_end(url)
+            self._delete_over_budget()
+        return names
+
+    def _delete_over_budget(self) -> None:
+        """Delete unused files, then the least recently used photos' files, until under the budget"""
+        files = self._files
+        if self._stats.bytes <= self._stats.max_bytes:
+            return
+
+        used = {name for names, _ in self._photos.values() for name in names.values()}
+        for name in [name for name in files if name not in used]:
+            if self._stats.bytes <= self._stats.max_bytes:
+                return
+            self._delete(name)
+
+        # Always keep the photo just stored, even when it alone exceeds the budget
+        while self._stats.bytes > self._stats.max_bytes and len(self._photos) > 1:
+            _, (names, _) = self._photos.popitem(last=False)
+            used = {name for kept, _ in self._photos.values() for name in kept.values()}
+            for name in names.values():
+                if name in files and name not in used:
+                    self._delete(name)
+
+    def _delete(self, name: str) -> None:
+        try:
+            (self.directory / name).unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not delete thumbnail {name}: {e}")
+            return
+        self._stats.bytes -= self._files.pop(name)
+        self._stats.deletions += 1
+
+    def stats(self) -> ThumbnailStoreStats:
+        with self._lock:
+            files = self._scan()
+            return ThumbnailStoreStats(**{**asdict(self._stats), 'files': len(files)})
+
+
+def _write_thumbnail(path: Path, data: bytes) -> None:
+    # Write under a temporary name so the file is never served half-written
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    temp_path.write_bytes(data)
+    os.utime(temp_path, (THUMBNAIL_MTIME, THUMBNAIL_MTIME))
+    os.replace(temp_path, path)
+
+
+thumbnail_store = ThumbnailStore(THUMBNAIL_DIR, _read_max_bytes(THUMBNAIL_DISK_ENV_VAR, DEFAULT_THUMBNAIL_DISK_MB))
+
+
+def get_recipe_image_url(image_url: str, target_height: int = 200) -> Optional[str]:
+    """
+    Static URL of a recipe photo's thumbnail at the given height
+
+    The thumbnail is served from static/thumbnails/ if this server process wrote it
+    (for any session) within THUMBNAIL_REVALIDATE_SECONDS; otherwise the photo is
+    rendered through the image cache (downloading it again once the thumbnails are
+    due for revalidation) and the sizes not in the folder yet are written there.
+
+    Args:
+        image_url: URL of the photo
+        target_height: Height in pixels
+
+    Returns:
+        URL under /app/static/thumbnails/, or None if the photo could not be loaded
+    """
+    if not image_url:
+        return None
+
+    if thumbnail_store.pop_expired(image_url):
+        # Download the photo again in case it was replaced at the same URL
+        image_cache.discard(image_url)
+
+    name = thumbnail_store.get(image_url, target_height)
+    if name is not None and (THUMBNAIL_DIR / name).exists():
+        return THUMBNAIL_URL_PREFIX + name
+
+    if get_recipe_image(image_url, target_height) is None:
+        return None
+
+    try:
+        names = thumbnail_store.put(image_url, image_cache.get_all(image_url))
+    except OSError as e:
+        logger.warning(f"Could not write thumbnails for {image_url}: {e}")
+        return None
+    name = names.get(target_height)
+    return THUMBNAIL_URL_PREFIX + name if name else None
+
+
+def get_recipe_thumbnail(image_url: str, target_height: int = 200) -> Optional[Union[str, bytes]]:
+    """
+    Recipe photo at the given height, in the form st.image should get it
+
+    Returns:
+        Static URL when static file serving is on, otherwise JPEG bytes (None if the
+        photo could not be loaded)
+    """
+    if is_static_serving_enabled():
+        return get_recipe_image_url(image_url, target_height)
+    return get_recipe_image(image_url, target_height)
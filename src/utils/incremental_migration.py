@@ -0,0 +1,338 @@
+"""
+Incremental re-migration driven by content hashes
+
+A manifest stores a content hash for every migrated source recipe, together with
+the ID of its migrated recipe and the ingredient names it uses. Re-running the
+migration only migrates recipes whose hash is new or changed, drops recipes that
+disappeared from the source, and patches the migrated corpus, ingredient library
+and manifest accordingly. Ingredients already in the library are kept as they are,
+so hand-edited nutrition and price data survive a refresh.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.data.default_recipes import load_ingredient_library
+from src.models.ingredient import Ingredient
+from src.utils.ingredient_extractor import IngredientExtractor
+from src.utils.parallel_migration import (
+    DEFAULT_CHUNK_SIZE, MigrationFailure, MigrationStats, RecipeStreamWriter,
+    chunk_recipes, migrate_chunk, run_chunks, write_failure_report, _init_worker
+)
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+# Keys the recipe loader adds to every source recipe; they are not part of the content
+IGNORED_HASH_KEYS = {'is_default_recipe', 'recipe_type'}
+
+
+def compute_recipe_hash(recipe_dict: Dict[str, Any]) -> str:
+    """Compute a stable content hash for a source recipe dictionary"""
+    content = {k: v for k, v in recipe_dict.items() if k not in IGNORED_HASH_KEYS}
+    serialized = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+def get_manifest_key(recipe_dict: Dict[str, Any], recipe_hash: str) -> str:
+    """Get the manifest key of a source recipe (its ID, or its hash when it has none)"""
+    recipe_id = recipe_dict.get('id') if isinstance(recipe_dict, dict) else None
+    return str(recipe_id) if recipe_id else f"hash:{recipe_hash}"
+
+
+def get_recipe_ingredient_names(recipe_dict: Dict[str, Any]) -> List[str]:
+    """Get the normalized ingredient names a source recipe contributes to the library"""
+    return sorted(IngredientExtractor.collect_ingredient_usage([recipe_dict]))
+
+
+@dataclass
+class ManifestEntry:
+    """Migration record of one source recipe"""
+    hash: str
+    output_id: str  # ID of the migrated recipe in the output corpus
+    ingredients: List[str] = field(default_factory=list)  # Normalized ingredient names
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization"""
+        return {'hash': self.hash, 'output_id': self.output_id, 'ingredients': self.ingredients}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ManifestEntry':
+        """Create from dictionary"""
+        return cls(hash=data.get('hash', ''), output_id=data.get('output_id', ''),
+                   ingredients=list(data.get('ingredients', [])))
+
+
+class MigrationManifest:
+    """Content hashes of the source recipes behind a migrated corpus"""
+
+    def __init__(self, entries: Optional[Dict[str, ManifestEntry]] = None):
+        self.entries: Dict[str, ManifestEntry] = entries or {}
+
+    @classmethod
+    def load(cls, filepath: str) -> 'MigrationManifest':
+        """Load a manifest, returning an empty manifest if the file is missing or outdated"""
+        path = Path(filepath)
+        if not path.exists():
+            return cls()
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read migration manifest {filepath}: {e}")
+            return cls()
+
+        if data.get('version') != MANIFEST_VERSION:
+            logger.info(f"Ignoring migration manifest with version {data.get('version')}")
+            return cls()
+
+        return cls({key: ManifestEntry.from_dict(entry) for key, entry in data.get('recipes', {}).items()})
+
+    def save(self, filepath: str) -> None:
+        """Save the manifest"""
+        data = {
+            'version': MANIFEST_VERSION,
+            'updated_at': datetime.now().isoformat(),
+            'total_recipes': len(self.entries),
+            'recipes': {key: entry.to_dict() for key, entry in self.entries.items()}
+        }
+        temp_path = f"{filepath}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, ensure_ascii=False)
+        os.replace(temp_path, filepath)
+
+    def get_ingredient_ids(self) -> Set[str]:
+        """Get the IDs of all ingredients used by the recipes in the manifest"""
+        return {
+            IngredientExtractor._generate_ingredient_id(name)
+            for entry in self.entries.values()
+            for name in entry.ingredients
+        }
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def _load_output_recipes(output_path: str) -> List[Dict[str, Any]]:
+    """Load the serialized recipes of a migrated corpus"""
+    with open(output_path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('recipes', [])
+
+
+def build_manifest(recipes: List[Dict], output_path: str, failed_indexes: Optional[List[int]] = None) -> MigrationManifest:
+    """
+    Build the manifest for a full migration run
+
+    Args:
+        recipes: Source recipe dictionaries, in input order
+        output_path: Migrated recipes JSON file written by the run (recipes in input order)
+        failed_indexes: Input positions of recipes that failed to migrate (left out, so they are retried)
+
+    Returns:
+        MigrationManifest covering every successfully migrated recipe
+    """
+    failed = set(failed_indexes or [])
+    migrated = [recipe_dict for i, recipe_dict in enumerate(recipes) if i not in failed]
+    output_ids = [recipe.get('id', '') for recipe in _load_output_recipes(output_path)]
+
+    manifest = MigrationManifest()
+    for recipe_dict, output_id in zip(migrated, output_ids):
+        recipe_hash = compute_recipe_hash(recipe_dict)
+        manifest.entries[get_manifest_key(recipe_dict, recipe_hash)] = ManifestEntry(
+            hash=recipe_hash,
+            output_id=output_id,
+            ingredients=get_recipe_ingredient_names(recipe_dict)
+        )
+    return manifest
+
+
+@dataclass
+class MigrationChanges:
+    """What an incremental migration run changed"""
+    added: List[str] = field(default_factory=list)  # Manifest keys
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    ingredients_added: List[str] = field(default_factory=list)
+    ingredients_removed: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def summary(self) -> str:
+        """One-line summary of the changes"""
+        return (
+            f"{len(self.added)} added, {len(self.changed)} changed, {len(self.removed)} removed, "
+            f"{self.unchanged} unchanged, {len(self.failed)} failed; "
+            f"ingredients +{len(self.ingredients_added)}/-{len(self.ingredients_removed)} "
+            f"in {self.seconds:.2f}s"
+        )
+
+
+def can_migrate_incrementally(output_path: str, library_path: str, manifest_path: str) -> bool:
+    """Check that a previous migration left everything an incremental run needs"""
+    return all(Path(p).exists() for p in (output_path, library_path, manifest_path)) and \
+        len(MigrationManifest.load(manifest_path)) > 0
+
+
+def _diff_recipes(recipes: List[Dict], manifest: MigrationManifest) -> Tuple[List[Tuple[int, str, str, Dict]], List[str], int, List[str]]:
+    """
+    Compare source recipes against the manifest
+
+    Returns:
+        Tuple of (new or changed recipes as (input position, key, hash, recipe), removed keys,
+        unchanged count, manifest keys of all source recipes in input order)
+    """
+    pending = []
+    seen = []
+    unchanged = 0
+
+    for i, recipe_dict in enumerate(recipes):
+        if not isinstance(recipe_dict, dict):
+            continue
+        recipe_hash = compute_recipe_hash(recipe_dict)
+        key = get_manifest_key(recipe_dict, recipe_hash)
+        seen.append(key)
+
+        entry = manifest.entries.get(key)
+        if entry is not None and entry.hash == recipe_hash:
+            unchanged += 1
+        else:
+            pending.append((i, key, recipe_hash, recipe_dict))
+
+    seen_keys = set(seen)
+    removed = [key for key in manifest.entries if key not in seen_keys]
+    return pending, removed, unchanged, seen
+
+
+def migrate_incrementally(
+    recipes: List[Dict],
+    output_path: str,
+    library_path: str,
+    manifest_path: str,
+    workers: int = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    failure_report_path: Optional[str] = None
+) -> MigrationChanges:
+    """
+    Re-migrate only new and changed source recipes and patch the existing outputs
+
+    Args:
+        recipes: Source recipe dictionaries, in input order
+        output_path: Migrated recipes JSON file from a previous run
+        library_path: Ingredient library JSON file from a previous run
+        manifest_path: Migration manifest from a previous run
+        workers: Number of worker processes (defaults to the CPU count; 1 runs in-process)
+        chunk_size: Recipes per chunk
+        failure_report_path: Where to write the failure report (skipped if None)
+
+    Returns:
+        MigrationChanges describing what was added, changed and removed
+    """
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    manifest = MigrationManifest.load(manifest_path)
+    changes = MigrationChanges()
+
+    pending, removed, changes.unchanged, source_keys = _diff_recipes(recipes, manifest)
+    if not pending and not removed:
+        changes.seconds = time.perf_counter() - start
+        logger.info(f"Migration is up to date ({changes.unchanged} recipes unchanged)")
+        return changes
+
+    ingredient_library: Dict[str, Ingredient] = load_ingredient_library(Path(library_path))
+    previously_used = manifest.get_ingredient_ids()
+
+    # Add library ingredients for names introduced by new or changed recipes
+    usage = IngredientExtractor.collect_ingredient_usage([recipe_dict for _, _, _, recipe_dict in pending])
+    new_usage = {
+        name: uses for name, uses in usage.items()
+        if IngredientExtractor._generate_ingredient_id(name) not in ingredient_library
+    }
+    if new_usage:
+        new_ingredients = IngredientExtractor.create_ingredient_library(new_usage)
+        ingredient_library.update(new_ingredients)
+        changes.ingredients_added = sorted(new_ingredients)
+
+    # Migrate new and changed recipes
+    chunks = chunk_recipes([recipe_dict for _, _, _, recipe_dict in pending], chunk_size)
+    migrated: Dict[int, Dict[str, Any]] = {}  # Position in pending -> serialized recipe
+    failures: List[MigrationFailure] = []
+    for _, result in run_chunks(migrate_chunk, chunks, workers, _init_worker, (ingredient_library,)):
+        failed_positions = {failure.index for failure in result.failures}
+        positions = [index for index, _ in chunks[result.chunk_index] if index not in failed_positions]
+        migrated.update(zip(positions, result.recipes))
+        for failure in result.failures:
+            failure.index = pending[failure.index][0]  # Report the position in the source recipes
+            failures.append(failure)
+            logger.error(f"Failed to migrate recipe {failure.recipe_name}: {failure.error}")
+
+    # Patch the output corpus and manifest
+    output_by_id = {recipe.get('id'): recipe for recipe in _load_output_recipes(output_path)}
+    for key in removed:
+        output_by_id.pop(manifest.entries.pop(key).output_id, None)
+        changes.removed.append(key)
+
+    for position, (_, key, recipe_hash, recipe_dict) in enumerate(pending):
+        if position not in migrated:
+            # Failed recipes keep their previous version and are retried on the next run
+            changes.failed.append(key)
+            continue
+
+        recipe_output = migrated[position]
+        old_entry = manifest.entries.get(key)
+        if old_entry is not None:
+            output_by_id.pop(old_entry.output_id, None)
+            changes.changed.append(key)
+        else:
+            changes.added.append(key)
+
+        output_by_id[recipe_output['id']] = recipe_output
+        manifest.entries[key] = ManifestEntry(
+            hash=recipe_hash,
+            output_id=recipe_output['id'],
+            ingredients=get_recipe_ingredient_names(recipe_dict)
+        )
+
+    # Drop library ingredients that only removed or changed recipes used
+    still_used = manifest.get_ingredient_ids()
+    for ingredient_id in sorted(previously_used - still_used):
+        if ingredient_library.pop(ingredient_id, None) is not None:
+            changes.ingredients_removed.append(ingredient_id)
+
+    # Write the corpus in source order, keeping recipes not tracked by the manifest at the end
+    with RecipeStreamWriter(output_path) as writer:
+        for key in source_keys:
+            entry = manifest.entries.get(key)
+            recipe_output = output_by_id.pop(entry.output_id, None) if entry else None
+            if recipe_output is not None:
+                writer.write(recipe_output)
+        for recipe_output in output_by_id.values():
+            writer.write(recipe_output)
+
+    IngredientExtractor.save_ingredient_library(ingredient_library, library_path)
+    manifest.save(manifest_path)
+
+    changes.seconds = time.perf_counter() - start
+    if failure_report_path:
+        stats = MigrationStats(
+            total_recipes=len(pending), migrated=len(migrated), failed=len(failures),
+            unique_ingredients=len(ingredient_library), migration_seconds=changes.seconds,
+            workers=workers, chunk_size=chunk_size, failed_indexes=sorted(f.index for f in failures)
+        )
+        write_failure_report(failures, stats, failure_report_path)
+
+    logger.info(f"Incremental migration: {changes.summary()}")
+    return changes
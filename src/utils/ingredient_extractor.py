@@ -6,76 +6,24 @@ import re
 import json
 import logging
 from typing import Dict, List, Tuple, Optional, Set
-from dataclasses import dataclass
 from src.models.ingredient import Ingredient, create_basic_ingredient
+from src.utils import ingredient_parser
+from src.utils.ingredient_parser import ParsedIngredient
 
 logger = logging.getLogger(__name__)
 
-
-@dataclass
-class ParsedIngredient:
-    """Represents a parsed ingredient from recipe text"""
-    quantity: str
-    unit: str
-    name: str
-    preparation: str
-    original_text: str
-    confidence: float  # 0-1 how confident we are in the parsing
+# Quantity + unit in structured ingredient quantities, e.g. "2 dl"
+STRUCTURED_QUANTITY_PATTERN = re.compile(r'^([0-9/.,\s]+)(.*)$')
 
 
 class IngredientExtractor:
     """Extracts and normalizes ingredients from recipe text"""
 
-    # Common Norwegian units
-    NORWEGIAN_UNITS = {
-        'stk', 'stykk', 'stykker',
-        'dl', 'l', 'liter',
-        'g', 'gram', 'kg', 'kilogram',
-        'ss', 'spiseskje', 'spiseskjeer',
-        'ts', 'teskje', 'teskjeer',
-        'kopp', 'kopper', 'beger',
-        'pakke', 'pakker',
-        'boks', 'bokser',
-        'flaske', 'flasker',
-        'pose', 'poser',
-        'neve', 'never',
-        'klype', 'klype',
-        'dråpe', 'dråper'
-    }
-
-    # Common English units
-    ENGLISH_UNITS = {
-        'cup', 'cups', 'c',
-        'tbsp', 'tablespoon', 'tablespoons',
-        'tsp', 'teaspoon', 'teaspoons',
-        'oz', 'ounce', 'ounces',
-        'lb', 'pound', 'pounds',
-        'pt', 'pint', 'pints',
-        'qt', 'quart', 'quarts',
-        'gal', 'gallon', 'gallons',
-        'ml', 'milliliter', 'milliliters',
-        'can', 'cans', 'jar', 'jars',
-        'package', 'packages', 'pkg',
-        'piece', 'pieces', 'pc',
-        'slice', 'slices',
-        'pinch', 'pinches',
-        'dash', 'dashes',
-        'drop', 'drops'
-    }
-
-    ALL_UNITS = NORWEGIAN_UNITS | ENGLISH_UNITS
-
-    # Common preparation terms (Norwegian)
-    PREPARATION_TERMS = {
-        'hakket', 'kuttet', 'skåret', 'revet', 'malt', 'presset',
-        'kokt', 'stekt', 'rørt', 'pisket', 'blandet',
-        'fersk', 'tørr', 'tørket', 'frossen', 'tint',
-        'fin', 'grov', 'tynn', 'tykk',
-        'hel', 'halv', 'kvart',
-        'renset', 'skrelt', 'utsteinet',
-        'chopped', 'diced', 'sliced', 'minced', 'grated',
-        'fresh', 'dried', 'frozen', 'cooked', 'raw'
-    }
+    # Unit and preparation vocabularies used by the line parser
+    NORWEGIAN_UNITS = ingredient_parser.NORWEGIAN_UNITS
+    ENGLISH_UNITS = ingredient_parser.ENGLISH_UNITS
+    ALL_UNITS = ingredient_parser.ALL_UNITS
+    PREPARATION_TERMS = ingredient_parser.PREPARATION_TERMS
 
     @classmethod
     def parse_ingredient_text(cls, text: str) -> ParsedIngredient:
@@ -85,118 +33,20 @@ class IngredientExtractor:
         Examples:
         "2 dl melk" -> quantity=2, unit=dl, name=melk
         "500 g hakket kjøttdeig" -> quantity=500, unit=g, name=kjøttdeig, prep=hakket
-        "1 stor løk, hakket" -> quantity=1, unit=stor, name=løk, prep=hakket
-        """
-        original = text.strip()
-        text = original.lower()
-
-        # Initialize result
-        result = ParsedIngredient(
-            quantity="",
-            unit="",
-            name="",
-            preparation="",
-            original_text=original,
-            confidence=0.5
-        )
-
-        # Pattern 1: Number + unit + ingredient (+ preparation)
-        # "2 dl melk" or "500 g hakket kjøttdeig"
-        pattern1 = r'^(\d+(?:[.,]\d+)?)\s+([a-zæøå]+)\s+(.+)$'
-        match1 = re.match(pattern1, text)
-
-        if match1:
-            qty, unit, rest = match1.groups()
-            result.quantity = qty.replace(',', '.')
-
-            if unit in cls.ALL_UNITS:
-                result.unit = unit
-                result.confidence += 0.3
-            else:
-                # Unit might be part of name (like "stor løk")
-                rest = f"{unit} {rest}"
-                result.unit = ""
-
-            # Split rest into name and preparation
-            name_and_prep = cls._extract_preparation(rest)
-            result.name = name_and_prep['name']
-            result.preparation = name_and_prep['preparation']
-
-            if result.name:
-                result.confidence += 0.2
-
-            return result
-
-        # Pattern 2: Fraction + unit + ingredient
-        # "1/2 kopp sukker"
-        pattern2 = r'^(\d+/\d+)\s+([a-zæøå]+)\s+(.+)$'
-        match2 = re.match(pattern2, text)
-
-        if match2:
-            qty, unit, rest = match2.groups()
-            result.quantity = qty
+        "1 stor løk, hakket" -> quantity=1, unit="", name=stor løk, prep=hakket
 
-            if unit in cls.ALL_UNITS:
-                result.unit = unit
-                result.confidence += 0.3
-            else:
-                rest = f"{unit} {rest}"
-                result.unit = ""
-
-            name_and_prep = cls._extract_preparation(rest)
-            result.name = name_and_prep['name']
-            result.preparation = name_and_prep['preparation']
-            result.confidence += 0.2
-
-            return result
-
-        # Pattern 3: Just ingredient name with optional preparation
-        # "salt", "hakket persille"
-        name_and_prep = cls._extract_preparation(text)
-        result.name = name_and_prep['name']
-        result.preparation = name_and_prep['preparation']
-
-        if result.name:
-            result.confidence += 0.1
-
-        return result
+        The line is parsed in a single pass that also fills in the ingredient ID and
+        category (see src/utils/ingredient_parser.py).
+        """
+        return ingredient_parser.parse_ingredient_line(text)
 
     @classmethod
     def _extract_preparation(cls, text: str) -> Dict[str, str]:
         """Extract preparation method from ingredient name"""
-        text = text.strip()
-
-        # Look for preparation terms
-        for prep_term in cls.PREPARATION_TERMS:
-            if prep_term in text:
-                # Remove preparation term to get clean name
-                name = text.replace(prep_term, '').strip()
-                name = re.sub(r'\s+', ' ', name)  # Clean multiple spaces
-                name = name.strip(',')  # Remove trailing commas
-
-                return {
-                    'name': name,
-                    'preparation': prep_term
-                }
-
-        # Check for comma-separated preparation
-        # "løk, hakket"
-        if ',' in text:
-            parts = text.split(',')
-            if len(parts) == 2:
-                name = parts[0].strip()
-                prep = parts[1].strip()
-
-                # Check if second part is likely preparation
-                if any(term in prep for term in cls.PREPARATION_TERMS):
-                    return {
-                        'name': name,
-                        'preparation': prep
-                    }
-
+        name, preparation = ingredient_parser.split_preparation(text)
         return {
-            'name': text.strip(),
-            'preparation': ""
+            'name': name,
+            'preparation': preparation
         }
 
     @classmethod
@@ -234,8 +84,7 @@ class IngredientExtractor:
         unit = ""
         if quantity:
             # Try to separate quantity and unit
-            import re
-            match = re.match(r'^([0-9/.,\s]+)(.*)$', quantity)
+            match = STRUCTURED_QUANTITY_PATTERN.match(quantity)
             if match:
                 qty_part = match.group(1).strip()
                 unit_part = match.group(2).strip()
@@ -245,22 +94,23 @@ class IngredientExtractor:
         # Combine note as preparation
         preparation = note
 
+        normalized = ingredient_parser.normalize_ingredient_name(name)
         return ParsedIngredient(
             quantity=quantity,
             unit=unit,
             name=name,
             preparation=preparation,
             original_text=raw_text or f"{quantity} {unit} {name}".strip(),
-            confidence=0.8  # High confidence for structured data
+            confidence=0.8,  # High confidence for structured data
+            ingredient_id=ingredient_parser.generate_ingredient_id(normalized),
+            category=ingredient_parser.determine_category(normalized)
         )
 
     @classmethod
-    def build_ingredient_library(cls, recipes: List[Dict]) -> Dict[str, Ingredient]:
-        """Build ingredient library from all recipes"""
-        ingredient_names = set()
+    def collect_ingredient_usage(cls, recipes: List[Dict]) -> Dict[str, List[Dict]]:
+        """Collect normalized ingredient names and their usage from recipes (map step of the library build)"""
         ingredient_usage = {}  # Track how often each ingredient is used
 
-        # First pass: collect all unique ingredient names
         for recipe in recipes:
             parsed_ingredients = cls.extract_ingredients_from_recipe(recipe)
 
@@ -268,7 +118,6 @@ class IngredientExtractor:
                 if parsed_ing.name:
                     # Normalize name
                     name = cls._normalize_ingredient_name(parsed_ing.name)
-                    ingredient_names.add(name)
 
                     # Track usage
                     if name not in ingredient_usage:
@@ -281,10 +130,30 @@ class IngredientExtractor:
                         'preparation': parsed_ing.preparation
                     })
 
-        # Second pass: create Ingredient objects
+        return ingredient_usage
+
+    @classmethod
+    def merge_ingredient_usage(cls, usages: List[Dict[str, List[Dict]]]) -> Dict[str, List[Dict]]:
+        """Merge ingredient usage collected from separate recipe chunks (reduce step of the library build)"""
+        merged = {}
+        for usage in usages:
+            for name, uses in usage.items():
+                merged.setdefault(name, []).extend(uses)
+        return merged
+
+    @classmethod
+    def create_ingredient_library(cls, ingredient_usage: Dict[str, List[Dict]],
+                                  usage_counts: Optional[Dict[str, int]] = None) -> Dict[str, Ingredient]:
+        """
+        Create Ingredient objects from collected ingredient usage
+
+        Args:
+            ingredient_usage: Normalized ingredient name -> usages (or just the first usage examples)
+            usage_counts: Total usage count per name, when ingredient_usage only holds examples
+        """
         ingredient_library = {}
 
-        for name in ingredient_names:
+        for name, uses in ingredient_usage.items():
             ingredient_id = cls._generate_ingredient_id(name)
 
             # Determine category based on name patterns
@@ -298,84 +167,38 @@ class IngredientExtractor:
             )
 
             # Add usage statistics as metadata
-            ingredient.usage_count = len(ingredient_usage.get(name, []))
-            ingredient.usage_examples = ingredient_usage.get(name, [])[:5]  # First 5 examples
+            ingredient.usage_count = usage_counts.get(name, len(uses)) if usage_counts else len(uses)
+            ingredient.usage_examples = uses[:5]  # First 5 examples
 
             ingredient_library[ingredient_id] = ingredient
 
         logger.info(f"Built ingredient library with {len(ingredient_library)} ingredients")
         return ingredient_library
 
+    @classmethod
+    def build_ingredient_library(cls, recipes: List[Dict]) -> Dict[str, Ingredient]:
+        """Build ingredient library from all recipes"""
+        return cls.create_ingredient_library(cls.collect_ingredient_usage(recipes))
+
     @classmethod
     def _normalize_ingredient_name(cls, name: str) -> str:
         """Normalize ingredient name for consistency"""
-        # Remove extra whitespace
-        name = re.sub(r'\s+', ' ', name.strip())
-
-        # Remove parenthetical notes
-        name = re.sub(r'\([^)]*\)', '', name).strip()
-
-        # Remove size descriptors that vary
-        size_terms = ['stor', 'liten', 'medium', 'små', 'store']
-        words = name.split()
-        words = [w for w in words if w not in size_terms]
-        name = ' '.join(words)
-
-        return name.strip()
+        return ingredient_parser.normalize_ingredient_name(name)
 
     @classmethod
     def _generate_ingredient_id(cls, name: str) -> str:
         """Generate a consistent ID for an ingredient"""
-        # Convert to lowercase, replace spaces with underscores
-        ingredient_id = name.lower()
-        ingredient_id = re.sub(r'[æ]', 'ae', ingredient_id)
-        ingredient_id = re.sub(r'[ø]', 'o', ingredient_id)
-        ingredient_id = re.sub(r'[å]', 'aa', ingredient_id)
-        ingredient_id = re.sub(r'[^a-z0-9\s]', '', ingredient_id)
-        ingredient_id = re.sub(r'\s+', '_', ingredient_id)
-
-        return ingredient_id
+        return ingredient_parser.generate_ingredient_id(name)
 
     @classmethod
     def _determine_ingredient_category(cls, name: str) -> str:
         """Determine ingredient category based on name patterns"""
-        name_lower = name.lower()
-
-        # Meat and fish
-        meat_keywords = ['kjøtt', 'beef', 'kylling', 'chicken', 'fisk', 'fish', 'laks', 'torsk']
-        if any(keyword in name_lower for keyword in meat_keywords):
-            return 'protein'
-
-        # Dairy
-        dairy_keywords = ['melk', 'milk', 'ost', 'cheese', 'smør', 'butter', 'fløte', 'cream']
-        if any(keyword in name_lower for keyword in dairy_keywords):
-            return 'dairy'
-
-        # Vegetables
-        veg_keywords = ['løk', 'onion', 'gulrot', 'carrot', 'tomat', 'tomato', 'pepper', 'salat']
-        if any(keyword in name_lower for keyword in veg_keywords):
-            return 'vegetable'
-
-        # Fruits
-        fruit_keywords = ['eple', 'apple', 'banan', 'banana', 'sitron', 'lemon', 'appelsin']
-        if any(keyword in name_lower for keyword in fruit_keywords):
-            return 'fruit'
-
-        # Grains and carbs
-        grain_keywords = ['mel', 'flour', 'ris', 'rice', 'pasta', 'brød', 'bread', 'havre', 'oats']
-        if any(keyword in name_lower for keyword in grain_keywords):
-            return 'grain'
-
-        # Seasonings
-        seasoning_keywords = ['salt', 'pepper', 'krydder', 'spice', 'basilikum', 'oregano', 'timian']
-        if any(keyword in name_lower for keyword in seasoning_keywords):
-            return 'seasoning'
-
-        return 'other'
+        return ingredient_parser.determine_category(name)
 
     @classmethod
-    def save_ingredient_library(cls, ingredient_library: Dict[str, Ingredient], filepath: str) -> None:
-        """Save ingredient library to JSON file"""
+    def save_ingredient_library(cls, ingredient_library: Dict[str, Ingredient], filepath: str,
+                                export_info: Optional[Dict] = None) -> None:
+        """Save ingredient library to JSON file, with optional extra export metadata"""
         # Convert ingredients to dictionary format
         library_dict = {}
         for ingredient_id, ingredient in ingredient_library.items():
@@ -386,7 +209,8 @@ class IngredientExtractor:
             'export_info': {
                 'exported_at': '2025-09-14T00:00:00',
                 'total_ingredients': len(library_dict),
-                'extraction_method': 'automated_from_recipes'
+                'extraction_method': 'automated_from_recipes',
+                **(export_info or {})
             },
             'ingredients': library_dict
         }
@@ -0,0 +1,190 @@
+"""
+Indexed ingredient matcher - maps parsed ingredient names to ingredient library IDs
+
+Library names are normalized once up front. Exact matches are a hash lookup, and
+partial and fuzzy matches only look at candidates found through character trigram
+indexes instead of scanning the whole library for every line.
+
+Compared to the linear scan RecipeMigrator used before, the candidates are the same
+(any library name containing, or contained in, the normalized name), but:
+- A partial match picks the candidate closest in length to the name, not the first
+  one in library order (so "hvitløk" maps to hvitløk rather than løk)
+- Library names are normalized before partial matching, like the name being matched
+- Aliases are matched as well as the Norwegian name
+- Names without an exact or partial match get a fuzzy trigram match (misspellings)
+  before falling back to a generated ID
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from src.models.ingredient import Ingredient
+from src.utils.ingredient_extractor import IngredientExtractor
+
+logger = logging.getLogger(__name__)
+
+# Minimum trigram similarity for a fuzzy match
+DEFAULT_MIN_FUZZY_SCORE = 0.6
+
+
+@dataclass
+class IngredientMatch:
+    """Result of matching an ingredient name against the library"""
+    ingredient_id: str
+    confidence: float  # 1.0 for exact matches, 0.0 when no library ingredient matched
+    method: str  # 'exact', 'partial', 'fuzzy' or 'generated'
+
+    @property
+    def matched(self) -> bool:
+        return self.method != 'generated'
+
+
+def normalize_for_matching(name: str) -> str:
+    """Normalize an ingredient name for matching"""
+    return IngredientExtractor._normalize_ingredient_name(name).lower()
+
+
+def get_trigrams(text: str) -> Set[str]:
+    """Get the character trigrams of a text, padded so short words still get trigrams"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def get_inner_trigrams(text: str) -> Set[str]:
+    """Get the unpadded character trigrams of a text (shared by every text containing it)"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class IngredientMatcher:
+    """Hash map plus word/trigram index over the normalized ingredient library names"""
+
+    def __init__(self, ingredient_library: Dict[str, Ingredient], min_fuzzy_score: float = DEFAULT_MIN_FUZZY_SCORE):
+        """
+        Build the matcher indexes for an ingredient library
+
+        Args:
+            ingredient_library: Dictionary of ingredient ID -> Ingredient
+            min_fuzzy_score: Minimum trigram similarity (0-1) to accept a fuzzy match
+        """
+        self.min_fuzzy_score = min_fuzzy_score
+        self.names: List[str] = []  # Normalized library names
+        self.name_ids: List[str] = []  # Ingredient ID for each name
+        self.exact: Dict[str, str] = {}
+        self.trigram_index: Dict[str, Set[int]] = {}
+        self.inner_trigram_index: Dict[str, Set[int]] = {}
+        self._name_trigrams: List[Set[str]] = []
+        self._inner_trigram_counts: List[int] = []
+        self._short_names: Set[int] = set()  # Names too short to have inner trigrams
+
+        for ingredient_id, ingredient in ingredient_library.items():
+            names = [ingredient.names.get('no', '')] + list(getattr(ingredient, 'aliases', []) or [])
+            for name in names:
+                normalized = normalize_for_matching(name) if name else ''
+                if not normalized or normalized in self.exact:
+                    continue
+                self._add_name(normalized, ingredient_id)
+
+        logger.info(f"Built ingredient matcher with {len(self.names)} names")
+
+    def _add_name(self, normalized: str, ingredient_id: str) -> None:
+        """Add a normalized name to the indexes"""
+        position = len(self.names)
+        self.names.append(normalized)
+        self.name_ids.append(ingredient_id)
+        self.exact[normalized] = ingredient_id
+
+        trigrams = get_trigrams(normalized)
+        self._name_trigrams.append(trigrams)
+        for trigram in trigrams:
+            self.trigram_index.setdefault(trigram, set()).add(position)
+
+        inner_trigrams = get_inner_trigrams(normalized)
+        self._inner_trigram_counts.append(len(inner_trigrams))
+        if not inner_trigrams:
+            self._short_names.add(position)
+        for trigram in inner_trigrams:
+            self.inner_trigram_index.setdefault(trigram, set()).add(position)
+
+    def _find_partial(self, normalized: str) -> Optional[IngredientMatch]:
+        """Find a library name containing, or contained in, the normalized name"""
+        best_position = None
+        best_score = 0.0
+
+        # Library names containing the query have all of the query's inner trigrams;
+        # queries too short to have trigrams are checked against every name
+        query_trigrams = get_inner_trigrams(normalized)
+        candidates: Optional[Set[int]] = None if query_trigrams else set(range(len(self.names)))
+        for trigram in sorted(query_trigrams, key=lambda t: len(self.inner_trigram_index.get(t, ()))):
+            postings = self.inner_trigram_index.get(trigram, set())
+            candidates = set(postings) if candidates is None else candidates & postings
+            if not candidates:
+                break
+        candidates = candidates or set()
+
+        # Library names contained in the query have all of their inner trigrams in the query
+        shared: Dict[int, int] = {}
+        for trigram in query_trigrams:
+            for position in self.inner_trigram_index.get(trigram, ()):
+                shared[position] = shared.get(position, 0) + 1
+        candidates |= {position for position, count in shared.items() if count == self._inner_trigram_counts[position]}
+        candidates |= self._short_names
+
+        for position in candidates:
+            name = self.names[position]
+            if normalized in name or name in normalized:
+                score = min(len(name), len(normalized)) / max(len(name), len(normalized))
+                if best_position is None or score > best_score or (score == best_score and position < best_position):
+                    best_position = position
+                    best_score = score
+
+        if best_position is None:
+            return None
+        return IngredientMatch(self.name_ids[best_position], round(0.5 + 0.4 * best_score, 3), 'partial')
+
+    def _find_fuzzy(self, normalized: str) -> Optional[IngredientMatch]:
+        """Find the most similar library name by trigram overlap (Dice coefficient)"""
+        query_trigrams = get_trigrams(normalized)
+        overlaps: Dict[int, int] = {}
+        for trigram in query_trigrams:
+            for position in self.trigram_index.get(trigram, ()):
+                overlaps[position] = overlaps.get(position, 0) + 1
+
+        best_position = None
+        best_score = 0.0
+        for position, overlap in overlaps.items():
+            score = 2 * overlap / (len(query_trigrams) + len(self._name_trigrams[position]))
+            if score > best_score:
+                best_position = position
+                best_score = score
+
+        if best_position is None or best_score < self.min_fuzzy_score:
+            return None
+        return IngredientMatch(self.name_ids[best_position], round(0.5 * best_score, 3), 'fuzzy')
+
+    def match(self, name: str) -> IngredientMatch:
+        """
+        Match an ingredient name against the library
+
+        Args:
+            name: Ingredient name as parsed from a recipe line
+
+        Returns:
+            IngredientMatch with the matched (or generated) ingredient ID and confidence
+        """
+        if not name:
+            return IngredientMatch('unknown_ingredient', 0.0, 'generated')
+
+        normalized = normalize_for_matching(name)
+
+        ingredient_id = self.exact.get(normalized)
+        if ingredient_id:
+            return IngredientMatch(ingredient_id, 1.0, 'exact')
+
+        if normalized:
+            match = self._find_partial(normalized) or self._find_fuzzy(normalized)
+            if match:
+                return match
+
+        # No match found - generate ID from name
+        return IngredientMatch(IngredientExtractor._generate_ingredient_id(name), 0.0, 'generated')
@@ -0,0 +1,263 @@
+"""
+Compiled, single-pass ingredient line parser
+
+Parses an ingredient line into quantity, unit, name, preparation, ingredient ID and
+category in one pass. The quantity and unit come from one precompiled pattern, and
+preparation terms and category keywords are found with Aho-Corasick automata, so
+each line is scanned once per keyword set instead of once per keyword.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+@dataclass
+class ParsedIngredient:
+    """Represents a parsed ingredient from recipe text"""
+    quantity: str
+    unit: str
+    name: str
+    preparation: str
+    original_text: str
+    confidence: float  # 0-1 how confident we are in the parsing
+    ingredient_id: str = ""  # Generated from the normalized name
+    category: str = ""
+
+
+# Common Norwegian units
+NORWEGIAN_UNITS = {
+    'stk', 'stykk', 'stykker',
+    'dl', 'l', 'liter',
+    'g', 'gram', 'kg', 'kilogram',
+    'ss', 'spiseskje', 'spiseskjeer',
+    'ts', 'teskje', 'teskjeer',
+    'kopp', 'kopper', 'beger',
+    'pakke', 'pakker',
+    'boks', 'bokser',
+    'flaske', 'flasker',
+    'pose', 'poser',
+    'neve', 'never',
+    'klype', 'klype',
+    'dråpe', 'dråper'
+}
+
+# Common English units
+ENGLISH_UNITS = {
+    'cup', 'cups', 'c',
+    'tbsp', 'tablespoon', 'tablespoons',
+    'tsp', 'teaspoon', 'teaspoons',
+    'oz', 'ounce', 'ounces',
+    'lb', 'pound', 'pounds',
+    'pt', 'pint', 'pints',
+    'qt', 'quart', 'quarts',
+    'gal', 'gallon', 'gallons',
+    'ml', 'milliliter', 'milliliters',
+    'can', 'cans', 'jar', 'jars',
+    'package', 'packages', 'pkg',
+    'piece', 'pieces', 'pc',
+    'slice', 'slices',
+    'pinch', 'pinches',
+    'dash', 'dashes',
+    'drop', 'drops'
+}
+
+ALL_UNITS = NORWEGIAN_UNITS | ENGLISH_UNITS
+
+# Common preparation terms (Norwegian)
+PREPARATION_TERMS = {
+    'hakket', 'kuttet', 'skåret', 'revet', 'malt', 'presset',
+    'kokt', 'stekt', 'rørt', 'pisket', 'blandet',
+    'fersk', 'tørr', 'tørket', 'frossen', 'tint',
+    'fin', 'grov', 'tynn', 'tykk',
+    'hel', 'halv', 'kvart',
+    'renset', 'skrelt', 'utsteinet',
+    'chopped', 'diced', 'sliced', 'minced', 'grated',
+    'fresh', 'dried', 'frozen', 'cooked', 'raw'
+}
+
+# Size descriptors that vary between recipes and are dropped from names
+SIZE_TERMS = {'stor', 'liten', 'medium', 'små', 'store'}
+
+# Category keywords, in priority order (the first category with a matching keyword wins)
+CATEGORY_KEYWORDS: List[Tuple[str, List[str]]] = [
+    ('protein', ['kjøtt', 'beef', 'kylling', 'chicken', 'fisk', 'fish', 'laks', 'torsk']),
+    ('dairy', ['melk', 'milk', 'ost', 'cheese', 'smør', 'butter', 'fløte', 'cream']),
+    ('vegetable', ['løk', 'onion', 'gulrot', 'carrot', 'tomat', 'tomato', 'pepper', 'salat']),
+    ('fruit', ['eple', 'apple', 'banan', 'banana', 'sitron', 'lemon', 'appelsin']),
+    ('grain', ['mel', 'flour', 'ris', 'rice', 'pasta', 'brød', 'bread', 'havre', 'oats']),
+    ('seasoning', ['salt', 'pepper', 'krydder', 'spice', 'basilikum', 'oregano', 'timian']),
+]
+DEFAULT_CATEGORY = 'other'
+
+# Quantity (decimal or fraction) + unit word + rest, e.g. "2 dl melk", "1/2 kopp sukker"
+LINE_PATTERN = re.compile(
+    r'^(?:(?P<quantity>\d+(?:[.,]\d+)?|(?P<fraction>\d+/\d+))\s+(?P<unit>[a-zæøå]+)\s+)?(?P<rest>.+)$'
+)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+PARENTHESES_PATTERN = re.compile(r'\([^)]*\)')
+ID_INVALID_CHARS_PATTERN = re.compile(r'[^a-z0-9\s]')
+ID_TRANSLITERATION = str.maketrans({'æ': 'ae', 'ø': 'o', 'å': 'aa'})
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton finding all keyword occurrences in a text in one scan"""
+
+    def __init__(self, keywords: Iterable[Tuple[str, Any]]):
+        """
+        Build the automaton
+
+        Args:
+            keywords: (keyword, value) pairs; the first value is kept for repeated keywords
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, Any]]] = [[]]
+        seen = set()
+
+        for keyword, value in keywords:
+            if not keyword or keyword in seen:
+                continue
+            seen.add(keyword)
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((keyword, value))
+
+        # Breadth-first pass to set failure links, merge outputs along them and resolve
+        # failures into a full transition table, so scanning never has to backtrack
+        self._delta: List[Dict[str, int]] = [dict(self._goto[0])] + [{} for _ in self._goto[1:]]
+        queue = list(self._goto[0].values())
+        for state in queue:
+            self._delta[state] = {**self._delta[self._fail[state]], **self._goto[state]}
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                self._fail[next_state] = self._delta[self._fail[state]].get(char, 0) if state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_all(self, text: str) -> List[Tuple[int, str, Any]]:
+        """
+        Find all keyword occurrences in a text
+
+        Returns:
+            List of (start position, keyword, value), ordered by end position
+        """
+        matches = []
+        delta = self._delta
+        output = self._output
+        state = 0
+
+        for i, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            if output[state]:
+                for keyword, value in output[state]:
+                    matches.append((i - len(keyword) + 1, keyword, value))
+
+        return matches
+
+
+PREPARATION_AUTOMATON = KeywordAutomaton((term, term) for term in sorted(PREPARATION_TERMS))
+CATEGORY_AUTOMATON = KeywordAutomaton(
+    (keyword, priority)
+    for priority, (_, keywords) in enumerate(CATEGORY_KEYWORDS)
+    for keyword in keywords
+)
+
+
+def split_preparation(text: str) -> Tuple[str, str]:
+    """
+    Split a preparation term off an ingredient name
+
+    Args:
+        text: Lowercase ingredient text, e.g. "hakket persille"
+
+    Returns:
+        Tuple of (name, preparation); the longest preparation term found wins
+    """
+    text = text.strip()
+    matches = PREPARATION_AUTOMATON.find_all(text)
+    if not matches:
+        return text, ""
+
+    _, term, _ = min(matches, key=lambda m: (-len(m[1]), m[0]))
+    name = WHITESPACE_PATTERN.sub(' ', text.replace(term, '').strip()).strip(',')
+    return name, term
+
+
+def normalize_ingredient_name(name: str) -> str:
+    """Normalize ingredient name for consistency (parenthetical notes and size descriptors removed)"""
+    name = PARENTHESES_PATTERN.sub('', name)
+    return ' '.join(word for word in name.split() if word not in SIZE_TERMS)
+
+
+def generate_ingredient_id(name: str) -> str:
+    """Generate a consistent ID for an ingredient"""
+    ingredient_id = ID_INVALID_CHARS_PATTERN.sub('', name.lower().translate(ID_TRANSLITERATION))
+    return WHITESPACE_PATTERN.sub('_', ingredient_id)
+
+
+def determine_category(name: str) -> str:
+    """Determine ingredient category based on name keywords"""
+    priorities = [priority for _, _, priority in CATEGORY_AUTOMATON.find_all(name.lower())]
+    return CATEGORY_KEYWORDS[min(priorities)][0] if priorities else DEFAULT_CATEGORY
+
+
+def parse_ingredient_line(text: str) -> ParsedIngredient:
+    """
+    Parse an ingredient line into components in one pass
+
+    Examples:
+    "2 dl melk" -> quantity=2, unit=dl, name=melk
+    "500 g hakket kjøttdeig" -> quantity=500, unit=g, name=kjøttdeig, prep=hakket
+    "1 stor løk, hakket" -> quantity=1, unit="", name=stor løk, prep=hakket
+
+    Args:
+        text: Ingredient line as written in a recipe
+
+    Returns:
+        ParsedIngredient including the generated ingredient ID and category
+    """
+    original = text.strip()
+    lowered = original.lower()
+
+    match = LINE_PATTERN.match(lowered)
+    quantity = match.group('quantity') if match else None
+    rest = match.group('rest') if match else lowered
+    confidence = 0.5
+    unit = ""
+
+    if quantity:
+        unit = match.group('unit')
+        quantity = quantity.replace(',', '.')
+        if unit in ALL_UNITS:
+            confidence += 0.3
+        else:
+            # Unit might be part of name (like "stor løk")
+            rest = f"{unit} {rest}"
+            unit = ""
+
+    name, preparation = split_preparation(rest)
+
+    if quantity and (name or match.group('fraction')):
+        confidence += 0.2
+    elif not quantity and name:
+        confidence += 0.1
+
+    normalized = normalize_ingredient_name(name)
+    return ParsedIngredient(
+        quantity=quantity or "",
+        unit=unit,
+        name=name,
+        preparation=preparation,
+        original_text=original,
+        confidence=confidence,
+        ingredient_id=generate_ingredient_id(normalized),
+        category=determine_category(normalized)
+    )
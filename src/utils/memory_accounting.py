@@ -0,0 +1,346 @@
+"""
+Memory accounting for sessions, caches and shared structures
+
+Reports the deep size (everything reachable, found with gc.get_referents) of each
+st.session_state entry, of the Streamlit and function caches, and of process-wide
+structures registered by their modules (e.g. the recipe matrix cache). Function
+caches are registered by the app (main.py), so low-level modules need not import this one.
+
+Modules register the session entries that can be rebuilt when needed as evictable
+(e.g. the loaded recipe corpus, which the pages reload when it is missing) and touch
+them when used. main.py accounts the session at the end of every rerun: each
+session's total is kept for the developer panel, and when a per-session cap is set
+(CHEFS_ASSISTANT_SESSION_MEMORY_MB, read at startup; default 0 = no cap) the least recently used
+evictable entries not used in this rerun are dropped, the largest first among
+equally recent ones, until the session is under its cap.
+
+Measuring a large entry takes tens of milliseconds, so sizes are reused while an
+entry's value is the same object and re-measured every REMEASURE_RERUNS reruns.
+Objects that several entries of a session reference are counted in each of them.
+"""
+
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+import types
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SESSION_CAP_ENV_VAR = "CHEFS_ASSISTANT_SESSION_MEMORY_MB"
+DEFAULT_SESSION_CAP_MB = 0.0
+
+# Reruns after which an unchanged entry is measured again (contents may change in place)
+REMEASURE_RERUNS = 20
+
+# Sessions not accounted for this long are dropped from the process-wide totals
+SESSION_STALE_SECONDS = 3600
+
+# Session state keys used by the accounting itself
+RERUN_KEY = '_memory_rerun'
+LAST_USED_KEY = '_memory_last_used'
+SIZES_KEY = '_memory_sizes'
+_INTERNAL_KEYS = (RERUN_KEY, LAST_USED_KEY, SIZES_KEY)
+
+# Objects not followed when measuring (shared by the whole process)
+_UNSIZED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+                  types.MethodType, types.CodeType, types.FrameType)
+
+
+def _read_cap_mb() -> float:
+    try:
+        return float(os.environ.get(SESSION_CAP_ENV_VAR, DEFAULT_SESSION_CAP_MB))
+    except ValueError:
+        logger.warning(f"Invalid {SESSION_CAP_ENV_VAR}, sessions are not capped")
+        return DEFAULT_SESSION_CAP_MB
+
+
+_session_cap_bytes = int(_read_cap_mb() * 1024 * 1024)
+
+
+@dataclass
+class MemoryUsage:
+    """Size of one session entry, cache or shared structure"""
+    name: str
+    kind: str  # 'session', 'cache' or 'shared'
+    bytes: Optional[int]  # None where the size cannot be measured
+    entries: Optional[int] = None
+    evictable: bool = False
+    last_used: Optional[int] = None  # Rerun number, for evictable session entries
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization"""
+        return asdict(self)
+
+
+@dataclass
+class SessionMemory:
+    """Latest accounting of one session"""
+    session_id: str
+    bytes: int
+    entries: int
+    reruns: int
+    evictions: int = 0
+    updated_at: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization"""
+        data = asdict(self)
+        data['updated_at'] = datetime.fromtimestamp(self.updated_at).isoformat(timespec='seconds')
+        return data
+
+
+class MemoryRegistry:
+    """Evictable entries, caches and shared structures, and the latest total of every session"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.evictable: Dict[str, Tuple[str, ...]] = {}
+        self.function_caches: Dict[str, Callable] = {}
+        self.shared: Dict[str, Callable[[], Any]] = {}
+        self._sessions: Dict[str, SessionMemory] = {}
+
+    def record_session(self, memory: SessionMemory) -> None:
+        with self._lock:
+            previous = self._sessions.get(memory.session_id)
+            if previous is not None:
+                memory.evictions += previous.evictions
+            self._sessions[memory.session_id] = memory
+            cutoff = time.time() - SESSION_STALE_SECONDS
+            for session_id in [s for s, m in self._sessions.items() if m.updated_at < cutoff]:
+                del self._sessions[session_id]
+
+    def sessions(self) -> List[SessionMemory]:
+        """Latest totals of the active sessions, largest first"""
+        with self._lock:
+            return sorted(self._sessions.values(), key=lambda m: -m.bytes)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+
+memory_registry = MemoryRegistry()
+
+
+def register_evictable(name: str, *keys: str) -> None:
+    """
+    Register session state keys that can be dropped together and rebuilt when needed
+
+    Args:
+        name: Entry name shown in the accounting and used with touch()
+        *keys: Session state keys making up the entry
+    """
+    memory_registry.evictable[name] = keys
+
+
+def register_function_cache(name: str, func: Callable) -> None:
+    """Register an functools.lru_cache-wrapped function (reported by entry count)"""
+    memory_registry.function_caches[name] = func
+
+
+def register_shared_structure(name: str, getter: Callable[[], Any]) -> None:
+    """Register a process-wide structure, measured through the getter"""
+    memory_registry.shared[name] = getter
+
+
+def get_session_cap_bytes() -> int:
+    """Per-session cap in bytes (0 when sessions are not capped)"""
+    return _session_cap_bytes
+
+
+
+def reachable_sizes(roots: Iterable[Any]) -> Dict[int, int]:
+    """Sizes in bytes of all objects reachable from the roots, by object id"""
+    sizes: Dict[int, int] = {}
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in sizes or isinstance(obj, _UNSIZED_TYPES):
+            continue
+        sizes[id(obj)] = sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return sizes
+
+
+def deep_sizeof(*objects: Any) -> int:
+    """Total size in bytes of the objects and everything they reference"""
+    return sum(reachable_sizes(objects).values())
+
+
+def _get_session_state():
+    """Session state of the running script, or None outside a Streamlit session"""
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    return st.session_state if get_script_run_ctx(suppress_warning=True) is not None else None
+
+
+def touch(name: str) -> None:
+    """Mark an evictable entry of this session as used in the current rerun"""
+    session_state = _get_session_state()
+    if session_state is None:
+        return
+    last_used = session_state.get(LAST_USED_KEY)
+    if last_used is None:
+        last_used = session_state[LAST_USED_KEY] = {}
+    last_used[name] = session_state.get(RERUN_KEY, 0)
+
+
+def _measure(session_state, name: str, keys: Tuple[str, ...], rerun: int) -> int:
+    """Size of a session entry, reusing the last measurement while its values are unchanged"""
+    sizes = session_state[SIZES_KEY]
+    values = [session_state[key] for key in keys if key in session_state]
+    identity = tuple(id(value) for value in values)
+    cached = sizes.get(name)
+    if cached is not None and cached[0] == identity and rerun - cached[2] < REMEASURE_RERUNS:
+        return cached[1]
+    size = deep_sizeof(*values)
+    sizes[name] = (identity, size, rerun)
+    return size
+
+
+def session_usage(session_state=None) -> List[MemoryUsage]:
+    """
+    Deep size of each entry of a session, largest first
+
+    Keys registered together as an evictable entry are reported as that entry.
+
+    Args:
+        session_state: Session state to measure (defaults to the running session's)
+    """
+    session_state = session_state if session_state is not None else _get_session_state()
+    if session_state is None:
+        return []
+    if SIZES_KEY not in session_state:
+        session_state[SIZES_KEY] = {}
+    rerun = session_state.get(RERUN_KEY, 0)
+    last_used = session_state.get(LAST_USED_KEY) or {}
+
+    usage = []
+    grouped = set()
+    for name, keys in memory_registry.evictable.items():
+        present = tuple(key for key in keys if key in session_state)
+        if not present:
+            continue
+        grouped.update(present)
+        usage.append(MemoryUsage(name, 'session', _measure(session_state, name, present, rerun),
+                                 len(present), evictable=True, last_used=last_used.get(name)))
+
+    for key in list(session_state.keys()):
+        if key in grouped or key in _INTERNAL_KEYS:
+            continue
+        usage.append(MemoryUsage(str(key), 'session', _measure(session_state, str(key), (key,), rerun)))
+
+    return sorted(usage, key=lambda u: -(u.bytes or 0))
+
+
+def cache_usage() -> List[MemoryUsage]:
+    """Size of the st.cache_data / st.cache_resource caches and the registered function caches"""
+    from streamlit.runtime.caching import get_data_cache_stats_provider, get_resource_cache_stats_provider
+
+    totals: Dict[str, List[int]] = {}
+    for provider in (get_data_cache_stats_provider(), get_resource_cache_stats_provider()):
+        try:
+            stats = provider.get_stats()
+        except Exception as e:
+            logger.debug(f"Could not read cache stats: {e}")
+            continue
+        # Newer Streamlit versions group the stats by metric family
+        stats = stats.get('cache_memory_bytes', []) if isinstance(stats, dict) else stats
+        for stat in stats:
+            total = totals.setdefault(f"{stat.category_name}: {stat.cache_name}", [0, 0])
+            total[0] += 1
+            total[1] += stat.byte_length
+
+    usage = [MemoryUsage(name, 'cache', size, entries) for name, (entries, size) in totals.items()]
+    for name, func in memory_registry.function_caches.items():
+        usage.append(MemoryUsage(name, 'cache', None, func.cache_info().currsize))
+    return sorted(usage, key=lambda u: -(u.bytes or 0))
+
+
+def shared_usage() -> List[MemoryUsage]:
+    """Deep size of the registered process-wide structures"""
+    usage = []
+    for name, getter in memory_registry.shared.items():
+        structure = getter()
+        entries = len(structure) if hasattr(structure, '__len__') else None
+        usage.append(MemoryUsage(name, 'shared', deep_sizeof(structure), entries))
+    return sorted(usage, key=lambda u: -(u.bytes or 0))
+
+
+def evict_to_cap(session_state, usage: List[MemoryUsage], cap_bytes: int) -> List[str]:
+    """
+    Drop evictable entries until the session fits its cap
+
+    Entries used in the current rerun are kept. The others go least recently used
+    first, and the largest first among equally recent ones.
+
+    Returns:
+        Names of the evicted entries
+    """
+    total = sum(u.bytes or 0 for u in usage)
+    rerun = session_state.get(RERUN_KEY, 0)
+    candidates = sorted(
+        (u for u in usage if u.evictable and u.last_used != rerun),
+        key=lambda u: (u.last_used if u.last_used is not None else -1, -(u.bytes or 0))
+    )
+
+    evicted = []
+    for entry in candidates:
+        if total <= cap_bytes:
+            break
+        for key in memory_registry.evictable[entry.name]:
+            if key in session_state:
+                del session_state[key]
+        session_state[SIZES_KEY].pop(entry.name, None)
+        total -= entry.bytes or 0
+        evicted.append(entry.name)
+        logger.info(f"Evicted session entry {entry.name} ({(entry.bytes or 0) / 1024:.0f} KB) to fit the "
+                    f"{cap_bytes / (1024 * 1024):.0f} MB session cap")
+    return evicted
+
+
+def start_rerun() -> None:
+    """Count a new rerun of this session (entries touched from now on count as used in it)"""
+    session_state = _get_session_state()
+    if session_state is not None:
+        session_state[RERUN_KEY] = session_state.get(RERUN_KEY, 0) + 1
+
+
+def account_session(force: bool = False) -> Optional[SessionMemory]:
+    """
+    Measure this session at the end of a rerun, evicting entries when it is over its cap
+
+    Only runs when a cap is set, or when forced (e.g. while tracing is on).
+
+    Returns:
+        The session's accounting, or None if it was not measured
+    """
+    cap_bytes = get_session_cap_bytes()
+    if not cap_bytes and not force:
+        return None
+    session_state = _get_session_state()
+    if session_state is None:
+        return None
+
+    usage = session_usage(session_state)
+    evicted = evict_to_cap(session_state, usage, cap_bytes) if cap_bytes else []
+    if evicted:
+        usage = [u for u in usage if u.name not in evicted]
+
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    memory = SessionMemory(
+        session_id=get_script_run_ctx().session_id,
+        bytes=sum(u.bytes or 0 for u in usage),
+        entries=len(usage),
+        reruns=session_state.get(RERUN_KEY, 0),
+        evictions=len(evicted),
+        updated_at=time.time()
+    )
+    memory_registry.record_session(memory)
+    return memory
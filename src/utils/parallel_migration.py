@@ -0,0 +1,352 @@
+"""
+Parallel, chunked recipe migration
+
+Splits the recipe dictionaries into chunks and processes them on a process pool:
+the ingredient library is built map-reduce style (usage collected per chunk, merged
+in the parent), then each chunk is migrated against the library and the migrated
+recipes are streamed to the output file as chunks finish. Recipes that fail are
+recorded in a structured failure report instead of stopping the run.
+"""
+
+import json
+import logging
+import os
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.models.ingredient import Ingredient
+from src.utils.ingredient_extractor import IngredientExtractor
+from src.utils.recipe_migrator import RecipeMigrator
+
+logger = logging.getLogger(__name__)
+
+# Default number of recipes handed to a worker at a time
+DEFAULT_CHUNK_SIZE = 50
+
+# Ingredient library of the current worker process (set by _init_worker)
+_worker_library: Dict[str, Ingredient] = {}
+
+
+@dataclass
+class MigrationFailure:
+    """A recipe that could not be migrated"""
+    index: int  # Position of the recipe in the input
+    recipe_id: str
+    recipe_name: str
+    error_type: str
+    error: str
+    traceback: str = ""
+    stage: str = "migration"  # 'library' (ingredient usage collection) or 'migration'
+
+
+@dataclass
+class MigrationStats:
+    """Summary of a migration run"""
+    total_recipes: int = 0
+    migrated: int = 0
+    failed: int = 0
+    library_failures: int = 0  # Recipes whose ingredients could not be collected for the library
+    unique_ingredients: int = 0
+    library_seconds: float = 0.0
+    migration_seconds: float = 0.0
+    workers: int = 1
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    meal_types: Dict[str, int] = field(default_factory=dict)
+    difficulties: Dict[str, int] = field(default_factory=dict)
+    failed_indexes: List[int] = field(default_factory=list)  # Input positions of failed recipes
+
+    @property
+    def recipes_per_second(self) -> float:
+        """Migration throughput"""
+        return self.total_recipes / self.migration_seconds if self.migration_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization"""
+        data = asdict(self)
+        data['recipes_per_second'] = round(self.recipes_per_second, 1)
+        return data
+
+
+@dataclass
+class ChunkResult:
+    """Output of migrating one chunk of recipes"""
+    chunk_index: int
+    recipes: List[Dict[str, Any]]  # Migrated recipes, serialized with Recipe.to_dict()
+    failures: List[MigrationFailure]
+    meal_types: Counter
+    difficulties: Counter
+
+
+def chunk_recipes(recipes: List[Dict], chunk_size: int) -> List[List[Tuple[int, Dict]]]:
+    """Split recipes into chunks of (input position, recipe) pairs"""
+    chunk_size = max(1, chunk_size)
+    indexed = list(enumerate(recipes))
+    return [indexed[i:i + chunk_size] for i in range(0, len(indexed), chunk_size)]
+
+
+def _record_failure(index: int, recipe_dict: Any, error: Exception, stage: str = "migration") -> MigrationFailure:
+    """Describe a recipe that raised while being processed (call from an except block)"""
+    is_dict = isinstance(recipe_dict, dict)
+    return MigrationFailure(
+        index=index,
+        recipe_id=str(recipe_dict.get('id', 'unknown')) if is_dict else 'unknown',
+        recipe_name=str(recipe_dict.get('name', 'unknown')) if is_dict else 'unknown',
+        error_type=type(error).__name__,
+        error=str(error),
+        traceback=traceback.format_exc(),
+        stage=stage
+    )
+
+
+def _collect_chunk_usage(chunk_index: int,
+                         chunk: List[Tuple[int, Dict]]) -> Tuple[Dict[str, List[Dict]], List[MigrationFailure]]:
+    """Map step: collect ingredient usage for a chunk, recording failures instead of raising (runs in a worker)"""
+    usages = []
+    failures = []
+    for index, recipe_dict in chunk:
+        if not isinstance(recipe_dict, dict):
+            continue
+        try:
+            usages.append(IngredientExtractor.collect_ingredient_usage([recipe_dict]))
+        except Exception as e:
+            failures.append(_record_failure(index, recipe_dict, e, stage="library"))
+    return IngredientExtractor.merge_ingredient_usage(usages), failures
+
+
+def _init_worker(ingredient_library: Dict[str, Ingredient]) -> None:
+    """Give a worker process the ingredient library once, instead of with every chunk"""
+    global _worker_library
+    _worker_library = ingredient_library
+
+
+def migrate_chunk(chunk_index: int, chunk: List[Tuple[int, Dict]],
+                  ingredient_library: Optional[Dict[str, Ingredient]] = None) -> ChunkResult:
+    """
+    Migrate one chunk of recipes, recording failures instead of raising
+
+    Args:
+        chunk_index: Position of the chunk in the input
+        chunk: (input position, recipe dictionary) pairs
+        ingredient_library: Library to link against (defaults to the worker's library)
+
+    Returns:
+        ChunkResult with the serialized recipes and failures
+    """
+    library = ingredient_library if ingredient_library is not None else _worker_library
+    result = ChunkResult(chunk_index, [], [], Counter(), Counter())
+
+    for index, recipe_dict in chunk:
+        try:
+            recipe = RecipeMigrator.migrate_recipe(recipe_dict, library)
+            result.recipes.append(recipe.to_dict())
+            if recipe.meal_type:
+                result.meal_types[recipe.meal_type.value] += 1
+            result.difficulties[recipe.difficulty.value] += 1
+        except Exception as e:
+            result.failures.append(_record_failure(index, recipe_dict, e))
+
+    return result
+
+
+class RecipeStreamWriter:
+    """Writes migrated recipes to the migrated recipes JSON file one at a time"""
+
+    def __init__(self, filepath: str):
+        self.filepath = Path(filepath)
+        self.temp_path = self.filepath.with_name(self.filepath.name + '.tmp')
+        self.count = 0
+        self.position = 0  # Bytes written so far
+        self._file = None
+
+    def _write(self, text: str) -> None:
+        data = text.encode('utf-8')
+        self._file.write(data)
+        self.position += len(data)
+
+    def __enter__(self) -> 'RecipeStreamWriter':
+        self.filepath.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.temp_path, 'wb')
+        self._write('{\n  "recipes": [')
+        return self
+
+    def write(self, recipe_dict: Dict[str, Any]) -> int:
+        """Append a serialized recipe, returning its byte offset in the file"""
+        self._write(',\n    ' if self.count else '\n    ')
+        offset = self.position
+        self._write(json.dumps(recipe_dict, ensure_ascii=False))
+        self.count += 1
+        return offset
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self._file.close()
+            self.temp_path.unlink(missing_ok=True)
+            return
+
+        export_info = {
+            'exported_at': datetime.now().isoformat(),
+            'total_recipes': self.count,
+            'migration_method': 'automated_dictionary_to_recipe_class',
+            'uses_recipe_class': True,
+            'uses_ingredient_library': True
+        }
+        self._write('\n  ],\n  "export_info": ')
+        self._write(json.dumps(export_info, ensure_ascii=False))
+        self._write('\n}\n')
+        self._file.close()
+        # Replace the previous file only once the new one is complete
+        os.replace(self.temp_path, self.filepath)
+
+
+def run_chunks(func: Callable, chunks: List, workers: int, initializer=None, initargs=()) -> Iterator[Tuple[int, Any]]:
+    """Run func over chunks, yielding (chunk position, result) as chunks finish"""
+    if workers <= 1:
+        if initializer:
+            initializer(*initargs)
+        for i, chunk in enumerate(chunks):
+            yield i, func(i, chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+        futures = {executor.submit(func, i, chunk): i for i, chunk in enumerate(chunks)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def build_ingredient_library_parallel(recipes: List[Dict], workers: int = None,
+                                      chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                      failures: Optional[List[MigrationFailure]] = None) -> Dict[str, Ingredient]:
+    """
+    Build the ingredient library map-reduce style on a process pool
+
+    Recipes whose ingredients cannot be parsed are left out of the library and
+    recorded as failures; the rest of the corpus is still processed.
+
+    Args:
+        recipes: Recipe dictionaries
+        workers: Number of worker processes (defaults to the CPU count; 1 runs in-process)
+        chunk_size: Recipes per chunk
+        failures: List to append the recipes that failed to (logged either way)
+
+    Returns:
+        Ingredient library, identical to IngredientExtractor.build_ingredient_library(recipes)
+        when no recipe fails
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = chunk_recipes(recipes, chunk_size)
+
+    usages: List[Optional[Dict]] = [None] * len(chunks)
+    library_failures: List[MigrationFailure] = []
+    for i, (usage, chunk_failures) in run_chunks(_collect_chunk_usage, chunks, workers):
+        usages[i] = usage
+        library_failures.extend(chunk_failures)
+
+    for failure in library_failures:
+        logger.error(f"Failed to collect ingredients of recipe {failure.recipe_name}: {failure.error}")
+    if failures is not None:
+        failures.extend(sorted(library_failures, key=lambda f: f.index))
+
+    # Merge in input order so usage examples match the serial build
+    return IngredientExtractor.create_ingredient_library(IngredientExtractor.merge_ingredient_usage(usages))
+
+
+def write_failure_report(failures: List[MigrationFailure], stats: MigrationStats, filepath: str) -> None:
+    """Write the structured failure report for a migration run"""
+    report = {
+        'generated_at': datetime.now().isoformat(),
+        'stats': stats.to_dict(),
+        'failures': [asdict(failure) for failure in sorted(failures, key=lambda f: f.index)]
+    }
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    logger.info(f"Wrote failure report with {len(failures)} failures to {filepath}")
+
+
+def migrate_recipes_parallel(
+    recipes: List[Dict],
+    output_path: str,
+    ingredient_library: Optional[Dict[str, Ingredient]] = None,
+    workers: int = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    failure_report_path: Optional[str] = None,
+    progress_callback: Optional[Callable[[int, int, float], None]] = None
+) -> Tuple[Dict[str, Ingredient], MigrationStats]:
+    """
+    Migrate recipe dictionaries on a process pool, streaming results to a file
+
+    Args:
+        recipes: Recipe dictionaries
+        output_path: Migrated recipes JSON file to write
+        ingredient_library: Library to link against (built in parallel if not given)
+        workers: Number of worker processes (defaults to the CPU count; 1 runs in-process)
+        chunk_size: Recipes per chunk
+        failure_report_path: Where to write the failure report (skipped if None)
+        progress_callback: Called with (processed recipes, total recipes, recipes per second)
+
+    Returns:
+        Tuple of (ingredient library, migration stats)
+    """
+    workers = workers or os.cpu_count() or 1
+    stats = MigrationStats(total_recipes=len(recipes), workers=workers, chunk_size=chunk_size)
+
+    library_failures: List[MigrationFailure] = []
+    start = time.perf_counter()
+    if ingredient_library is None:
+        ingredient_library = build_ingredient_library_parallel(recipes, workers, chunk_size, library_failures)
+    stats.library_seconds = time.perf_counter() - start
+    stats.unique_ingredients = len(ingredient_library)
+    stats.library_failures = len(library_failures)
+
+    chunks = chunk_recipes(recipes, chunk_size)
+    failures: List[MigrationFailure] = []
+    meal_types: Counter = Counter()
+    difficulties: Counter = Counter()
+    pending: Dict[int, ChunkResult] = {}  # Finished chunks waiting for earlier chunks to be written
+    next_chunk = 0
+    processed = 0
+
+    start = time.perf_counter()
+    with RecipeStreamWriter(output_path) as writer:
+        for _, result in run_chunks(migrate_chunk, chunks, workers, _init_worker, (ingredient_library,)):
+            failures.extend(result.failures)
+            meal_types.update(result.meal_types)
+            difficulties.update(result.difficulties)
+            for failure in result.failures:
+                logger.error(f"Failed to migrate recipe {failure.recipe_name}: {failure.error}")
+
+            # Write finished chunks in input order so the output is deterministic
+            pending[result.chunk_index] = result
+            while next_chunk in pending:
+                for recipe_dict in pending.pop(next_chunk).recipes:
+                    writer.write(recipe_dict)
+                next_chunk += 1
+
+            processed += len(chunks[result.chunk_index])
+            elapsed = time.perf_counter() - start
+            rate = processed / elapsed if elapsed > 0 else 0.0
+            logger.info(f"Migrated {processed}/{len(recipes)} recipes ({rate:.0f} recipes/s)")
+            if progress_callback:
+                progress_callback(processed, len(recipes), rate)
+
+    stats.migration_seconds = time.perf_counter() - start
+    stats.migrated = writer.count
+    stats.failed = len(failures)
+    stats.failed_indexes = sorted(failure.index for failure in failures)
+    stats.meal_types = dict(meal_types)
+    stats.difficulties = dict(difficulties)
+
+    logger.info(f"Successfully migrated {stats.migrated} recipes in {stats.migration_seconds:.1f}s "
+                f"({stats.recipes_per_second:.0f} recipes/s)")
+    if failures:
+        logger.warning(f"Failed to migrate {len(failures)} recipes")
+
+    if failure_report_path:
+        write_failure_report(library_failures + failures, stats, failure_report_path)
+
+    return ingredient_library, stats
@@ -0,0 +1,282 @@
+"""
+Corpus-level nutrition and cost matrices
+
+Nutrition and cost for the whole recipe corpus are computed as one sparse
+recipe x ingredient quantity matrix (grams) multiplied by a dense ingredient x
+value matrix (macro nutrients and price per gram). Results are cached per corpus
+version, so any set of recipes is answered by indexing into precomputed arrays.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src.models.ingredient import NUTRITION_FIELDS, get_ingredient_library_version
+from src.models.meal_plan import get_recipe_id
+from src.models.recipe import Recipe
+from src.models.recipe_graph import expand_sub_recipes, build_recipe_graph
+from src.utils.memory_accounting import register_shared_structure
+
+logger = logging.getLogger(__name__)
+
+# Number of corpus versions kept in the matrix cache
+MAX_CACHED_CORPORA = 4
+
+# Column of the price (NOK per gram) in the ingredient value matrix
+PRICE_COLUMN = len(NUTRITION_FIELDS)
+
+_matrix_lock = threading.Lock()
+_matrix_cache: 'OrderedDict[Tuple, CorpusMatrices]' = OrderedDict()
+# Version key of recently seen corpus lists by id(): (corpus, length, library version, key)
+_corpus_versions: 'OrderedDict[int, Tuple[Sequence[Any], int, Any, Tuple]]' = OrderedDict()
+register_shared_structure('recipe_matrices', lambda: _matrix_cache)
+
+
+class CSRMatrix:
+    """Minimal compressed sparse row matrix backed by NumPy arrays"""
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, shape: Tuple[int, int]):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = shape
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[int, float]], n_cols: int) -> 'CSRMatrix':
+        """Build from a list of {column: value} rows"""
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indices = []
+        data = []
+        for i, row in enumerate(rows):
+            for col, value in sorted(row.items()):
+                indices.append(col)
+                data.append(value)
+            indptr[i + 1] = len(indices)
+        return cls(indptr, np.array(indices, dtype=np.int64), np.array(data, dtype=float), (len(rows), n_cols))
+
+    @property
+    def nnz(self) -> int:
+        return len(self.data)
+
+    def dot(self, dense: np.ndarray) -> np.ndarray:
+        """Multiply by a dense (n_cols x k) matrix"""
+        result = np.zeros((self.shape[0],) + dense.shape[1:], dtype=float)
+        if self.nnz:
+            row_ids = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+            np.add.at(result, row_ids, self.data.reshape((-1,) + (1,) * (dense.ndim - 1)) * dense[self.indices])
+        return result
+
+
+def get_corpus_version(recipes: Sequence[Any]) -> Tuple:
+    """Get a version key for a recipe corpus (recipe IDs and versions, and the ingredient library version)"""
+    return (get_ingredient_library_version(),) + tuple(
+        (get_recipe_id(recipe), getattr(recipe, 'version', 0)) for recipe in recipes
+    )
+
+
+class CorpusMatrices:
+    """Precomputed nutrition and cost matrices for a recipe corpus"""
+
+    def __init__(self, recipes: Sequence[Any]):
+        """
+        Build the matrices for a recipe corpus
+
+        Args:
+            recipes: Recipe corpus; legacy recipe dictionaries get empty rows
+        """
+        self.recipe_ids: List[str] = []
+        self.recipe_positions: Dict[str, int] = {}
+        self.ingredient_ids: List[str] = []
+        self.ingredient_positions: Dict[str, int] = {}
+
+        ingredients = []
+        rows = []
+        servings = []
+
+        # Recipes using other recipes' produced ingredients get rows of their expanded base ingredients
+        graph = build_recipe_graph(recipe for recipe in recipes if isinstance(recipe, Recipe))
+
+        def column(ingredient_id: str, ingredient) -> int:
+            col = self.ingredient_positions.get(ingredient_id)
+            if col is None:
+                col = len(self.ingredient_ids)
+                self.ingredient_positions[ingredient_id] = col
+                self.ingredient_ids.append(ingredient_id)
+                ingredients.append(ingredient)
+            return col
+
+        for recipe in recipes:
+            recipe_id = get_recipe_id(recipe)
+            if not recipe_id or recipe_id in self.recipe_positions:
+                continue
+
+            row: Dict[int, float] = {}
+            if isinstance(recipe, Recipe):
+                expanded = expand_sub_recipes(recipe, graph)
+                if expanded is not None:
+                    for ingredient_id, amount in expanded.base_grams.items():
+                        ingredient = graph.base_ingredients.get(ingredient_id)
+                        if ingredient is None or amount <= 0:
+                            continue
+                        col = column(ingredient_id, ingredient)
+                        row[col] = row.get(col, 0.0) + amount
+                else:
+                    grams = recipe.get_gram_vector()
+                    for recipe_ingredient, amount in zip(recipe.recipe_ingredients, grams):
+                        if not recipe_ingredient.ingredient or amount <= 0:
+                            continue
+                        col = column(recipe_ingredient.ingredient_id, recipe_ingredient.ingredient)
+                        row[col] = row.get(col, 0.0) + amount
+                servings.append(recipe.servings or 0)
+            else:
+                servings.append(0)
+
+            self.recipe_positions[recipe_id] = len(self.recipe_ids)
+            self.recipe_ids.append(recipe_id)
+            rows.append(row)
+
+        # Ingredient x value matrix: macro nutrients and price, per gram
+        self.value_matrix = np.zeros((len(ingredients), len(NUTRITION_FIELDS) + 1), dtype=float)
+        for i, ingredient in enumerate(ingredients):
+            self.value_matrix[i, :PRICE_COLUMN] = ingredient.nutrition.to_vector() / 100.0
+            self.value_matrix[i, PRICE_COLUMN] = ingredient.price_info.average_price_per_kg / 1000.0
+
+        self.quantity_matrix = CSRMatrix.from_rows(rows, len(ingredients))
+        self.servings = np.array(servings, dtype=float)
+
+        # Recipe x value totals for the whole corpus - one sparse multiply
+        self.recipe_totals = self.quantity_matrix.dot(self.value_matrix)
+
+        logger.info(
+            f"Built corpus matrices: {len(self.recipe_ids)} recipes x {len(self.ingredient_ids)} ingredients "
+            f"({self.quantity_matrix.nnz} quantities)"
+        )
+
+    @property
+    def nutrient_matrix(self) -> np.ndarray:
+        """Ingredient x macro nutrient matrix (per gram, columns ordered by NUTRITION_FIELDS)"""
+        return self.value_matrix[:, :PRICE_COLUMN]
+
+    @property
+    def price_vector(self) -> np.ndarray:
+        """Ingredient price vector (NOK per gram)"""
+        return self.value_matrix[:, PRICE_COLUMN]
+
+    def get_positions(self, recipes: Sequence[Any]) -> np.ndarray:
+        """
+        Get matrix row positions for recipes
+
+        Args:
+            recipes: Recipes or recipe IDs
+
+        Returns:
+            Array of row positions (-1 for recipes not in the corpus)
+        """
+        return np.array(
+            [self.recipe_positions.get(r if isinstance(r, str) else get_recipe_id(r), -1) for r in recipes],
+            dtype=np.int64
+        )
+
+    def _take(self, recipes: Sequence[Any], columns) -> np.ndarray:
+        """Get total values for recipes, with NaN rows for recipes not in the corpus"""
+        positions = self.get_positions(recipes)
+        if not self.recipe_ids:
+            return np.full((len(positions),) + self.recipe_totals[:, columns].shape[1:], np.nan)
+        values = self.recipe_totals[np.maximum(positions, 0)][:, columns].astype(float)
+        values[positions < 0] = np.nan
+        return values
+
+    def _servings_for(self, recipes: Sequence[Any]) -> np.ndarray:
+        positions = self.get_positions(recipes)
+        if not self.recipe_ids:
+            return np.full(len(positions), np.nan)
+        servings = self.servings[np.maximum(positions, 0)]
+        servings[positions < 0] = np.nan
+        return servings
+
+    def total_nutrition(self, recipes: Sequence[Any]) -> np.ndarray:
+        """Total macro nutrients per recipe, shape (len(recipes), len(NUTRITION_FIELDS))"""
+        return self._take(recipes, slice(0, PRICE_COLUMN))
+
+    def nutrition_per_serving(self, recipes: Sequence[Any]) -> np.ndarray:
+        """Macro nutrients per serving; rows are NaN for recipes without servings"""
+        servings = self._servings_for(recipes)
+        servings = np.where(servings > 0, servings, np.nan)
+        return self.total_nutrition(recipes) / servings[:, None]
+
+    def total_cost(self, recipes: Sequence[Any]) -> np.ndarray:
+        """Estimated total cost per recipe (NOK)"""
+        return self._take(recipes, PRICE_COLUMN)
+
+    def cost_per_serving(self, recipes: Sequence[Any]) -> np.ndarray:
+        """Estimated cost per serving (NOK); total cost for recipes without servings"""
+        servings = self._servings_for(recipes)
+        return self.total_cost(recipes) / np.where(servings > 0, servings, 1.0)
+
+
+def _get_cached_corpus_version(recipes: Sequence[Any]) -> Tuple:
+    """
+    Get the version key of a corpus, computed once per corpus list (call with _matrix_lock held)
+
+    Like the recipe index, this treats a corpus list as unchanged until it is replaced:
+    the key is only recomputed when the list's length or the ingredient library changes.
+    """
+    library_version = get_ingredient_library_version()
+    entry = _corpus_versions.get(id(recipes))
+    if entry is not None and entry[0] is recipes and entry[1] == len(recipes) and entry[2] == library_version:
+        _corpus_versions.move_to_end(id(recipes))
+        return entry[3]
+
+    key = get_corpus_version(recipes)
+    _corpus_versions[id(recipes)] = (recipes, len(recipes), library_version, key)
+    while len(_corpus_versions) > MAX_CACHED_CORPORA:
+        _corpus_versions.popitem(last=False)
+    return key
+
+
+def get_corpus_matrices(recipes: Sequence[Any]) -> CorpusMatrices:
+    """
+    Get the nutrition and cost matrices for a recipe corpus, cached per corpus version
+
+    Args:
+        recipes: Recipe corpus
+
+    Returns:
+        CorpusMatrices for the corpus
+    """
+    with _matrix_lock:
+        key = _get_cached_corpus_version(recipes)
+        matrices = _matrix_cache.get(key)
+        if matrices is not None:
+            _matrix_cache.move_to_end(key)
+            return matrices
+
+    # Built outside the lock; if two sessions build the same corpus, the first one is kept
+    matrices = CorpusMatrices(recipes)
+    with _matrix_lock:
+        matrices = _matrix_cache.setdefault(key, matrices)
+        _matrix_cache.move_to_end(key)
+        while len(_matrix_cache) > MAX_CACHED_CORPORA:
+            _matrix_cache.popitem(last=False)
+    return matrices
+
+
+def get_matrices_for_recipes(recipes: Sequence[Any], corpus: Sequence[Any] = None) -> CorpusMatrices:
+    """
+    Get matrices covering a set of recipes, preferring the full corpus matrices
+
+    Args:
+        recipes: Recipes that must be covered
+        corpus: Loaded recipe corpus, if available
+
+    Returns:
+        Corpus matrices when every recipe is in the corpus, otherwise matrices for the recipes
+    """
+    if corpus:
+        matrices = get_corpus_matrices(corpus)
+        if all(get_recipe_id(recipe) in matrices.recipe_positions for recipe in recipes):
+            return matrices
+    return get_corpus_matrices(recipes)
@@ -4,11 +4,12 @@ Recipe migrator utility - converts dictionary-based recipes to Recipe class obje
 
 import json
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 from datetime import datetime
 from src.models.recipe import Recipe, RecipeIngredient, RecipeStep, RecipePhoto, DifficultyLevel, MealType
 from src.models.ingredient import Ingredient, Season
 from src.utils.ingredient_extractor import IngredientExtractor, ParsedIngredient
+from src.utils.ingredient_matcher import IngredientMatcher, IngredientMatch
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +17,11 @@ logger = logging.getLogger(__name__)
 class RecipeMigrator:
     """Converts dictionary-based recipes to Recipe class objects"""
 
+    # Matcher for the most recently used ingredient library (built once per library)
+    _matcher: Optional[IngredientMatcher] = None
+    _matcher_library: Optional[Dict[str, Ingredient]] = None
+    _matcher_library_size: int = 0
+
     @classmethod
     def migrate_recipe(cls, recipe_dict: Dict, ingredient_library: Dict[str, Ingredient]) -> Recipe:
         """
@@ -231,7 +237,10 @@ class RecipeMigrator:
             parsed = IngredientExtractor.parse_ingredient_text(ingredient_text)
 
             # Find matching ingredient in library
-            ingredient_id = cls._find_ingredient_id(parsed, ingredient_library)
+            match = cls._match_ingredient(parsed, ingredient_library)
+            ingredient_id = match.ingredient_id
+            if match.matched and match.confidence < 0.5:
+                logger.debug(f"Low-confidence {match.method} match for '{parsed.name}': {ingredient_id} ({match.confidence})")
 
             # Create RecipeIngredient
             recipe_ingredient = RecipeIngredient(
@@ -251,27 +260,24 @@ class RecipeMigrator:
         return recipe_ingredients
 
     @classmethod
-    def _find_ingredient_id(cls, parsed: ParsedIngredient, ingredient_library: Dict[str, Ingredient]) -> str:
-        """Find the best matching ingredient ID for a parsed ingredient"""
-        if not parsed.name:
-            return 'unknown_ingredient'
-
-        # Normalize the name
-        normalized_name = cls._normalize_name_for_matching(parsed.name)
-
-        # Direct match by name
-        for ingredient_id, ingredient in ingredient_library.items():
-            if normalized_name == cls._normalize_name_for_matching(ingredient.names.get('no', '')):
-                return ingredient_id
+    def get_matcher(cls, ingredient_library: Dict[str, Ingredient]) -> IngredientMatcher:
+        """Get the indexed matcher for an ingredient library, building it on first use"""
+        if (cls._matcher is None or cls._matcher_library is not ingredient_library
+                or cls._matcher_library_size != len(ingredient_library)):
+            cls._matcher = IngredientMatcher(ingredient_library)
+            cls._matcher_library = ingredient_library
+            cls._matcher_library_size = len(ingredient_library)
+        return cls._matcher
 
-        # Partial match
-        for ingredient_id, ingredient in ingredient_library.items():
-            ingredient_name = ingredient.names.get('no', '').lower()
-            if normalized_name in ingredient_name or ingredient_name in normalized_name:
-                return ingredient_id
+    @classmethod
+    def _match_ingredient(cls, parsed: ParsedIngredient, ingredient_library: Dict[str, Ingredient]) -> IngredientMatch:
+        """Match a parsed ingredient against the library, with match confidence"""
+        return cls.get_matcher(ingredient_library).match(parsed.name)
 
-        # If no match found, generate ID from name
-        return IngredientExtractor._generate_ingredient_id(parsed.name)
+    @classmethod
+    def _find_ingredient_id(cls, parsed: ParsedIngredient, ingredient_library: Dict[str, Ingredient]) -> str:
+        """Find the best matching ingredient ID for a parsed ingredient"""
+        return cls._match_ingredient(parsed, ingredient_library).ingredient_id
 
     @classmethod
     def _normalize_name_for_matching(cls, name: str) -> str:
@@ -353,7 +359,7 @@ class RecipeMigrator:
     @classmethod
     def migrate_all_recipes(
         cls,
-        recipes: List[Dict],
+        recipes: Iterable[Dict],
         ingredient_library: Dict[str, Ingredient]
     ) -> List[Recipe]:
         """
@@ -419,12 +425,10 @@ def migrate_recipes_from_file(
     recipes_file: str,
     ingredient_library: Dict[str, Ingredient]
 ) -> List[Recipe]:
-    """Load and migrate recipes from JSON file"""
-    with open(recipes_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    """Load and migrate recipes from a JSON or NDJSON file, reading one recipe at a time"""
+    from src.utils.recipe_stream import iter_recipes
 
-    recipes = data.get('recipes', [])
-    return RecipeMigrator.migrate_all_recipes(recipes, ingredient_library)
+    return RecipeMigrator.migrate_all_recipes(iter_recipes(recipes_file), ingredient_library)
 
 
 def migrate_recipe_dict(
@@ -2,56 +2,121 @@
 Recipe scaling utilities for ingredient quantity parsing and scaling
 """
 
+import math
 import re
+from dataclasses import dataclass
 from fractions import Fraction
-from typing import Optional, Tuple
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence, Tuple, Union
 
+if TYPE_CHECKING:
+    import numpy as np
 
-def parse_quantity(quantity_str: str) -> Optional[float]:
+# Unicode vulgar fractions found in recipe quantities
+UNICODE_FRACTIONS = {
+    '½': 0.5, '⅓': 1 / 3, '⅔': 2 / 3, '¼': 0.25, '¾': 0.75,
+    '⅕': 0.2, '⅖': 0.4, '⅗': 0.6, '⅘': 0.8, '⅙': 1 / 6, '⅚': 5 / 6,
+    '⅛': 0.125, '⅜': 0.375, '⅝': 0.625, '⅞': 0.875
+}
+
+# A single number: "2", "1.5", "1,5", "1/2", "1 1/2", "½", "1½", "1 ½"
+_NUMBER = r'(?:\d+(?:[.,]\d+)?(?:\s*/\s*\d+)?(?:\s*[{0}]|\s+\d+\s*/\s*\d+)?|[{0}])'.format(
+    ''.join(UNICODE_FRACTIONS)
+)
+QUANTITY_PATTERN = re.compile(
+    r'^\s*(?P<low>{0})(?:\s*(?:-|–|—|to|til)\s*(?P<high>{0}))?\s*(?P<unit>.*?)\s*$'.format(_NUMBER),
+    re.IGNORECASE
+)
+MIXED_NUMBER_PATTERN = re.compile(r'^(\d+)\s+(\d+\s*/\s*\d+)$')
+
+
+@dataclass(frozen=True)
+class ParsedQuantity:
+    """A structured ingredient quantity: a value or range plus its unit"""
+    low: float
+    high: Optional[float] = None
+    unit: str = ""
+
+    def scale(self, scale_factor: float) -> 'ParsedQuantity':
+        """Return this quantity multiplied by a scale factor"""
+        return ParsedQuantity(
+            low=self.low * scale_factor,
+            high=self.high * scale_factor if self.high is not None else None,
+            unit=self.unit
+        )
+
+    def format(self) -> str:
+        """Format the quantity for display"""
+        return format_quantity(self.low, self.high, self.unit)
+
+
+def _parse_number(number_str: str) -> Optional[float]:
+    """Parse a single number matched by the quantity pattern"""
+    number_str = number_str.strip().replace(',', '.')
+
+    # Trailing unicode fraction, possibly after a whole number ("1½", "1 ½")
+    if number_str and number_str[-1] in UNICODE_FRACTIONS:
+        whole = number_str[:-1].strip()
+        return (float(whole) if whole else 0.0) + UNICODE_FRACTIONS[number_str[-1]]
+
+    # Mixed number ("1 1/2")
+    mixed = MIXED_NUMBER_PATTERN.match(number_str)
+    if mixed:
+        return float(mixed.group(1)) + float(Fraction(mixed.group(2).replace(' ', '')))
+
+    try:
+        if '/' in number_str:
+            return float(Fraction(number_str.replace(' ', '')))
+        return float(number_str)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+@lru_cache(maxsize=8192)
+def parse_quantity_text(quantity_str: str, default_unit: str = "") -> Optional[ParsedQuantity]:
     """
-    Parse ingredient quantity string into a float value.
-    Handles various formats: "2", "1/2", "1.5", "1-2", "2 ss", etc.
+    Parse an ingredient quantity string into a structured quantity.
+    Handles "2", "1/2", "1 1/2", "1,5", "½", "1½", ranges like "1-2" or "2 til 3",
+    and a trailing unit ("2 ss", "1-2 dl").
     
     Args:
         quantity_str: The quantity string from the ingredient
+        default_unit: Unit to use when the string itself has none
         
     Returns:
-        Float value of the quantity, or None if unparseable
+        ParsedQuantity, or None if the string does not start with a quantity
     """
     if not quantity_str or not quantity_str.strip():
         return None
     
-    # Clean the string - remove extra whitespace
-    quantity_str = quantity_str.strip()
-    
-    # Handle range notation (e.g., "1-2", "2-3") - use the lower bound
-    if '-' in quantity_str:
-        parts = quantity_str.split('-')
-        if len(parts) == 2:
-            try:
-                return float(parts[0].strip())
-            except ValueError:
-                pass
-    
-    # Extract numeric part before any units (e.g., "2 ss" -> "2")
-    numeric_part = re.match(r'^([0-9\/.,]+)', quantity_str)
-    if numeric_part:
-        numeric_str = numeric_part.group(1).replace(',', '.')  # Handle European decimal notation
-        
-        # Handle fractions (e.g., "1/2", "3/4")
-        if '/' in numeric_str:
-            try:
-                return float(Fraction(numeric_str))
-            except (ValueError, ZeroDivisionError):
-                pass
-        
-        # Handle regular decimals
-        try:
-            return float(numeric_str)
-        except ValueError:
-            pass
+    match = QUANTITY_PATTERN.match(quantity_str)
+    if not match:
+        return None
+    
+    low = _parse_number(match.group('low'))
+    if low is None:
+        return None
+    
+    high = None
+    if match.group('high'):
+        high = _parse_number(match.group('high'))
+    
+    return ParsedQuantity(low=low, high=high, unit=match.group('unit') or default_unit)
+
+
+def parse_quantity(quantity_str: str) -> Optional[float]:
+    """
+    Parse ingredient quantity string into a float value.
+    Handles various formats: "2", "1/2", "1.5", "1-2", "2 ss", etc.
     
-    return None
+    Args:
+        quantity_str: The quantity string from the ingredient
+        
+    Returns:
+        Float value of the quantity (lower bound for ranges), or None if unparseable
+    """
+    parsed = parse_quantity_text(quantity_str)
+    return parsed.low if parsed else None
 
 
 def extract_unit(quantity_str: str) -> str:
@@ -64,12 +129,28 @@ def extract_unit(quantity_str: str) -> str:
     Returns:
         The unit part (everything after the number)
     """
-    if not quantity_str or not quantity_str.strip():
-        return ""
+    parsed = parse_quantity_text(quantity_str)
+    if parsed:
+        return parsed.unit
+    return quantity_str.strip() if quantity_str else ""
+
+
+def format_quantity(low: float, high: Optional[float] = None, unit: str = "") -> str:
+    """
+    Format a (possibly ranged) quantity with its unit.
     
-    # Extract everything after the numeric part
-    unit_part = re.sub(r'^[0-9\/.,\-\s]+', '', quantity_str.strip())
-    return unit_part.strip()
+    Args:
+        low: Quantity, or lower bound of a range
+        high: Upper bound of a range, if any
+        unit: Unit text
+        
+    Returns:
+        Formatted quantity string
+    """
+    formatted_qty = format_number(low)
+    if high is not None:
+        formatted_qty = f"{formatted_qty}-{format_number(high)}"
+    return f"{formatted_qty} {unit}" if unit else formatted_qty
 
 
 def format_scaled_quantity(original_quantity: str, scale_factor: float) -> str:
@@ -83,30 +164,69 @@ def format_scaled_quantity(original_quantity: str, scale_factor: float) -> str:
     Returns:
         Formatted scaled quantity string
     """
-    parsed_qty = parse_quantity(original_quantity)
-    
-    if parsed_qty is None:
-        # If we can't parse it, return original
-        return original_quantity
+    parsed_qty = parse_quantity_text(original_quantity)
     
-    if parsed_qty == 0:
-        # If quantity is 0, return original
+    if parsed_qty is None or parsed_qty.low == 0:
+        # If we can't parse it (or it is 0), return original
         return original_quantity
     
-    # Scale the quantity
-    scaled_qty = parsed_qty * scale_factor
+    return parsed_qty.scale(scale_factor).format()
+
+
+def scale_quantities(
+    quantities: Sequence[Optional[ParsedQuantity]],
+    scale_factors: Union[float, Sequence[float]]
+) -> Tuple['np.ndarray', 'np.ndarray']:
+    """
+    Scale a list of parsed quantities at once.
     
-    # Get the unit part
-    unit = extract_unit(original_quantity)
+    Args:
+        quantities: Parsed quantities (None for unparseable entries)
+        scale_factors: One scale factor for all entries, or one per entry
+            (e.g. the per-slot scale of each recipe in a week's shopping list)
+        
+    Returns:
+        Tuple of (low, high) arrays; unparseable entries and missing upper bounds are NaN
+    """
+    import numpy as np
+
+    lows = np.fromiter(
+        (q.low if q is not None else np.nan for q in quantities), dtype=float, count=len(quantities)
+    )
+    highs = np.fromiter(
+        (q.high if q is not None and q.high is not None else np.nan for q in quantities),
+        dtype=float, count=len(quantities)
+    )
+    factors = np.asarray(scale_factors, dtype=float)
+    return lows * factors, highs * factors
+
+
+def format_scaled_quantities(
+    quantities: Sequence[Optional[ParsedQuantity]],
+    scale_factors: Union[float, Sequence[float]],
+    originals: Optional[Iterable[str]] = None
+) -> List[str]:
+    """
+    Scale and format a list of parsed quantities at once.
     
-    # Format the scaled quantity nicely
-    formatted_qty = format_number(scaled_qty)
+    Args:
+        quantities: Parsed quantities (None for unparseable entries)
+        scale_factors: One scale factor for all entries, or one per entry
+        originals: Original quantity strings, shown for entries that cannot be scaled
+        
+    Returns:
+        List of formatted quantity strings
+    """
+    originals = list(originals) if originals is not None else [""] * len(quantities)
+    lows, highs = scale_quantities(quantities, scale_factors)
     
-    # Combine with unit
-    if unit:
-        return f"{formatted_qty} {unit}"
-    else:
-        return formatted_qty
+    formatted = []
+    for quantity, original, low, high in zip(quantities, originals, lows, highs):
+        if quantity is None or quantity.low == 0:
+            formatted.append(original)
+        else:
+            formatted.append(format_quantity(low, None if math.isnan(high) else high, quantity.unit))
+    return formatted
 
 
 def format_number(value: float) -> str:
@@ -145,12 +265,12 @@ def format_number(value: float) -> str:
     return f"{value:.1f}".rstrip('0').rstrip('.')
 
 
-def get_scaling_options(recipe: dict) -> Tuple[list, int, str]:
+def get_scaling_options(recipe) -> Tuple[list, int, str]:
     """
     Get scaling options for a recipe based on whether it has servings.
     
     Args:
-        recipe: Recipe dictionary
+        recipe: Recipe object or recipe dictionary
         
     Returns:
         Tuple of (options_list, default_index, label_format)
@@ -158,7 +278,7 @@ def get_scaling_options(recipe: dict) -> Tuple[list, int, str]:
         - default_index: Index of the default/original option
         - label_format: Format string for the selector label
     """
-    servings = recipe.get('servings')
+    servings = recipe.get('servings') if isinstance(recipe, dict) else getattr(recipe, 'servings', None)
     
     # Try to parse servings as a number
     original_servings = None
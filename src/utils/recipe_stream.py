@@ -0,0 +1,303 @@
+"""
+Streaming recipe ingestion
+
+Reads recipe exports one recipe at a time instead of loading the whole file, so
+memory use is bounded by the largest single recipe rather than the file size.
+Supports the JSON export format ({"export_info": ..., "recipes": [...]} or a bare
+array) through an incremental reader on top of json.JSONDecoder.raw_decode, and
+NDJSON (one recipe per line, .ndjson/.jsonl).
+
+stream_migrate_file() chains the stages parse -> migrate -> index -> write: each
+recipe is migrated, written to the migrated recipes file and recorded in an NDJSON
+index of byte offsets (so single recipes can be loaded without reading the corpus)
+before the next one is read.
+"""
+
+import codecs
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.models.ingredient import Ingredient
+from src.utils.ingredient_extractor import IngredientExtractor
+from src.utils.parallel_migration import RecipeStreamWriter, migrate_chunk
+
+logger = logging.getLogger(__name__)
+
+# Characters read from the input at a time
+DEFAULT_READ_SIZE = 1 << 16
+
+# Usage examples kept per ingredient while streaming (matches the library build)
+MAX_USAGE_EXAMPLES = 5
+
+NDJSON_SUFFIXES = {'.ndjson', '.jsonl'}
+
+WHITESPACE = ' \t\n\r'
+VALUE_DELIMITERS = WHITESPACE + ',]}:'
+
+
+class IncrementalJSONReader:
+    """Reads JSON values from a text stream without loading the whole stream"""
+
+    def __init__(self, fileobj, read_size: int = DEFAULT_READ_SIZE):
+        self.fileobj = fileobj
+        self.read_size = read_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, min_size: int = 0) -> bool:
+        """Read more input into the buffer, dropping what has been consumed"""
+        if self.eof:
+            return False
+        data = self.fileobj.read(max(self.read_size, min_size))
+        if not data:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Get the next non-whitespace character without consuming it ('' at end of input)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos] if self.pos < len(self.buffer) else ''
+
+    def expect(self, char: str) -> None:
+        """Consume the next non-whitespace character, which must be char"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in JSON stream, found '{found or 'end of input'}'")
+        self.pos += 1
+
+    def read_value(self) -> Any:
+        """Decode the next JSON value, reading more input until the value is complete"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+                # A number or literal is only complete once a delimiter follows it
+                if (self.buffer[self.pos] in '{["' or self.eof
+                        or (end < len(self.buffer) and self.buffer[end] in VALUE_DELIMITERS)):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Grow reads with the value size so large values are not re-decoded too often
+            if not self._fill(len(self.buffer) - self.pos):
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+                self.pos = end
+                return value
+
+    def iter_array(self) -> Iterator[Any]:
+        """Yield the items of the JSON array at the current position"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.read_value()
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect(']')
+            return
+
+
+class RecipeFileReader:
+    """
+    Iterates the recipes in a JSON or NDJSON export one at a time
+
+    Top-level values other than the recipe array (e.g. export_info) are collected in
+    metadata as they are passed; with an export_info after the recipes, metadata is
+    complete once iteration has finished.
+    """
+
+    def __init__(self, filepath: str, array_key: str = 'recipes', read_size: int = DEFAULT_READ_SIZE):
+        self.filepath = Path(filepath)
+        self.array_key = array_key
+        self.read_size = read_size
+        self.metadata: Dict[str, Any] = {}
+
+    @property
+    def is_ndjson(self) -> bool:
+        return self.filepath.suffix.lower() in NDJSON_SUFFIXES
+
+    def __iter__(self) -> Iterator[Any]:
+        with open(self.filepath, 'r', encoding='utf-8') as f:
+            if self.is_ndjson:
+                for line_number, line in enumerate(f, 1):
+                    if line.strip():
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError as e:
+                            raise ValueError(f"Invalid JSON on line {line_number} of {self.filepath}: {e}") from e
+                return
+
+            reader = IncrementalJSONReader(f, self.read_size)
+            if reader.peek() == '[':
+                yield from reader.iter_array()
+                return
+
+            reader.expect('{')
+            if reader.peek() == '}':
+                return
+            while True:
+                key = reader.read_value()
+                reader.expect(':')
+                if key == self.array_key and reader.peek() == '[':
+                    yield from reader.iter_array()
+                else:
+                    self.metadata[key] = reader.read_value()
+                if reader.peek() == ',':
+                    reader.pos += 1
+                    continue
+                reader.expect('}')
+                return
+
+
+def iter_recipes(filepath: str, array_key: str = 'recipes') -> Iterator[Any]:
+    """Iterate the recipes in a JSON or NDJSON export one at a time"""
+    return iter(RecipeFileReader(filepath, array_key))
+
+
+def build_ingredient_library_streaming(filepath: str) -> Dict[str, Ingredient]:
+    """
+    Build the ingredient library from an export in one streaming pass
+
+    Only usage counts and the first usage examples are kept per ingredient, so memory
+    grows with the number of distinct ingredients rather than the number of recipes.
+    """
+    examples: Dict[str, List[Dict]] = {}
+    counts: Dict[str, int] = {}
+
+    for recipe_dict in iter_recipes(filepath):
+        if not isinstance(recipe_dict, dict):
+            continue
+        try:
+            usage = IngredientExtractor.collect_ingredient_usage([recipe_dict])
+        except Exception as e:
+            # Leave the recipe out of the library; the migration pass records it as a failure
+            logger.error(f"Failed to collect ingredients of recipe {recipe_dict.get('name', 'unknown')}: {e}")
+            continue
+        for name, uses in usage.items():
+            counts[name] = counts.get(name, 0) + len(uses)
+            kept = examples.setdefault(name, [])
+            kept.extend(uses[:MAX_USAGE_EXAMPLES - len(kept)])
+
+    return IngredientExtractor.create_ingredient_library(examples, counts)
+
+
+@dataclass
+class StreamStats:
+    """Summary of a streaming migration"""
+    read: int = 0
+    migrated: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    failures: List[Dict[str, Any]] = field(default_factory=list)  # First failures, for the summary
+
+    @property
+    def recipes_per_second(self) -> float:
+        return self.read / self.seconds if self.seconds > 0 else 0.0
+
+
+def load_recipe_at(filepath: str, offset: int) -> Dict[str, Any]:
+    """Load a single serialized recipe from a migrated recipes file at an indexed byte offset"""
+    with open(filepath, 'rb') as f:
+        f.seek(offset)
+        decoder = json.JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder('utf-8')()
+        buffer = ''
+        while True:
+            chunk = f.read(DEFAULT_READ_SIZE)
+            buffer += text_decoder.decode(chunk, final=not chunk)
+            try:
+                return decoder.raw_decode(buffer)[0]
+            except json.JSONDecodeError:
+                if not chunk:
+                    raise
+
+
+def stream_migrate_file(
+    input_path: str,
+    output_path: str,
+    index_path: str,
+    ingredient_library: Optional[Dict[str, Ingredient]] = None,
+    failure_report_path: Optional[str] = None,
+    progress_every: int = 1000,
+    progress_callback: Optional[Callable[[int, float], None]] = None
+) -> Tuple[Dict[str, Ingredient], StreamStats]:
+    """
+    Migrate an export recipe by recipe with bounded memory
+
+    Args:
+        input_path: JSON or NDJSON recipe export
+        output_path: Migrated recipes JSON file to write
+        index_path: NDJSON index to write ({"id", "name", "offset"} per migrated recipe)
+        ingredient_library: Library to link against (built with an extra streaming pass if not given)
+        failure_report_path: NDJSON file receiving one line per failed recipe (skipped if None)
+        progress_every: Log progress every this many recipes
+        progress_callback: Called with (recipes read, recipes per second)
+
+    Returns:
+        Tuple of (ingredient library, stream stats)
+    """
+    if ingredient_library is None:
+        logger.info(f"Building ingredient library from {input_path}...")
+        ingredient_library = build_ingredient_library_streaming(input_path)
+
+    stats = StreamStats()
+    start = time.perf_counter()
+    failure_file = open(failure_report_path, 'w', encoding='utf-8') if failure_report_path else None
+
+    try:
+        with RecipeStreamWriter(output_path) as writer, open(index_path, 'w', encoding='utf-8') as index_file:
+            for position, recipe_dict in enumerate(iter_recipes(input_path)):
+                stats.read += 1
+
+                # Migrate
+                result = migrate_chunk(position, [(position, recipe_dict)], ingredient_library)
+                for failure in result.failures:
+                    stats.failed += 1
+                    if len(stats.failures) < 10:
+                        stats.failures.append({'recipe_name': failure.recipe_name, 'error': failure.error})
+                    if failure_file:
+                        failure_file.write(json.dumps({
+                            'index': failure.index, 'recipe_id': failure.recipe_id,
+                            'recipe_name': failure.recipe_name, 'error_type': failure.error_type,
+                            'error': failure.error
+                        }, ensure_ascii=False) + '\n')
+
+                for recipe_output in result.recipes:
+                    # Write, then index the written position
+                    offset = writer.write(recipe_output)
+                    index_file.write(json.dumps({
+                        'id': recipe_output.get('id', ''),
+                        'name': recipe_output.get('names', {}).get('no', ''),
+                        'offset': offset
+                    }, ensure_ascii=False) + '\n')
+                    stats.migrated += 1
+
+                if progress_every and stats.read % progress_every == 0:
+                    elapsed = time.perf_counter() - start
+                    rate = stats.read / elapsed if elapsed > 0 else 0.0
+                    logger.info(f"Streamed {stats.read} recipes ({rate:.0f} recipes/s)")
+                    if progress_callback:
+                        progress_callback(stats.read, rate)
+    finally:
+        if failure_file:
+            failure_file.close()
+
+    stats.seconds = time.perf_counter() - start
+    logger.info(f"Streamed {stats.migrated} migrated recipes ({stats.failed} failed) in {stats.seconds:.1f}s "
+                f"({stats.recipes_per_second:.0f} recipes/s)")
+    return ingredient_library, stats
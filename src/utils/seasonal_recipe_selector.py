@@ -6,6 +6,7 @@ import random
 from typing import List, Dict, Any, Tuple
 from datetime import date
 from src.utils.seasons import get_current_season, Season
+from src.models.meal_plan import get_recipe_field, get_recipe_id
 
 
 class SeasonalRecipeSelector:
@@ -69,7 +70,7 @@ class SeasonalRecipeSelector:
         
         for recipe in recipes:
             # Get collections and extract season names
-            collections = recipe.get('collections', [])
+            collections = get_recipe_field(recipe, 'collections', [])
             recipe_seasons = set()
             
             for collection in collections:
@@ -92,7 +93,7 @@ class SeasonalRecipeSelector:
         recipes: List[Dict[str, Any]], 
         num_recipes: int,
         current_season: Season = None,
-        used_recipe_names: set = None
+        used_recipe_ids: set = None
     ) -> List[Dict[str, Any]]:
         """
         Select recipes using seasonal weighting based on current season.
@@ -101,7 +102,7 @@ class SeasonalRecipeSelector:
             recipes: Available recipes to select from
             num_recipes: Number of recipes to select
             current_season: Current season (if None, will be determined automatically)
-            used_recipe_names: Set of recipe names to avoid (for duplicate prevention)
+            used_recipe_ids: Set of recipe IDs to avoid (for duplicate prevention)
             
         Returns:
             List of selected recipe dictionaries
@@ -122,11 +123,11 @@ class SeasonalRecipeSelector:
         seasonal_weights = cls.get_seasonal_weights(current_season)
         
         # Apply duplicate avoidance if provided
-        if used_recipe_names:
+        if used_recipe_ids:
             for season in categorized_recipes:
                 categorized_recipes[season] = [
                     r for r in categorized_recipes[season] 
-                    if r.get('name', '') not in used_recipe_names
+                    if get_recipe_id(r) not in used_recipe_ids
                 ]
         
         # Build weighted recipe pool
@@ -151,8 +152,8 @@ class SeasonalRecipeSelector:
         # If weighted pool is empty, fall back to original recipes
         if not weighted_pool:
             available_recipes = recipes
-            if used_recipe_names:
-                available_recipes = [r for r in recipes if r.get('name', '') not in used_recipe_names]
+            if used_recipe_ids:
+                available_recipes = [r for r in recipes if get_recipe_id(r) not in used_recipe_ids]
             
             if not available_recipes:
                 return []
@@ -161,7 +162,7 @@ class SeasonalRecipeSelector:
         
         # Select from weighted pool, avoiding duplicates
         selected = []
-        selected_names = set()
+        selected_ids = set()
         max_attempts = len(weighted_pool) * 2  # Prevent infinite loops
         attempts = 0
         
@@ -172,15 +173,15 @@ class SeasonalRecipeSelector:
                 break
                 
             recipe = random.choice(weighted_pool)
-            recipe_name = recipe.get('name', '')
+            recipe_id = get_recipe_id(recipe)
             
             # Avoid duplicates in selection
-            if recipe_name not in selected_names:
+            if recipe_id not in selected_ids:
                 selected.append(recipe)
-                selected_names.add(recipe_name)
+                selected_ids.add(recipe_id)
                 
                 # Remove all instances of this recipe from weighted pool to avoid duplicates
-                weighted_pool = [r for r in weighted_pool if r.get('name', '') != recipe_name]
+                weighted_pool = [r for r in weighted_pool if get_recipe_id(r) != recipe_id]
         
         return selected
     
@@ -222,7 +223,7 @@ class SeasonalRecipeSelector:
 def select_seasonal_recipes(
     recipes: List[Dict[str, Any]], 
     num_recipes: int,
-    used_recipe_names: set = None
+    used_recipe_ids: set = None
 ) -> List[Dict[str, Any]]:
     """
     Convenience function to select recipes with seasonal weighting.
@@ -230,11 +231,11 @@ def select_seasonal_recipes(
     Args:
         recipes: Available recipes to select from
         num_recipes: Number of recipes to select
-        used_recipe_names: Set of recipe names to avoid
+        used_recipe_ids: Set of recipe IDs to avoid
         
     Returns:
         List of selected recipe dictionaries
     """
     return SeasonalRecipeSelector.select_recipes_with_seasonal_weights(
-        recipes, num_recipes, used_recipe_names=used_recipe_names
+        recipes, num_recipes, used_recipe_ids=used_recipe_ids
     )
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""
+Weekly shopping list aggregation
+
+Merges the ingredients of every recipe in a week's plan into one shopping list,
+summing quantities per ingredient (in grams where the unit can be converted) with
+per-slot scaling applied, grouped by ingredient category. The list is maintained
+incrementally: syncing it against a changed plan only adds or subtracts the
+contributions of the recipes that were added or removed.
+"""
+
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Tuple
+
+from src.models.ingredient import get_ingredient_library_version
+from src.models.meal_plan import get_recipe_id
+from src.models.recipe import Recipe
+from src.utils.recipe_scaling import format_number, parse_quantity_text
+from src.utils.unit_conversion import normalize_unit
+
+logger = logging.getLogger(__name__)
+
+# Amounts smaller than this are treated as zero when subtracting contributions
+EPSILON = 1e-9
+
+# (ingredient_id, name, category, grams, unit, amount) for one recipe ingredient
+Contribution = Tuple[str, str, str, float, str, float]
+
+
+@dataclass
+class ShoppingListItem:
+    """An ingredient on the shopping list with its summed quantities"""
+    ingredient_id: str
+    name: str
+    category: str = "uncategorized"
+    grams: float = 0.0
+    other_amounts: Dict[str, float] = field(default_factory=dict)  # unit -> amount, for unconvertible units
+    uses: int = 0  # Number of recipe ingredients contributing to this item
+
+    def format_quantity(self) -> str:
+        """Format the summed quantity for display"""
+        parts = []
+        if self.grams > EPSILON:
+            if self.grams >= 1000:
+                parts.append(f"{format_number(self.grams / 1000)} kg")
+            else:
+                parts.append(f"{format_number(self.grams)} g")
+        for unit, amount in sorted(self.other_amounts.items()):
+            if amount > EPSILON:
+                parts.append(f"{format_number(amount)} {unit}".strip())
+        return " + ".join(parts)
+
+
+def get_recipe_contributions(recipe: Any, scale: float = 1.0, language: str = 'no') -> List[Contribution]:
+    """
+    Get the shopping list contributions of a recipe.
+
+    Args:
+        recipe: Recipe object or legacy recipe dictionary
+        scale: Scale factor applied to all quantities
+        language: Language for ingredient names
+
+    Returns:
+        List of (ingredient_id, name, category, grams, unit, amount) tuples; grams is
+        set for convertible quantities, otherwise unit/amount hold the raw quantity
+    """
+    contributions = []
+
+    if isinstance(recipe, Recipe):
+        grams = recipe.get_gram_vector()
+        for recipe_ingredient, ingredient_grams in zip(recipe.recipe_ingredients, grams):
+            if recipe_ingredient.optional:
+                continue  # Skip optional ingredients
+
+            ingredient = recipe_ingredient.ingredient
+            name = recipe_ingredient.get_ingredient_name(language)
+            category = ingredient.category if ingredient else "uncategorized"
+            parsed = recipe_ingredient.parse_quantity()
+
+            if ingredient_grams > 0:
+                contributions.append((recipe_ingredient.ingredient_id, name, category, ingredient_grams * scale, "", 0.0))
+            elif parsed is not None:
+                contributions.append((recipe_ingredient.ingredient_id, name, category, 0.0,
+                                      normalize_unit(parsed.unit), parsed.low * scale))
+            else:
+                contributions.append((recipe_ingredient.ingredient_id, name, category, 0.0, "", 0.0))
+
+    elif isinstance(recipe, dict):
+        ingredients = recipe.get('ingredients', [])
+        if isinstance(ingredients, dict):
+            ingredients = [{'name': k, 'quantity': v} for k, v in ingredients.items()]
+
+        for ingredient in ingredients:
+            if not isinstance(ingredient, dict):
+                continue
+            raw_name = ingredient.get('name', '')
+            quantity = ingredient.get('quantity', '').strip()
+            if not raw_name.strip():
+                continue
+            if raw_name.endswith('  ') and not quantity and not ingredient.get('note', '').strip():
+                continue  # Section heading
+            name = raw_name.strip()
+            parsed = parse_quantity_text(quantity)
+            ingredient_id = ' '.join(name.lower().split())
+            if parsed is not None:
+                contributions.append((ingredient_id, name, "uncategorized", 0.0,
+                                      normalize_unit(parsed.unit), parsed.low * scale))
+            else:
+                contributions.append((ingredient_id, name, "uncategorized", 0.0, "", 0.0))
+
+    return contributions
+
+
+class WeeklyShoppingList:
+    """Incrementally maintained shopping list for a set of planned recipes"""
+
+    def __init__(self, language: str = 'no'):
+        self.language = language
+        self.items: Dict[str, ShoppingListItem] = {}
+        # Contributions per (recipe_id, recipe version, library version, scale), with how many slots hold each
+        self._entries: Counter = Counter()
+        self._contributions: Dict[Tuple[str, int, int, float], List[Contribution]] = {}
+
+    @staticmethod
+    def _entry_key(recipe: Any, scale: float) -> Tuple[str, int, int, float]:
+        return (get_recipe_id(recipe), getattr(recipe, 'version', 0), get_ingredient_library_version(), float(scale))
+
+    def _apply(self, contributions: List[Contribution], sign: int) -> None:
+        """Add (sign=1) or subtract (sign=-1) contributions from the items"""
+        for ingredient_id, name, category, grams, unit, amount in contributions:
+            item = self.items.get(ingredient_id)
+            if item is None:
+                if sign < 0:
+                    continue
+                item = ShoppingListItem(ingredient_id=ingredient_id, name=name, category=category)
+                self.items[ingredient_id] = item
+
+            item.uses += sign
+            item.grams += sign * grams
+            if unit or amount:
+                item.other_amounts[unit] = item.other_amounts.get(unit, 0.0) + sign * amount
+                if abs(item.other_amounts[unit]) < EPSILON:
+                    del item.other_amounts[unit]
+
+            if item.uses <= 0:
+                del self.items[ingredient_id]
+            elif abs(item.grams) < EPSILON:
+                item.grams = 0.0
+
+    def add_recipe(self, recipe: Any, scale: float = 1.0) -> None:
+        """Add a planned recipe's ingredients to the list"""
+        key = self._entry_key(recipe, scale)
+        if key not in self._contributions:
+            self._contributions[key] = get_recipe_contributions(recipe, scale, self.language)
+        self._entries[key] += 1
+        self._apply(self._contributions[key], 1)
+
+    def remove_recipe(self, recipe: Any, scale: float = 1.0) -> bool:
+        """Remove a planned recipe's ingredients from the list"""
+        key = self._entry_key(recipe, scale)
+        if self._entries[key] <= 0:
+            return False
+        self._apply(self._contributions[key], -1)
+        self._entries[key] -= 1
+        if self._entries[key] <= 0:
+            del self._entries[key]
+            del self._contributions[key]
+        return True
+
+    def sync(self, planned: Iterable[Tuple[Any, float]]) -> None:
+        """
+        Bring the list in line with a plan, applying only the changes as a delta.
+
+        Args:
+            planned: (recipe, scale) pairs for every slot in the plan
+        """
+        planned = list(planned)
+        wanted = Counter(self._entry_key(recipe, scale) for recipe, scale in planned)
+        recipes_by_key = {self._entry_key(recipe, scale): recipe for recipe, scale in planned}
+
+        for key, count in list(self._entries.items()):
+            for _ in range(count - wanted.get(key, 0)):
+                self._apply(self._contributions[key], -1)
+                self._entries[key] -= 1
+            if self._entries[key] <= 0:
+                del self._entries[key]
+                del self._contributions[key]
+
+        for key, count in wanted.items():
+            for _ in range(count - self._entries.get(key, 0)):
+                self.add_recipe(recipes_by_key[key], key[3])
+
+    def get_items_by_category(self) -> Dict[str, List[ShoppingListItem]]:
+        """Get the items grouped by ingredient category, sorted by name"""
+        grouped: Dict[str, List[ShoppingListItem]] = {}
+        for item in self.items.values():
+            grouped.setdefault(item.category, []).append(item)
+        return {
+            category: sorted(items, key=lambda i: i.name.lower())
+            for category, items in sorted(grouped.items())
+        }
+
+    def __len__(self) -> int:
+        return len(self.items)
@@ -0,0 +1,288 @@
+"""
+Lightweight rerun tracing for the Streamlit pages
+
+Times spans (session state initialization, filtering, image processing, Google Drive
+calls, page functions) and aggregates them into fixed-bucket histograms per page.
+Each page function opens a rerun: spans timed while it runs are attributed to that
+page and summarized in a list of recent reruns.
+
+Tracing is off unless the CHEFS_ASSISTANT_TRACING environment variable is set to a true
+value (1, true, yes or on), or it is switched on with set_tracing_enabled from the
+developer panel; when off, a traced function costs one flag check per call. Aggregates
+are shared by all sessions of the server process and can be exported as JSON or in the
+Prometheus text format.
+"""
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds (Prometheus defaults)
+BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Recent reruns kept for the developer panel
+MAX_RERUNS = 50
+
+# Page that spans outside a page function (e.g. in main.py) are attributed to
+APP_PAGE = "app"
+
+METRIC_NAME = "chefs_assistant_span_seconds"
+
+TRACING_ENV_VAR = "CHEFS_ASSISTANT_TRACING"
+
+_enabled = os.environ.get(TRACING_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class SpanHistogram:
+    """Duration histogram of one span on one page"""
+    page: str
+    span: str
+    count: int = 0
+    total: float = 0.0
+    min: float = float('inf')
+    max: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(BUCKETS) + 1))  # Last bucket is +Inf
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket containing it"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bound in enumerate(BUCKETS):
+            seen += self.buckets[i]
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization"""
+        return {
+            'page': self.page,
+            'span': self.span,
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'min': round(self.min, 6) if self.count else 0.0,
+            'max': round(self.max, 6),
+            'mean': round(self.mean, 6),
+            'p50': round(self.quantile(0.5), 6),
+            'p95': round(self.quantile(0.95), 6),
+            'buckets': {str(bound): n for bound, n in zip(BUCKETS + ('+Inf',), self.buckets)}
+        }
+
+
+@dataclass
+class RerunTrace:
+    """Spans timed during one run of a page function"""
+    page: str
+    started_at: str
+    duration: float = 0.0
+    spans: Dict[str, Tuple[int, float]] = field(default_factory=dict)  # span -> (calls, seconds)
+
+    def add(self, span: str, seconds: float) -> None:
+        calls, total = self.spans.get(span, (0, 0.0))
+        self.spans[span] = (calls + 1, total + seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization"""
+        return {
+            'page': self.page,
+            'started_at': self.started_at,
+            'duration': round(self.duration, 6),
+            'spans': {name: {'calls': calls, 'seconds': round(seconds, 6)}
+                      for name, (calls, seconds) in self.spans.items()}
+        }
+
+
+class Tracer:
+    """Process-wide span aggregation; the current page and rerun are tracked per script thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._histograms: Dict[Tuple[str, str], SpanHistogram] = {}
+        self._reruns: Deque[RerunTrace] = deque(maxlen=MAX_RERUNS)
+
+    @property
+    def current_page(self) -> str:
+        return getattr(self._local, 'page', APP_PAGE)
+
+    def record(self, span: str, seconds: float) -> None:
+        """Add a span duration to the current page's histogram and rerun"""
+        page = self.current_page
+        with self._lock:
+            histogram = self._histograms.get((page, span))
+            if histogram is None:
+                histogram = self._histograms[(page, span)] = SpanHistogram(page, span)
+            histogram.observe(seconds)
+        rerun = getattr(self._local, 'rerun', None)
+        if rerun is not None:
+            rerun.add(span, seconds)
+
+    @contextmanager
+    def rerun(self, page: str) -> Iterator[None]:
+        """Attribute spans to a page while its function runs and record the rerun"""
+        previous_page = getattr(self._local, 'page', None)
+        previous_rerun = getattr(self._local, 'rerun', None)
+        trace = RerunTrace(page, datetime.now().isoformat(timespec='seconds'))
+        self._local.page = page
+        self._local.rerun = trace
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            trace.duration = time.perf_counter() - start
+            self._local.rerun = previous_rerun
+            self.record(f"page.{page}", trace.duration)
+            self._local.page = previous_page if previous_page is not None else APP_PAGE
+            with self._lock:
+                self._reruns.append(trace)
+
+    def histograms(self) -> List[SpanHistogram]:
+        """Histograms ordered by page, then by total time spent"""
+        with self._lock:
+            histograms = list(self._histograms.values())
+        return sorted(histograms, key=lambda h: (h.page, -h.total))
+
+    def reruns(self) -> List[RerunTrace]:
+        """Recent reruns, newest first"""
+        with self._lock:
+            return list(reversed(self._reruns))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._reruns.clear()
+
+
+tracer = Tracer()
+
+
+def is_tracing_enabled() -> bool:
+    return _enabled
+
+
+def set_tracing_enabled(enabled: bool) -> None:
+    """Switch tracing on or off for the whole server process"""
+    global _enabled
+    _enabled = enabled
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a block of code as a span of the current page"""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        tracer.record(name, time.perf_counter() - start)
+
+
+def traced(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """
+    Decorator timing every call of a function as a span
+
+    Args:
+        name: Span name (defaults to the function's qualified name)
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                tracer.record(span_name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def traced_page(page: str) -> Callable[[Callable], Callable]:
+    """Decorator for a page's entry function: spans timed while it runs are attributed to the page"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with tracer.rerun(page):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def traced_methods(prefix: str) -> Callable[[type], type]:
+    """Class decorator timing every method defined on the class as '<prefix>.<method name>'"""
+    def decorator(cls: type) -> type:
+        for attr, value in list(vars(cls).items()):
+            if inspect.isfunction(value):
+                setattr(cls, attr, traced(f"{prefix}.{attr}")(value))
+        return cls
+
+    return decorator
+
+
+def export_json() -> str:
+    """Export the histograms and recent reruns as JSON"""
+    return json.dumps({
+        'generated_at': datetime.now().isoformat(),
+        'enabled': _enabled,
+        'bucket_bounds': list(BUCKETS),
+        'histograms': [histogram.to_dict() for histogram in tracer.histograms()],
+        'reruns': [rerun.to_dict() for rerun in tracer.reruns()]
+    }, indent=2, ensure_ascii=False)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def export_prometheus() -> str:
+    """Export the histograms in the Prometheus text exposition format"""
+    lines = [
+        f"# HELP {METRIC_NAME} Duration of traced spans per page",
+        f"# TYPE {METRIC_NAME} histogram"
+    ]
+    for histogram in tracer.histograms():
+        labels = f'page="{_escape_label(histogram.page)}",span="{_escape_label(histogram.span)}"'
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ('+Inf',), histogram.buckets):
+            cumulative += count
+            lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{METRIC_NAME}_sum{{{labels}}} {histogram.total:.6f}")
+        lines.append(f"{METRIC_NAME}_count{{{labels}}} {histogram.count}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,204 @@
+"""
+Unit conversion utilities for converting ingredient quantities to grams
+
+Mass units convert directly, volume units convert through the ingredient's density,
+and count/package units convert through the ingredient's typical weight and package size.
+"""
+
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Mass units -> grams
+MASS_UNITS = {
+    'mg': 0.001,
+    'g': 1.0,
+    'gram': 1.0,
+    'hg': 100.0,
+    'kg': 1000.0,
+    'kilo': 1000.0,
+    'oz': 28.35,
+    'lb': 453.6,
+}
+
+# Volume units -> millilitres
+VOLUME_UNITS = {
+    'ml': 1.0,
+    'cl': 10.0,
+    'dl': 100.0,
+    'l': 1000.0,
+    'liter': 1000.0,
+    'krm': 1.0,
+    'ts': 5.0,
+    'tsk': 5.0,
+    'teskje': 5.0,
+    'tsp': 5.0,
+    'ss': 15.0,
+    'spsk': 15.0,
+    'spiseskje': 15.0,
+    'tbsp': 15.0,
+    'kopp': 250.0,
+    'cup': 240.0,
+    'klype': 0.3,
+    'pinch': 0.3,
+}
+
+# Count units -> one typical piece of the ingredient
+COUNT_UNITS = {
+    'stk', 'piece', 'pcs', 'fedd', 'clove', 'skive', 'slice', 'bunt', 'bunch',
+    'neve', 'handful', 'kvast', 'blad', 'leaf', 'stilk', 'stalk',
+}
+
+# Package units -> the ingredient's typical package size
+PACKAGE_UNITS = {
+    'pakke', 'pk', 'pose', 'boks', 'beger', 'glass', 'flaske', 'brett', 'nett',
+    'package', 'pack', 'can', 'jar', 'bag',
+}
+
+# Plural and abbreviated spellings -> canonical unit
+UNIT_ALIASES = {
+    'gr': 'g',
+    'grams': 'g',
+    'liters': 'l',
+    'litre': 'l',
+    'teskjeer': 'teskje',
+    'spiseskjeer': 'spiseskje',
+    'kopper': 'kopp',
+    'cups': 'cup',
+    'stykk': 'stk',
+    'stykker': 'stk',
+    'pieces': 'piece',
+    'skiver': 'skive',
+    'slices': 'slice',
+    'cloves': 'clove',
+    'bunter': 'bunt',
+    'never': 'neve',
+    'pakker': 'pakke',
+    'poser': 'pose',
+    'bokser': 'boks',
+    'flasker': 'flaske',
+    'cans': 'can',
+    'jars': 'jar',
+    'bags': 'bag',
+}
+
+
+def normalize_unit(unit: str) -> str:
+    """
+    Normalize a unit string to its canonical form.
+
+    Args:
+        unit: Unit as written in a recipe (e.g. "Dl.", "spiseskjeer", "stykker")
+
+    Returns:
+        Canonical unit, or the cleaned unit string if it is not recognized
+    """
+    if not unit:
+        return ''
+
+    cleaned = unit.strip().lower().rstrip('.')
+    # Only the first word is the unit ("dl vann" -> "dl")
+    cleaned = cleaned.split()[0] if cleaned.split() else ''
+    return UNIT_ALIASES.get(cleaned, cleaned)
+
+
+def get_package_grams(ingredient) -> Optional[float]:
+    """
+    Get the weight in grams of a typical package of an ingredient.
+
+    Args:
+        ingredient: Ingredient with price_info.typical_package_size/unit
+
+    Returns:
+        Package weight in grams, or None if unknown
+    """
+    price_info = getattr(ingredient, 'price_info', None)
+    if not price_info or price_info.typical_package_size <= 0:
+        return None
+
+    package_unit = normalize_unit(price_info.typical_package_unit)
+    if package_unit in MASS_UNITS:
+        return price_info.typical_package_size * MASS_UNITS[package_unit]
+    if package_unit in VOLUME_UNITS:
+        return price_info.typical_package_size * VOLUME_UNITS[package_unit] * (ingredient.density or 1.0)
+    if package_unit in COUNT_UNITS and ingredient.typical_weight_grams > 0:
+        return price_info.typical_package_size * ingredient.typical_weight_grams
+    return None
+
+
+def get_grams_per_unit(unit: str, ingredient=None) -> Optional[float]:
+    """
+    Get the number of grams in one unit of an ingredient.
+
+    Args:
+        unit: Unit string (an empty unit means a count, e.g. "2 løk")
+        ingredient: Ingredient providing density, typical weight and package size
+
+    Returns:
+        Grams per unit, or None if the unit cannot be converted for this ingredient
+    """
+    unit = normalize_unit(unit)
+
+    if unit in MASS_UNITS:
+        return MASS_UNITS[unit]
+
+    if unit in VOLUME_UNITS:
+        density = ingredient.density if ingredient is not None and ingredient.density > 0 else 1.0
+        return VOLUME_UNITS[unit] * density
+
+    if ingredient is None:
+        return None
+
+    if not unit or unit in COUNT_UNITS:
+        return ingredient.typical_weight_grams if ingredient.typical_weight_grams > 0 else None
+
+    if unit in PACKAGE_UNITS:
+        return get_package_grams(ingredient)
+
+    return None
+
+
+def convert_to_grams(quantity: float, unit: str, ingredient=None) -> Optional[float]:
+    """
+    Convert an ingredient quantity to grams.
+
+    Args:
+        quantity: Amount in the given unit
+        unit: Unit string
+        ingredient: Ingredient providing density, typical weight and package size
+
+    Returns:
+        Weight in grams, or None if the unit cannot be converted
+    """
+    grams_per_unit = get_grams_per_unit(unit, ingredient)
+    if grams_per_unit is None:
+        return None
+    return quantity * grams_per_unit
+
+
+def get_unit_conversions(ingredient) -> Dict[str, float]:
+    """
+    Get the gram equivalent of every supported unit for an ingredient.
+
+    Args:
+        ingredient: Ingredient to build conversions for
+
+    Returns:
+        Dictionary mapping units to their gram equivalents
+    """
+    conversions = dict(MASS_UNITS)
+
+    for unit in VOLUME_UNITS:
+        conversions[unit] = get_grams_per_unit(unit, ingredient)
+
+    if ingredient.typical_weight_grams > 0:
+        for unit in COUNT_UNITS:
+            conversions[unit] = ingredient.typical_weight_grams
+
+    package_grams = get_package_grams(ingredient)
+    if package_grams:
+        for unit in PACKAGE_UNITS:
+            conversions[unit] = package_grams
+
+    return conversions